@@ -1,34 +1,248 @@
-from fastapi import APIRouter, Request
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
 from time7_gateway.models.schemas import ScanResult
+from time7_gateway.services.verifier import PENDING_INFO
 
 router = APIRouter()
 
+_scan_results = TypeAdapter(list[ScanResult])
 
-@router.get("/active-tags", response_model=list[ScanResult])
-def active_tags(request: Request):
-    active_tags = request.app.state.active_tags
-    cache = request.app.state.tag_info_cache
 
+def scan_results_json(rows: list[ScanResult]) -> bytes:
+    return _scan_results.dump_json(rows)
+
+
+def scan_result(t, cache, verifier) -> ScanResult | None:
+    # dashboard row for one active tag; None if it has no verdict and is not pending
+    return _scan_result(t.tidHex, t.epcHex, t.first_seen, cache, verifier)
+
+
+def _verdict(tidHex, cache, verifier) -> Optional[Tuple[Optional[bool], Optional[str]]]:
+    # (auth, info) shown for a tag; None if it has no verdict and is not pending
+    cached = cache.peek(tidHex)
+    if cached is not None:
+        return cached
+    if verifier.is_pending(tidHex):
+        return None, PENDING_INFO
+    return None
+
+
+def _scan_result(tidHex, epcHex, first_seen, cache, verifier) -> ScanResult | None:
+    verdict = _verdict(tidHex, cache, verifier)
+    if verdict is None:
+        return None
+    auth, info = verdict
+    return ScanResult(
+        tidHex=tidHex,
+        epcHex=epcHex,
+        first_seen=first_seen,
+        auth=auth,
+        info=info,
+    )
+
+
+def build_active_tags(active_tags, cache, verifier) -> list[ScanResult]:
     results: list[ScanResult] = []
 
-    for t in active_tags.get_active():
-        cached = cache.get(t.tidHex)
-        if cached is None:
-            continue
-
-        auth, info = cached
-        results.append(
-            ScanResult(
-                tidHex=t.tidHex,
-                epcHex=t.epcHex,
-                first_seen=t.first_seen,
-                auth=auth,
-                info=info,
-            )
-        )
+    # rows(): plain tuples straight from the ActiveTags columns
+    for tidHex, epcHex, first_seen in active_tags.rows():
+        row = _scan_result(tidHex, epcHex, first_seen, cache, verifier)
+        if row is not None:
+            results.append(row)
 
     return results
 
+
+# (tidHex, epcHex, first_seen, auth, info)
+Row = Tuple[str, Optional[str], datetime, Optional[bool], Optional[str]]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_FIELDS = frozenset(ScanResult.model_fields)
+
+
+def _newest_first(row: Row) -> float:
+    # bisect key: rows are in descending first_seen order
+    return -row[2].timestamp()
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _row_result(row: Row) -> ScanResult:
+    tidHex, epcHex, first_seen, auth, info = row
+    return ScanResult(tidHex=tidHex, epcHex=epcHex, first_seen=first_seen, auth=auth, info=info)
+
+
+class ActiveTagsView:
+
+    # One version of the dashboard data (active tags + verdicts + pending
+    # set), built once and shared by every request until something changes.
+    # rows are newest first_seen first, as plain tuples; by_auth / by_info
+    # hold the row positions of each verdict and info category, so filtered
+    # and paged requests only look at the rows that can match and only
+    # validate/serialize the rows they return. The unfiltered response body
+    # is built on first use and then reused.
+
+    __slots__ = ("version", "rows", "by_auth", "by_info", "_full")
+
+    def __init__(self, version, active_tags, cache, verifier) -> None:
+        self.version = version
+        self.rows: List[Row] = []
+        self.by_auth: Dict[Optional[bool], List[int]] = {True: [], False: [], None: []}
+        self.by_info: Dict[Optional[str], List[int]] = {}
+        self._full: Optional[bytes] = None
+
+        for tidHex, epcHex, first_seen in active_tags.rows():
+            verdict = _verdict(tidHex, cache, verifier)
+            if verdict is None:
+                continue
+            auth, info = verdict
+            pos = len(self.rows)
+            self.rows.append((tidHex, epcHex, first_seen, auth, info))
+            self.by_auth[auth].append(pos)
+            self.by_info.setdefault(info, []).append(pos)
+
+    def full_json(self) -> bytes:
+        if self._full is None:
+            self._full = scan_results_json([_row_result(r) for r in self.rows])
+        return self._full
+
+    def start_after(self, cursor: str) -> int:
+        # position after the cursor row; if that tag has gone, the first row
+        # not newer than it (a page may then repeat a row, never skip one)
+        first_us, _, tidHex = cursor.partition("_")
+        first = _EPOCH + timedelta(microseconds=int(first_us))
+        pos = bisect_left(self.rows, -first.timestamp(), key=_newest_first)
+        while pos < len(self.rows) and self.rows[pos][2] == first:
+            if self.rows[pos][0] == tidHex:
+                return pos + 1
+            pos += 1
+        return bisect_left(self.rows, -first.timestamp(), key=_newest_first)
+
+    def query(self, auth, info, since, epc_prefix, cursor, limit) -> Tuple[List[Row], Optional[str]]:
+        # candidate positions from the smallest matching index
+        positions: Sequence[int]
+        if info is not None:
+            positions = self.by_info.get(info, [])
+        elif auth is not None:
+            positions = self.by_auth[auth]
+        else:
+            positions = range(len(self.rows))
+
+        # rows are newest first, so `since` and the cursor are position bounds
+        lo, hi = 0, len(self.rows)
+        if since is not None:
+            hi = bisect_right(self.rows, -_utc(since).timestamp(), key=_newest_first)
+        if cursor:
+            lo = self.start_after(cursor)
+        start, stop = bisect_left(positions, lo), bisect_left(positions, hi)
+
+        page: List[Row] = []
+        more = False
+        for pos in positions[start:stop]:
+            row = self.rows[pos]
+            if auth is not None and row[3] is not auth:
+                continue
+            if epc_prefix and not (row[1] or "").startswith(epc_prefix):
+                continue
+            if limit is not None and len(page) == limit:
+                more = True
+                break
+            page.append(row)
+
+        next_cursor = None
+        if more and page:
+            last = page[-1]
+            next_cursor = f"{(last[2] - _EPOCH) // _MICROSECOND}_{last[0]}"
+        return page, next_cursor
+
+    def summary(self) -> dict:
+        return {
+            "total": len(self.rows),
+            "passed": len(self.by_auth[True]),
+            "failed": len(self.by_auth[False]),
+            "pending": len(self.by_auth[None]),
+            "by_info": {info: len(pos) for info, pos in self.by_info.items()},
+        }
+
+
+def current_view(state) -> ActiveTagsView:
+    version = (state.active_tags.version, state.tag_info_cache.version, state.verifier.version)
+    view = getattr(state, "active_tags_view", None)
+    if view is None or view.version != version:
+        view = ActiveTagsView(version, state.active_tags, state.tag_info_cache, state.verifier)
+        state.active_tags_view = view
+    return view
+
+
+# async so it runs on the event loop next to the reader (no cross-thread
+# access to the shared state). The view is rebuilt only when the tag set, a
+# verdict or the pending set changes; unfiltered polls in between return the
+# same bytes.
+@router.get("/active-tags", response_model=list[ScanResult])
+async def active_tags(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    auth: Optional[bool] = None,
+    info: Optional[str] = None,
+    since: Optional[datetime] = None,
+    epc_prefix: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """
+    Active tags, newest first_seen first. All parameters are optional:
+    auth / info (e.g. "Verification Pending") / since (first_seen >= since) /
+    epc_prefix filter; fields=tidHex,auth returns only those fields; limit
+    pages the result, and the X-Next-Cursor response header is the cursor
+    for the next page.
+    """
+    view = current_view(request.app.state)
+
+    include = None
+    if fields:
+        include = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = include - _FIELDS
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"unknown fields: {', '.join(sorted(unknown))}")
+
+    if not any((limit, cursor, auth is not None, info is not None, since, epc_prefix, include)):
+        return Response(content=view.full_json(), media_type="application/json")
+
+    try:
+        page, next_cursor = view.query(auth, info, since, epc_prefix, cursor, limit)
+    except (ValueError, OverflowError):
+        # OverflowError: a cursor timestamp beyond datetime's range
+        raise HTTPException(status_code=422, detail="invalid cursor")
+
+    results = [_row_result(r) for r in page]
+    body = _scan_results.dump_json(results, include={"__all__": include} if include else None)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/active-tags/summary")
+async def active_tags_summary(request: Request):
+    """
+    Tag counts (total, passed, failed, pending, per info) without the tags.
+    """
+    return current_view(request.app.state).summary()
+
+
 @router.get("/reader-status")
 def reader_status(request: Request):
-    return {"connected": request.app.state.reader_connected}
\ No newline at end of file
+    """
+    connected: at least one reader is streaming.
+    readers: per-reader state (connecting / streaming / backoff / stopped),
+    event and reconnect counts, last error and next retry time.
+    """
+    readers = request.app.state.readers
+    return {"connected": readers.connected, "readers": readers.stats()}
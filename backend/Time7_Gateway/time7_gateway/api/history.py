@@ -0,0 +1,48 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+router = APIRouter()
+
+
+def _unix(value: datetime) -> float:
+    # naive datetimes are taken as UTC, like the reader timestamps
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@router.get("/history")
+async def history(
+    request: Request,
+    tid: Optional[str] = Query(None, description="tidHex: this tag's sightings, newest first"),
+    since: Optional[datetime] = Query(None, description="start of the time range (required without tid)"),
+    until: Optional[datetime] = Query(None, description="end of the time range (default: now)"),
+    limit: int = Query(1000, ge=1, le=100_000),
+):
+    """
+    Sighting history from the sighting log (SIGHTING_LOG_DIR).
+
+    With tid: where and when that tag was seen (reader, antenna, peak RSSI,
+    reads and verdict per flush interval). Without: every tag seen between
+    since and until, with first/last sighting, readers and latest verdict.
+    Sightings from the last SIGHTING_FLUSH_SECONDS may not be included yet.
+    """
+    log = getattr(request.app.state, "sighting_log", None)
+    if log is None:
+        raise HTTPException(status_code=404, detail="sighting log disabled (SIGHTING_LOG_DIR unset)")
+    until = until or datetime.now(timezone.utc)
+    start, end = (_unix(since) if since is not None else None), _unix(until)
+    if start is not None and start > end:
+        raise HTTPException(status_code=422, detail="since is after until")
+
+    # segment files are read in a worker thread
+    if tid:
+        sightings = await asyncio.to_thread(log.history, tid, start or 0.0, end, limit)
+        return {"tidHex": tid, "sightings": sightings}
+    if start is None:
+        raise HTTPException(status_code=422, detail="tid or since is required")
+    tags = await asyncio.to_thread(log.present, start, end, limit)
+    return {"since": since, "until": until, "tags": tags}
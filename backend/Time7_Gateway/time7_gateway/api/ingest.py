@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Query, Request
+
+from time7_gateway.clients.event_decoder import JSONArraySplitter, NDJSONSplitter, decode_lines
+from time7_gateway.clients.reader_client import apply_tag_updates, collapse_events
+from time7_gateway.services.metrics import DECODE_SECONDS, PUSH_EVENTS
+
+router = APIRouter()
+
+
+class PushBatch:
+
+    # Accounting for one pushed body; events are applied in slices of
+    # batch_max through the same collapse/apply path as the reader stream.
+
+    __slots__ = (
+        "state", "batch_max", "max_lag", "reader", "pending", "lines", "events", "tags", "submitted", "slices",
+    )
+
+    def __init__(self, state, batch_max: int, max_lag: float, reader: str = "push") -> None:
+        self.state = state
+        self.batch_max = batch_max
+        self.max_lag = max_lag
+        self.reader = reader  # name recorded in the sighting log
+        self.pending = []
+        self.lines = self.events = self.tags = self.submitted = self.slices = 0
+
+    def add(self, lines) -> None:
+        if not lines:
+            return
+        tracer = getattr(self.state, "tracer", None)
+        received_at = time.time() if tracer is not None else 0.0
+        t0 = time.perf_counter()
+        events = list(decode_lines(lines))
+        DECODE_SECONDS.observe(time.perf_counter() - t0)
+        self.lines += sum(1 for line in lines if line)
+        if events and tracer is not None:
+            tracer.on_decoded(events, received_at, time.time())
+        self.add_events(events)
+
+    def add_events(self, events) -> None:
+        if not events:
+            return
+        self.events += len(events)
+        sightings = getattr(self.state, "sighting_log", None)
+        if sightings is not None:
+            sightings.record(events, self.reader)
+        self.pending.extend(events)
+        if len(self.pending) >= self.batch_max:
+            self.apply()
+
+    def apply(self) -> None:
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        state = self.state
+        for i in range(0, len(pending), self.batch_max):
+            latest = collapse_events(pending[i:i + self.batch_max])
+            self.submitted += apply_tag_updates(
+                latest,
+                seen_at=datetime.now(timezone.utc),
+                active_tags=state.active_tags,
+                cache=state.tag_info_cache,
+                verifier=state.verifier,
+                db_writer=state.db_writer,
+                tracer=getattr(state, "tracer", None),
+                max_lag=self.max_lag,
+            )
+            self.tags += len(latest)
+            self.slices += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "ok": True,
+            "lines": self.lines,
+            "events": self.events,
+            "skipped": self.lines - self.events,
+            "tags": self.tags,
+            "verifications_started": self.submitted,
+            "batches": self.slices,
+        }
+
+
+# Push ingest for readers/edge agents that POST batches of tagInventory
+# events (Impinj HTTP webhook style) instead of being streamed from. The body
+# is NDJSON or a JSON array of events; it is read and applied chunk by chunk,
+# never held whole. Verification and persistence stay asynchronous (verifier
+# and write-behind DB queue), hence 202.
+@router.post("/ingest/events", status_code=202)
+async def ingest_events(request: Request, reader: str = Query("push", max_length=64)):
+    """
+    Body: NDJSON or a JSON array of reader events (non-tagInventory events are
+    skipped); `reader` names the sender in the sighting log. Returns the
+    counts for this body: lines/elements read, events decoded, unique tags per
+    batch, verifications started and batches applied.
+    """
+    state = request.app.state
+    batch = PushBatch(
+        state,
+        batch_max=getattr(state, "ingest_batch_max", 1000),
+        max_lag=getattr(state, "reader_max_lag", 60.0),
+        reader=reader,
+    )
+
+    splitter = None
+    async for chunk in request.stream():
+        if splitter is None:
+            head = chunk.lstrip()
+            if not head:
+                continue
+            # format from the first byte: "[" is an array, anything else NDJSON
+            splitter = JSONArraySplitter() if head[:1] == b"[" else NDJSONSplitter()
+        batch.add(splitter.feed(chunk))
+    if splitter is not None:
+        batch.add(splitter.flush())
+    batch.apply()
+
+    PUSH_EVENTS.inc(amount=batch.events)
+    return batch.as_dict()
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from time7_gateway.api.dashboard import build_active_tags, scan_result, scan_results_json
+
+router = APIRouter()
+
+TICK_SECONDS = float(os.getenv("LIVE_FEED_TICK_SECONDS", "0.25"))
+KEEPALIVE_SECONDS = 15.0
+
+
+def _sse(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+def _snapshot(state) -> bytes:
+    rows = build_active_tags(state.active_tags, state.tag_info_cache, state.verifier)
+    return _sse("snapshot", scan_results_json(rows))
+
+
+def _delta(state, changed) -> bytes:
+    # current row for every changed tag; tags that are gone (expired, or
+    # no verdict and no longer pending) are sent as removals
+    upsert, remove = [], []
+    for tid in changed:
+        t = state.active_tags.get(tid)
+        row = scan_result(t, state.tag_info_cache, state.verifier) if t is not None else None
+        if row is None:
+            remove.append(tid)
+        else:
+            upsert.append(row)
+    return _sse(
+        "delta",
+        b'{"upsert":' + scan_results_json(upsert) + b',"remove":' + json.dumps(remove).encode() + b"}",
+    )
+
+
+async def _stream(request: Request, hub):
+    state = request.app.state
+    sub = hub.subscribe()
+    try:
+        yield _snapshot(state)
+
+        while True:
+            try:
+                await asyncio.wait_for(sub.wakeup.wait(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+
+            # coalesce everything that changes within one tick
+            await asyncio.sleep(TICK_SECONDS)
+
+            if sub.resync:
+                # slow consumer fell too far behind: start over from a snapshot
+                sub.resync = False
+                sub.take()
+                yield _snapshot(state)
+                continue
+
+            changed = sub.take()
+            if changed:
+                # the generator is only resumed once the previous chunk has
+                # been sent, so a slow client never queues more than one tick
+                yield _delta(state, changed)
+                tracer = getattr(state, "tracer", None)
+                if tracer:
+                    tracer.mark_many(changed, "pushed")
+    finally:
+        hub.unsubscribe(sub)
+
+
+@router.get("/active-tags/stream")
+async def active_tags_stream(request: Request):
+    """
+    Server-Sent Events: one `snapshot` event with the full /api/active-tags
+    list, then `delta` events ({"upsert": [...], "remove": [tidHex, ...]})
+    for tags that were added, got a verdict, or expired.
+    """
+    return StreamingResponse(
+        _stream(request, request.app.state.live_feed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
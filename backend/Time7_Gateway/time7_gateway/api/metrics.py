@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from time7_gateway.services.metrics import REGISTRY, Registry
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def register_state_metrics(app, registry: Registry = REGISTRY) -> None:
+    # Everything below is already counted by the components themselves; the
+    # callbacks only read it when /metrics is scraped.
+    state = app.state
+
+    def per_reader(key):
+        return lambda: {(r["name"],): r.get(key) for r in state.readers.stats()}
+
+    registry.counter_func(
+        "time7_reader_events_total", "tagInventory events received, per reader",
+        per_reader("events"), ["reader"],
+    )
+    registry.gauge_func(
+        "time7_reader_connected", "1 while the reader stream is open",
+        lambda: {(r["name"],): int(bool(r.get("connected"))) for r in state.readers.stats()}, ["reader"],
+    )
+    registry.counter_func(
+        "time7_reader_reconnects_total", "Successful (re)connections, per reader",
+        per_reader("connects"), ["reader"],
+    )
+
+    registry.counter_func(
+        "time7_cache_requests_total", "TagInfoCache lookups by result",
+        lambda: {("hit",): state.tag_info_cache.hits, ("miss",): state.tag_info_cache.misses}, ["result"],
+    )
+    registry.counter_func(
+        "time7_cache_evictions_total", "TagInfoCache LRU evictions",
+        lambda: state.tag_info_cache.evictions,
+    )
+    registry.gauge_func(
+        "time7_cache_entries", "Verdicts held in TagInfoCache",
+        lambda: len(state.tag_info_cache),
+    )
+
+    registry.gauge_func(
+        "time7_active_tags", "Tags currently shown as active",
+        lambda: len(state.active_tags),
+    )
+
+    registry.gauge_func(
+        "time7_ias_in_flight", "IAS verifications currently running or queued",
+        lambda: state.verifier.stats()["in_flight"],
+    )
+    registry.counter_func(
+        "time7_ias_deduplicated_total", "Cache misses that joined an in-flight verification",
+        lambda: state.verifier.deduplicated,
+    )
+
+    registry.counter_func(
+        "time7_db_rows_written_total", "Rows upserted to the database",
+        lambda: state.db_writer.rows_written,
+    )
+    registry.counter_func(
+        "time7_db_writes_saved_total", "Writes skipped because the verdict was unchanged",
+        lambda: state.db_writer.writes_saved,
+    )
+    registry.counter_func(
+        "time7_db_rows_dropped_total", "Rows dropped because the write queue was full",
+        lambda: state.db_writer.dropped,
+    )
+    registry.counter_func(
+        "time7_db_flush_errors_total", "Failed database flushes",
+        lambda: state.db_writer.flush_errors,
+    )
+    registry.gauge_func(
+        "time7_db_queue_depth", "Rows waiting in the write-behind queue",
+        lambda: state.db_writer.stats()["queue_depth"],
+    )
+
+    registry.gauge_func(
+        "time7_live_feed_subscribers", "Connected live feed (SSE) clients",
+        lambda: len(state.live_feed),
+    )
+
+
+# async so it renders on the event loop: the counters, histograms and the
+# state callbacks above are only consistent between loop steps
+@router.get("/metrics")
+async def metrics(request: Request):
+    """
+    Prometheus text exposition of the gateway metrics.
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
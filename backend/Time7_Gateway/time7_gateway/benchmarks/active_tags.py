@@ -0,0 +1,103 @@
+"""
+ActiveTags at large tag counts: memory per tag, snapshot/dashboard build time
+and sync_seen throughput.
+
+Memory is what tracemalloc sees ActiveTags allocate for N tags, on top of the
+TID/EPC strings (which the reader path and the verdict cache hold anyway).
+
+    python -m time7_gateway.benchmarks.active_tags --tags 10000 100000 300000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from time7_gateway.api.dashboard import build_active_tags, scan_results_json
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+BATCH = 256
+
+
+class NotPending:
+    def is_pending(self, tidHex: str) -> bool:
+        return False
+
+
+def ids(n: int):
+    return [f"E2806890{i:016X}" for i in range(n)], [f"3036{i:020X}" for i in range(n)]
+
+
+def fill(at: ActiveTags, tids, epcs, start: datetime) -> None:
+    for k in range(0, len(tids), BATCH):
+        chunk = tids[k:k + BATCH]
+        at.sync_seen(chunk, epcHex=dict(zip(chunk, epcs[k:k + BATCH])),
+                     seen_at=start + timedelta(milliseconds=k // BATCH))
+
+
+def measure(n: int) -> dict:
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    # memory: TID/EPC strings are created first and stay alive (the reader
+    # path and TagInfoCache hold them too), so this is ActiveTags' own
+    # per-tag overhead
+    tids, epcs = ids(n)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    at = ActiveTags(remove_grace_seconds=3600.0)
+    fill(at, tids, epcs, start)
+    gc.collect()
+    bytes_per_tag = (tracemalloc.get_traced_memory()[0] - base) / n
+    tracemalloc.stop()
+
+    # re-read every tag once (steady-state sighting cost)
+    t0 = time.perf_counter()
+    fill(at, tids, epcs, start + timedelta(seconds=1))
+    sync_rate = n / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    at.get_active()
+    get_active_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    at.snapshot()
+    snapshot_ms = (time.perf_counter() - t0) * 1000.0
+
+    cache = TagInfoCache(max_entries=n + 1)
+    for tid in tids:
+        cache.set(tid, True, "Authentication Passed")
+    t0 = time.perf_counter()
+    body = scan_results_json(build_active_tags(at, cache, NotPending()))
+    dashboard_ms = (time.perf_counter() - t0) * 1000.0
+
+    return {
+        "tags": n,
+        "bytes_per_tag": bytes_per_tag,
+        "resighting_tags_per_sec": sync_rate,
+        "get_active_ms": get_active_ms,
+        "snapshot_ms": snapshot_ms,
+        "dashboard_build_ms": dashboard_ms,
+        "dashboard_bytes": len(body),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    results = []
+    for n in args.tags:
+        r = measure(n)
+        results.append(r)
+        print(f"{n:>8} tags  {r['bytes_per_tag']:>6.0f} B/tag  {r['resighting_tags_per_sec']:>10,.0f} tags/s  "
+              f"get_active {r['get_active_ms']:>7.1f} ms  snapshot {r['snapshot_ms']:>7.1f} ms  "
+              f"dashboard {r['dashboard_build_ms']:>7.1f} ms")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
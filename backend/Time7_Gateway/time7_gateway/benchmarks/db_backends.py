@@ -0,0 +1,76 @@
+"""
+Upsert throughput per persistence backend (rows/s), at several batch sizes,
+each batch half new tags and half updates of earlier ones.
+
+sqlite always runs (temporary file). postgres runs when DATABASE_URL is set
+(the "data" table must exist, see README 1.3); supabase when SUPABASE_URL and
+SUPABASE_SERVICE_ROLE_KEY are set. Both write real rows with E2BENCH TIDs.
+
+    python -m time7_gateway.benchmarks.db_backends --rows 20000 --batch 100 500 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from time7_gateway.services.database import PostgresRepository, SQLiteRepository, SupabaseRepository, tag_row
+
+
+def batches(rows: int, batch: int):
+    now = datetime.now(timezone.utc)
+    out, fresh = [], 0
+    while fresh < rows:
+        half = batch // 2
+        new = [tag_row(f"E2BENCH{fresh + i:017X}", now, True, "Authentication Passed", None) for i in range(batch - half)]
+        fresh += len(new)
+        old = [tag_row(f"E2BENCH{i:017X}", now, False, "Authentication Failed", None) for i in range(min(half, fresh))]
+        out.append(new + old)
+    return out
+
+
+async def run(repo, rows: int, batch: int) -> dict:
+    work = batches(rows, batch)
+    t0 = time.perf_counter()
+    for b in work:
+        await repo.upsert_tags(b)
+    elapsed = time.perf_counter() - t0
+    written = sum(len(b) for b in work)
+    return {"backend": repo.name, "batch": batch, "rows": written, "rows_per_sec": written / elapsed}
+
+
+def backends(tmp: str):
+    yield SQLiteRepository(os.path.join(tmp, "bench.db"))
+    if os.getenv("DATABASE_URL"):
+        yield PostgresRepository(os.environ["DATABASE_URL"])
+    if os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY"):
+        yield SupabaseRepository()
+
+
+async def main_async(args) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for repo in backends(tmp):
+            await repo.open()
+            try:
+                for batch in args.batch:
+                    r = await run(repo, args.rows, batch)
+                    results.append(r)
+                    print(f"{r['backend']:>9}  batch {batch:>6}  {r['rows_per_sec']:>12,.0f} rows/s")
+            finally:
+                await repo.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000, help="new tags per run (updates come on top)")
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 500, 5000])
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Reader stream decoding: events/sec for the old per-line path (bytes -> str
+-> json.loads -> dict lookups) against the chunked byte path with each
+available backend.
+
+Replays simulators/t7datastream.ndjson, repeated, in fixed-size chunks.
+
+    python -m time7_gateway.benchmarks.decode --repeat 200 --chunk 65536
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from time7_gateway.clients.event_decoder import DECODERS, NDJSONSplitter, decode_lines
+
+SIM_DIR = Path(__file__).resolve().parent.parent / "simulators"
+
+
+def old_path(chunks):
+    # what stream_events + run_reader_stream did per event before
+    n = 0
+    tail = ""
+    for chunk in chunks:
+        text = tail + chunk.decode("utf-8")
+        lines = text.split("\n")
+        tail = lines.pop()
+        for line in lines:
+            if not line:
+                continue
+            ev = json.loads(line)
+            if ev.get("eventType") != "tagInventory":
+                continue
+            tie = ev.get("tagInventoryEvent") or {}
+            tie.get("tidHex")
+            tie.get("epcHex")
+            tie.get("tagAuthenticationResponse") or {}
+            n += 1
+    return n
+
+
+def new_path(chunks, backend):
+    n = 0
+    splitter = NDJSONSplitter()
+    for chunk in chunks:
+        for _ in decode_lines(splitter.feed(chunk), backend):
+            n += 1
+    for _ in decode_lines(splitter.flush(), backend):
+        n += 1
+    return n
+
+
+def run(name, fn, chunks):
+    start = time.perf_counter()
+    n = fn(chunks)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<14} {n:>9} events  {elapsed:7.3f} s  {n / elapsed:>12,.0f} ev/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--chunk", type=int, default=65536)
+    parser.add_argument("--file", default=str(SIM_DIR / "t7datastream.ndjson"))
+    args = parser.parse_args()
+
+    raw = Path(args.file).read_bytes()
+    if not raw.endswith(b"\n"):
+        raw += b"\n"
+    body = raw * args.repeat
+    chunks = [body[i:i + args.chunk] for i in range(0, len(body), args.chunk)]
+    print(f"{len(body) / 1e6:.1f} MB in {len(chunks)} chunks of {args.chunk} bytes\n")
+
+    run("str+json", old_path, chunks)
+    for backend in sorted(DECODERS):
+        run(f"bytes+{backend}", lambda c, b=backend: new_path(c, b), chunks)
+
+
+if __name__ == "__main__":
+    main()
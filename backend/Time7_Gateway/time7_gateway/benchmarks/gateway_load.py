@@ -0,0 +1,321 @@
+"""
+Load and soak benchmark for the whole gateway.
+
+Runs the real ASGI app (main.create_app) under uvicorn with its reader pointed
+at a simulated reader, IAS_MODE=real against the local IAS stand-in
+(simulators/ias_server) and an in-memory table in place of Supabase. While the
+stream runs, --pollers clients poll the dashboard endpoints. Reports:
+
+  - events/s ingested (reader event counters)
+  - read-to-stage latency percentiles from the sampled tracer (/debug/latency),
+    "verified" being read-to-verdict
+  - process RSS and gateway state sizes sampled over the run (soak growth)
+  - dashboard endpoint latency percentiles under concurrent polling
+
+The result is written as JSON (--out) and can be checked against an earlier
+run with --compare.
+
+    # replay the reader_streamer fixture as fast as it goes
+    python -m time7_gateway.benchmarks.gateway_load --source replay --rate 0
+    # 50k tags in range, 200 arriving/leaving per second, 5000 reads/s for
+    # 10 minutes, 8 dashboard pollers
+    python -m time7_gateway.benchmarks.gateway_load --field 50000 --churn 200 --rate 5000 --seconds 600 --pollers 8
+    # compare with an earlier run
+    python -m time7_gateway.benchmarks.gateway_load --compare bench-results/gateway_load-20260101T000000Z.json
+
+RSS is for the whole benchmark process, so it includes the simulated reader
+and IAS threads; their footprint is fixed after startup, so growth over the run
+is the gateway's.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from time7_gateway.benchmarks.harness import percentiles, serve_in_thread
+from time7_gateway.simulators import ias_server, reader_streamer
+from time7_gateway.simulators.synthetic_stream import SyntheticTagStream, parse_mix
+
+DASHBOARD_PATHS = ("/api/active-tags", "/api/reader-status")
+
+# compared by --compare: (path into the result, higher is better)
+KEY_METRICS = (
+    (("events_per_sec",), True),
+    (("read_to_stage_ms", "verified", "p50"), False),
+    (("read_to_stage_ms", "verified", "p99"), False),
+    (("dashboard_ms", "/api/active-tags", "p50"), False),
+    (("dashboard_ms", "/api/active-tags", "p99"), False),
+    (("memory", "rss_growth_mb"), False),
+)
+
+
+class MemoryDB:
+
+    # stands in for the Supabase "data" table: upsert by tid_hex
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, dict] = {}
+        self.upserts = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, rows: List[dict]) -> None:
+        with self._lock:
+            for row in rows:
+                self.rows[row["tid_hex"]] = row
+            self.upserts += 1
+
+
+def synthetic_app(stream: SyntheticTagStream, rate: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/data/stream")
+    async def data_stream():
+        return StreamingResponse(stream.stream(rate), media_type="application/x-ndjson")
+
+    return app
+
+
+def replay_app(rate_hz: float, speed: float) -> FastAPI:
+    # the reader_streamer simulator, with the rate chosen by the benchmark
+    app = FastAPI()
+
+    @app.get("/data/stream")
+    async def data_stream():
+        return StreamingResponse(
+            reader_streamer.ndjson_line_stream(loop=True, rate_hz=rate_hz, speed=speed),
+            media_type="application/x-ndjson",
+        )
+
+    return app
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3  # peak, not current
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+async def poll(client: httpx.AsyncClient, interval: float, stop: asyncio.Event, latencies: Dict[str, list]) -> None:
+    # one dashboard client: cycles through the dashboard endpoints
+    while not stop.is_set():
+        for path in DASHBOARD_PATHS:
+            t0 = time.perf_counter()
+            r = await client.get(path)
+            latencies[path].append((time.perf_counter() - t0) * 1000.0)
+            r.raise_for_status()
+        if interval:
+            await asyncio.sleep(interval)
+
+
+async def measure(base_url: str, state, db: MemoryDB, args) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+
+        async def reader_events() -> int:
+            r = await client.get("/debug/metrics")
+            return sum(s["events"] for s in r.json()["readers"])
+
+        deadline = time.monotonic() + 15.0
+        while not state.readers.connected:
+            if time.monotonic() > deadline:
+                raise RuntimeError("gateway did not connect to the simulated reader")
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(args.warmup)
+
+        events0 = await reader_events()
+        rss0 = rss_mb()
+        t0 = time.perf_counter()
+
+        stop = asyncio.Event()
+        latencies: Dict[str, list] = {p: [] for p in DASHBOARD_PATHS}
+        pollers = [
+            asyncio.create_task(poll(client, args.poll_interval, stop, latencies))
+            for _ in range(args.pollers)
+        ]
+
+        samples = []
+        while (elapsed := time.perf_counter() - t0) < args.seconds:
+            await asyncio.sleep(min(args.sample_every, args.seconds - elapsed))
+            samples.append({
+                "t": round(time.perf_counter() - t0, 2),
+                "events": await reader_events() - events0,
+                "rss_mb": round(rss_mb(), 1),
+                "active_tags": len(state.active_tags),
+                "cached_verdicts": len(state.tag_info_cache),
+                "db_rows": len(db.rows),
+            })
+            s = samples[-1]
+            print(f"  t={s['t']:>7.1f}s  events={s['events']:>10,}  rss={s['rss_mb']:>7.1f} MB  "
+                  f"active={s['active_tags']:>7,}  cached={s['cached_verdicts']:>7,}")
+
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        await asyncio.gather(*pollers)
+
+        events = await reader_events() - events0
+        lag = (await client.get("/debug/latency")).json()["lag_seconds"]
+        debug_metrics = (await client.get("/debug/metrics")).json()
+
+    # growth after the first sample, so one-off startup allocations don't count
+    first = samples[0]["rss_mb"] if samples else rss0
+    last = samples[-1]["rss_mb"] if samples else rss0
+    span_min = (samples[-1]["t"] - samples[0]["t"]) / 60.0 if len(samples) > 1 else 0.0
+    return {
+        "events": events,
+        "seconds": elapsed,
+        "events_per_sec": events / elapsed,
+        "read_to_stage_ms": {
+            stage: None if p is None else {k: (v * 1000.0 if k != "n" else v) for k, v in p.items()}
+            for stage, p in lag.items()
+        },
+        "dashboard_ms": {path: {"n": len(v), **percentiles(v)} for path, v in latencies.items()},
+        "memory": {
+            "rss_start_mb": rss0,
+            "rss_end_mb": last,
+            "rss_growth_mb": last - first,
+            "rss_growth_mb_per_min": (last - first) / span_min if span_min else None,
+        },
+        "gateway": debug_metrics,
+        "samples": samples,
+    }
+
+
+def run(args) -> dict:
+    db = MemoryDB()
+    stream = None
+    if args.source == "replay":
+        if args.file:
+            reader_streamer.DATA_FILE = Path(args.file)
+        reader = replay_app(args.rate, args.speed)
+    else:
+        stream = SyntheticTagStream(args.tags, args.field, args.zipf, args.churn, parse_mix(args.mix))
+        reader = synthetic_app(stream, args.rate)
+
+    with serve_in_thread(reader) as reader_url, \
+            serve_in_thread(ias_server.create_app(args.ias_latency_ms)) as ias_url:
+        env = {
+            "READER_URLS": f"sim={reader_url}",
+            "IAS_MODE": "real",
+            "IAS_BASE_URL": ias_url,
+            "TRACE_SAMPLE_EVERY": str(args.trace_every),
+            "READER_BATCH_MAX": str(args.batch_max),
+            "INGEST_WORKERS": "0",
+        }
+        # kept for the whole run: the IAS client reads its settings lazily
+        saved = {k: os.environ.get(k) for k in env}
+        os.environ.update(env)
+        try:
+            from time7_gateway.main import create_app
+            app = create_app(db_upsert=db.upsert)
+            with serve_in_thread(app) as base_url:
+                result = asyncio.run(measure(base_url, app.state, db, args))
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+    result["db_rows"] = len(db.rows)
+    if stream is not None:
+        result["reader"] = stream.stats()
+    return result
+
+
+def lookup(result: dict, path):
+    for key in path:
+        if not isinstance(result, dict) or result.get(key) is None:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(current: dict, baseline: dict) -> None:
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for path, higher_is_better in KEY_METRICS:
+        old, new = lookup(baseline["result"], path), lookup(current["result"], path)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100.0 if old else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  <-- worse" if worse and abs(change) >= 10.0 else ""
+        print(f"{'.'.join(path):<40} {old:>12.2f} {new:>12.2f} {change:>+7.1f}%{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=["synthetic", "replay"], default="synthetic")
+    parser.add_argument("--tags", type=int, default=1_000_000, help="tag population (synthetic)")
+    parser.add_argument("--field", type=int, default=10_000, help="tags in range at once (synthetic)")
+    parser.add_argument("--zipf", type=float, default=1.0, help="re-read skew, 0 = uniform (synthetic)")
+    parser.add_argument("--churn", type=float, default=50.0, help="arrivals/departures per second (synthetic)")
+    parser.add_argument("--mix", default="valid=0.9,tampered=0.04,disabled=0.03,unsupported=0.03")
+    parser.add_argument("--rate", type=float, default=2000.0,
+                        help="reads/s for synthetic, lines/s for replay; 0 = as fast as possible")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="replay at the recorded timestamp spacing, this many times faster (replay)")
+    parser.add_argument("--file", help="NDJSON fixture for replay (default: reader_streamer.DATA_FILE)")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--sample-every", type=float, default=5.0)
+    parser.add_argument("--pollers", type=int, default=4)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--ias-latency-ms", type=float, default=0.0)
+    parser.add_argument("--trace-every", type=int, default=100)
+    parser.add_argument("--batch-max", type=int, default=256)
+    parser.add_argument("--out", default=None, help="result file (default bench-results/gateway_load-<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    result = run(args)
+    doc = {
+        "benchmark": "gateway_load",
+        "started": started.isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+        "result": result,
+    }
+
+    out = Path(args.out or f"bench-results/gateway_load-{started:%Y%m%dT%H%M%SZ}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2))
+
+    verified = result["read_to_stage_ms"].get("verified") or {}
+    dash = result["dashboard_ms"]["/api/active-tags"]
+    print(f"\n{result['events_per_sec']:,.0f} ev/s  "
+          f"read-to-verdict p50 {verified.get('p50') or 0:.1f} ms p99 {verified.get('p99') or 0:.1f} ms  "
+          f"dashboard p50 {dash['p50'] or 0:.1f} ms p99 {dash['p99'] or 0:.1f} ms  "
+          f"rss growth {result['memory']['rss_growth_mb']:+.1f} MB")
+    print(f"written to {out}")
+
+    if args.compare:
+        compare(doc, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
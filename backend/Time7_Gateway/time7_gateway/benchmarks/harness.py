@@ -0,0 +1,49 @@
+import socket
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import uvicorn
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve_in_thread(app, port: int = 0) -> Iterator[str]:
+    """
+    Run an ASGI app under uvicorn on a background thread (own event loop),
+    so the server does not share the measured process's loop. Yields base URL.
+    """
+    port = port or free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 10.0
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"server on port {port} did not start")
+        time.sleep(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10.0)
+
+
+def percentiles(samples: List[float]) -> dict:
+    if not samples:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    if len(samples) == 1:
+        v = samples[0]
+        return {"p50": v, "p90": v, "p99": v, "max": v}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": q[49], "p90": q[89], "p99": q[98], "max": max(samples)}
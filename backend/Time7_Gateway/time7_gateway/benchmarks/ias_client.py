@@ -0,0 +1,84 @@
+"""
+IAS client throughput/latency against the local stand-in IAS.
+
+    python -m time7_gateway.benchmarks.ias_client --tags 5000 --concurrency 64 --batch 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from time7_gateway.benchmarks.harness import percentiles, serve_in_thread
+from time7_gateway.clients.ias_services import IASClient
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.simulators.ias_server import create_app
+from time7_gateway.utilities.simulate_encryption import generate_response
+
+
+def make_payloads(n: int) -> list[AuthPayload]:
+    out = []
+    for i in range(n):
+        tid = f"E280{i:020X}"
+        msg = f"{(i * 2654435761) & 0xFFFFFFFFFFFF:012X}"
+        out.append(AuthPayload(messageHex=msg, responseHex=generate_response(tid, msg), tidHex=tid))
+    return out
+
+
+async def run_single(client: IASClient, payloads, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(p):
+        async with sem:
+            t0 = time.perf_counter()
+            auth, _ = await client.lookup(p)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            assert auth
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in payloads))
+    elapsed = time.perf_counter() - t0
+    return {"tags_per_sec": len(payloads) / elapsed, "latency_ms": percentiles(latencies)}
+
+
+async def run_batch(client: IASClient, payloads, batch: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    chunks = [payloads[i:i + batch] for i in range(0, len(payloads), batch)]
+
+    async def one(chunk):
+        async with sem:
+            t0 = time.perf_counter()
+            results = await client.batch_lookup(chunk)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            assert all(auth for auth, _ in results)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(c) for c in chunks))
+    elapsed = time.perf_counter() - t0
+    return {"tags_per_sec": len(payloads) / elapsed, "batch_latency_ms": percentiles(latencies)}
+
+
+async def main_async(args) -> dict:
+    payloads = make_payloads(args.tags)
+    with serve_in_thread(create_app()) as base_url:
+        client = IASClient(base_url, deadline=10.0)
+        try:
+            await client.lookup(payloads[0])  # warm the connection pool
+            single = await run_single(client, payloads, args.concurrency)
+            batched = await run_batch(client, payloads, args.batch, max(1, args.concurrency // 8))
+        finally:
+            await client.aclose()
+    return {"tags": args.tags, "single": single, "batch": batched}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=200)
+    print(json.dumps(asyncio.run(main_async(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
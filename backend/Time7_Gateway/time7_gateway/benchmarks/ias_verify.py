@@ -0,0 +1,59 @@
+"""
+Mock IAS verification throughput: one mock_ias_lookup call per tag against
+mock_ias_lookup_batch, inline and spread over a process pool.
+
+"rehash" is the check as it was before the secret's SHA-256 state was
+precomputed (the whole secret + tid + challenge hashed per tag).
+
+    python -m time7_gateway.benchmarks.ias_verify --tags 200000 --workers 1 2 4
+"""
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from time7_gateway.benchmarks.ias_client import make_payloads
+from time7_gateway.simulators.ias_services import mock_ias_lookup, mock_ias_lookup_batch
+from time7_gateway.utilities.simulate_encryption import FAKE_SECRET
+
+
+def rehash_lookup(p):
+    digest = hashlib.sha256((FAKE_SECRET + p.tidHex + p.messageHex).encode()).hexdigest()
+    return (True, "Authentication Passed") if digest[:16] == p.responseHex else (False, "Authentication Failed")
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="*", default=[2])
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.tags)
+    expected = [mock_ias_lookup(p) for p in payloads]
+    n = len(payloads)
+    results = {}
+
+    results["rehash"] = n / timed(lambda: [rehash_lookup(p) for p in payloads])
+    results["single"] = n / timed(lambda: [mock_ias_lookup(p) for p in payloads])
+    results["batch"] = n / timed(lambda: mock_ias_lookup_batch(payloads))
+    for w in args.workers:
+        with ProcessPoolExecutor(w) as pool:
+            mock_ias_lookup_batch(payloads[:w * 2000], pool, w)  # start the workers
+            out = []
+            results[f"pool_{w}"] = n / timed(lambda: out.extend(mock_ias_lookup_batch(payloads, pool, w)))
+            assert out == expected
+
+    for name, rate in results.items():
+        print(f"{name:>10}  {rate:>12,.0f} verifications/s")
+    print(json.dumps({"tags": n, "per_sec": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Aggregate ingestion throughput with N readers streaming at once.
+
+Starts N simulated /data/stream endpoints (each on its own uvicorn thread,
+replaying simulators/datastream4.ndjson as fast as the socket allows, with
+per-reader tidHex so every reader contributes its own tags) and points a
+ReaderSupervisor at them. The gateway side is the real pipeline: ActiveTags,
+TagInfoCache, TagVerifier with the mock IAS; the DB writer is a no-op.
+
+    python -m time7_gateway.benchmarks.multi_reader --readers 1 2 4 8 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from time7_gateway.benchmarks.harness import serve_in_thread
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.reader_supervisor import ReaderConfig, ReaderSupervisor
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verifier import TagVerifier
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+
+SIM_DIR = Path(__file__).resolve().parent.parent / "simulators"
+
+
+class NullWriter:
+    def enqueue(self, **kwargs) -> bool:
+        return True
+
+    def skip(self) -> None:
+        pass
+
+
+def reader_body(path: Path, reader_no: int) -> bytes:
+    # same events, but tidHex made unique per reader
+    out = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        ev = json.loads(line)
+        tie = ev.get("tagInventoryEvent") or {}
+        if tie.get("tidHex"):
+            tie["tidHex"] = f"{reader_no:02X}{tie['tidHex'][2:]}"
+            tar = tie.get("tagAuthenticationResponse")
+            if tar and tar.get("tidHex"):
+                tar["tidHex"] = tie["tidHex"]
+        out.append(json.dumps(ev, separators=(",", ":")))
+    return ("\n".join(out) + "\n").encode()
+
+
+def reader_app(body: bytes, chunk: int = 65536) -> FastAPI:
+    app = FastAPI()
+
+    async def stream():
+        while True:
+            for i in range(0, len(body), chunk):
+                yield body[i:i + chunk]
+            await asyncio.sleep(0)
+
+    @app.get("/data/stream")
+    async def data_stream():
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+def gateway_state() -> SimpleNamespace:
+    state = SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=5.0),
+        tag_info_cache=TagInfoCache(),
+        db_writer=NullWriter(),
+    )
+    state.verifier = TagVerifier(mock_ias_lookup, state.tag_info_cache, state.db_writer)
+    return state
+
+
+async def measure(urls: list[str], seconds: float) -> dict:
+    app = SimpleNamespace(state=gateway_state())
+    sup = ReaderSupervisor(app, [ReaderConfig(f"sim-{i}", url) for i, url in enumerate(urls)])
+
+    sup.start()
+    while not all(s.connected for s in sup.status.values()):
+        await asyncio.sleep(0.01)
+
+    start_events = {name: s.events for name, s in sup.status.items()}
+    t0 = time.perf_counter()
+    await asyncio.sleep(seconds)
+    elapsed = time.perf_counter() - t0
+    per_reader = {name: s.events - start_events[name] for name, s in sup.status.items()}
+
+    await sup.stop()
+    await app.state.verifier.drain()
+
+    total = sum(per_reader.values())
+    return {
+        "readers": len(urls),
+        "events_per_sec": total / elapsed,
+        "per_reader_events_per_sec": {k: v / elapsed for k, v in per_reader.items()},
+        "active_tags": len(app.state.active_tags),
+        "cached_verdicts": len(app.state.tag_info_cache),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--file", default=str(SIM_DIR / "datastream4.ndjson"))
+    args = parser.parse_args()
+
+    path = Path(args.file)
+    results = []
+    for n in args.readers:
+        with ExitStack() as stack:
+            urls = [stack.enter_context(serve_in_thread(reader_app(reader_body(path, i)))) for i in range(n)]
+            r = asyncio.run(measure(urls, args.seconds))
+        results.append(r)
+        print(f"{n:>3} readers  {r['events_per_sec']:>10,.0f} ev/s total  "
+              f"{r['events_per_sec'] / n:>10,.0f} ev/s per reader  {r['active_tags']:>6} active tags")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
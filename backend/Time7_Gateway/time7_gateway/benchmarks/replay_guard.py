@@ -0,0 +1,79 @@
+"""
+ReplayGuard: memory per million remembered challenges, measured false-positive
+rate, and add/lookup cost, against an exact Python set of (tid, challenge).
+
+    python -m time7_gateway.benchmarks.replay_guard --challenges 1000000 --fp 1e-6 1e-4
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from time7_gateway.services.replay_guard import ReplayGuard
+
+
+def pairs(n: int, offset: int = 0):
+    return [(f"E2806890{i:016X}", f"{(i * 2654435761) & 0xFFFFFFFFFFFF:012X}") for i in range(offset, offset + n)]
+
+
+def set_bytes(items) -> int:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    exact = {(tid, msg) for tid, msg in items}  # the tuples are what a set would add
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del exact
+    return size
+
+
+def measure(n: int, fp: float, seen, unseen) -> dict:
+    guard = ReplayGuard(window=1e9, capacity=n, fp_rate=fp, clock=lambda: 0.0)
+
+    t0 = time.perf_counter()
+    for tid, msg in seen:
+        guard.add(tid, msg, now=0.0)
+    add_rate = n / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    false_hits = sum(guard.seen(tid, msg, now=0.0) for tid, msg in unseen)
+    lookup_rate = len(unseen) / (time.perf_counter() - t0)
+
+    missed = sum(not guard.seen(tid, msg, now=0.0) for tid, msg in seen[:10_000])
+    assert missed == 0  # a Bloom filter never forgets what it holds
+
+    return {
+        "challenges": n,
+        "target_fp": fp,
+        "measured_fp": false_hits / len(unseen),
+        "hashes": guard.hashes,
+        "bytes_per_million": guard.nbytes / n * 1_000_000,
+        "add_per_sec": add_rate,
+        "lookup_per_sec": lookup_rate,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--challenges", type=int, default=1_000_000)
+    parser.add_argument("--probes", type=int, default=1_000_000, help="unseen challenges looked up for the FP rate")
+    parser.add_argument("--fp", type=float, nargs="+", default=[1e-6, 1e-4])
+    args = parser.parse_args()
+
+    seen = pairs(args.challenges)
+    unseen = pairs(args.probes, offset=args.challenges)
+
+    results = [measure(args.challenges, fp, seen, unseen) for fp in args.fp]
+    exact = set_bytes(seen) / args.challenges * 1_000_000
+
+    for r in results:
+        print(f"fp {r['target_fp']:.0e}: measured {r['measured_fp']:.1e}, k={r['hashes']}, "
+              f"{r['bytes_per_million'] / 2**20:6.2f} MiB/M, "
+              f"add {r['add_per_sec']:>9,.0f}/s, lookup {r['lookup_per_sec']:>9,.0f}/s")
+    print(f"exact set: {exact / 2**20:6.2f} MiB/M (plus the strings)")
+    print(json.dumps({"guard": results, "set_bytes_per_million": exact}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Ingestion scaling across worker processes.
+
+Starts R simulated readers, each in its own process (so they do not compete
+with the gateway for the GIL), replaying simulators/datastream4.ndjson with
+per-reader tidHex. Then measures events/sec reaching the shared state:
+
+  inproc   ReaderSupervisor, every reader on the gateway's event loop
+           (micro-batched, READER_BATCH_MAX=256)
+  W=1..N   ShardedIngest with W worker processes
+
+    python -m time7_gateway.benchmarks.sharded_ingest --readers 8 --workers 1 2 4 8 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import socket
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import uvicorn
+
+from time7_gateway.benchmarks.harness import free_port
+from time7_gateway.benchmarks.multi_reader import SIM_DIR, gateway_state, reader_app, reader_body
+from time7_gateway.services.reader_supervisor import ReaderConfig, ReaderSupervisor
+from time7_gateway.services.sharded_ingest import ShardedIngest
+
+
+def _serve_reader(port: int, path: str, reader_no: int) -> None:
+    app = reader_app(reader_body(Path(path), reader_no))
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def start_readers(n: int, path: Path):
+    ctx = mp.get_context("spawn")
+    procs, urls = [], []
+    for i in range(n):
+        port = free_port()
+        p = ctx.Process(target=_serve_reader, args=(port, str(path), i), daemon=True)
+        p.start()
+        procs.append(p)
+        urls.append(f"http://127.0.0.1:{port}")
+
+    for url in urls:
+        port = int(url.rsplit(":", 1)[1])
+        deadline = time.monotonic() + 20.0
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"reader on port {port} did not start")
+                time.sleep(0.05)
+    return procs, urls
+
+
+async def measure(urls, workers: int, seconds: float) -> dict:
+    app = SimpleNamespace(state=gateway_state())
+    readers = [ReaderConfig(f"sim-{i}", url) for i, url in enumerate(urls)]
+
+    if workers:
+        ingest = ShardedIngest(app, readers, workers=workers)
+        events = lambda: ingest.events
+    else:
+        os.environ["READER_BATCH_MAX"] = "256"
+        ingest = ReaderSupervisor(app, readers)
+        events = lambda: sum(s.events for s in ingest.status.values())
+
+    ingest.start()
+    deadline = time.monotonic() + 30.0
+    while events() == 0 or not ingest.connected:
+        if time.monotonic() > deadline:
+            raise RuntimeError("readers did not connect")
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(1.0)  # warm-up
+
+    start = events()
+    t0 = time.perf_counter()
+    await asyncio.sleep(seconds)
+    n = events() - start
+    elapsed = time.perf_counter() - t0
+
+    await ingest.stop()
+    await app.state.verifier.drain()
+    return {
+        "mode": f"W={workers}" if workers else "inproc",
+        "readers": len(urls),
+        "events_per_sec": n / elapsed,
+        "active_tags": len(app.state.active_tags),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--file", default=str(SIM_DIR / "datastream4.ndjson"))
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.readers} simulated readers\n")
+    procs, urls = start_readers(args.readers, Path(args.file))
+    try:
+        results = []
+        for workers in [0] + args.workers:
+            r = asyncio.run(measure(urls, workers, args.seconds))
+            results.append(r)
+            print(f"{r['mode']:<7} {r['events_per_sec']:>12,.0f} ev/s  {r['active_tags']:>6} active tags")
+    finally:
+        for p in procs:
+            p.terminate()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Sighting log: record cost per read, bytes per stored sighting, and query
+latency for one tag's history and for a one-hour presence window, over
+hours of hourly segments (a fixed tag population re-read every flush, so the
+history query is the worst case: the tag is in every block).
+
+    python -m time7_gateway.benchmarks.sighting_log --tags 500 --hours 6 --flush 5
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from time7_gateway.clients.event_decoder import TagEvent
+from time7_gateway.services.sighting_log import SightingLog
+
+T0 = 1_772_000_000.0
+
+
+def events(tags: int, reads: int):
+    one = [TagEvent(tidHex=f"E2806890{i:016X}", epcHex=f"3036{i:020X}", antenna=1 + i % 4, rssi=-4000 - i % 3000)
+           for i in range(tags)]
+    return one * reads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--hours", type=int, default=6)
+    parser.add_argument("--flush", type=float, default=5.0, help="seconds per flush (one block)")
+    parser.add_argument("--reads", type=int, default=4, help="reads per tag per flush")
+    args = parser.parse_args()
+
+    batch = events(args.tags, args.reads)
+    flushes = int(args.hours * 3600 / args.flush)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = SightingLog(tmp, segment_seconds=3600, retention=0, verdict=lambda tid: (True, "Authentication Passed"))
+
+        record = write = 0.0
+        for n in range(flushes):
+            t0 = time.perf_counter()
+            log.record(batch, "dock-1", seen_at=T0 + n * args.flush)
+            t1 = time.perf_counter()
+            log.append(log._take())
+            write += time.perf_counter() - t1
+            record += t1 - t0
+        log.close()
+        disk = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+
+        reopened = SightingLog(tmp, segment_seconds=3600, retention=0)
+        tid = batch[args.tags // 2].tidHex
+        t0 = time.perf_counter()
+        seen = reopened.history(tid, until=T0 + args.hours * 3600, limit=1_000_000)
+        history_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        present = reopened.present(T0 + 3600 * (args.hours // 2), T0 + 3600 * (args.hours // 2 + 1))
+        present_s = time.perf_counter() - t0
+
+    result = {
+        "reads": len(batch) * flushes,
+        "sightings": log.sightings,
+        "record_reads_per_sec": len(batch) * flushes / record,
+        "write_sightings_per_sec": log.sightings / write,
+        "bytes_per_sighting": disk / log.sightings,
+        "history_ms": history_s * 1000,
+        "history_rows": len(seen),
+        "present_hour_ms": present_s * 1000,
+        "present_tags": len(present),
+    }
+    print(f"record {result['record_reads_per_sec']:,.0f} reads/s, write {result['write_sightings_per_sec']:,.0f} "
+          f"sightings/s, {result['bytes_per_sighting']:.1f} B/sighting on disk")
+    print(f"history of one tag ({len(seen)} rows): {result['history_ms']:.1f} ms; "
+          f"present in one hour ({len(present)} tags): {result['present_hour_ms']:.1f} ms")
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
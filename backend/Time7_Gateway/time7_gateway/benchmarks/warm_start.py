@@ -0,0 +1,132 @@
+"""
+Cold vs warm startup: how many IAS calls (and how long) a restart costs with
+and without the on-disk verdict store.
+
+Replays the simulators/datastream*.ndjson fixtures (plus optional synthetic
+tags) through TagInfoCache + TagVerifier with a counting IAS stand-in.
+
+    python -m time7_gateway.benchmarks.warm_start --extra 20000 --ias-latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verdict_store import VerdictStore
+from time7_gateway.services.verifier import TagVerifier
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+from time7_gateway.utilities.simulate_encryption import generate_response
+
+SIM_DIR = Path(__file__).resolve().parent.parent / "simulators"
+
+
+class NullWriter:
+    def enqueue(self, **kwargs) -> bool:
+        return True
+
+
+class CountingIAS:
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000.0
+        self.calls = 0
+
+    async def __call__(self, auth_payload: AuthPayload):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return mock_ias_lookup(auth_payload)
+
+
+def load_payloads(extra: int) -> list[AuthPayload]:
+    # one AuthPayload per read, in fixture order (tags repeat, as on a real reader)
+    out = []
+    for path in sorted(SIM_DIR.glob("datastream*.ndjson")):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            tie = json.loads(line).get("tagInventoryEvent", {})
+            tar = tie.get("tagAuthenticationResponse") or {}
+            if tar.get("responseHex"):
+                out.append(AuthPayload(
+                    messageHex=tar["messageHex"],
+                    responseHex=tar["responseHex"],
+                    tidHex=tar.get("tidHex") or tie["tidHex"],
+                ))
+    for i in range(extra):
+        tid = f"E2B0{i:020X}"
+        msg = f"{i:012X}"
+        out.append(AuthPayload(messageHex=msg, responseHex=generate_response(tid, msg), tidHex=tid))
+    return out
+
+
+async def replay(cache: TagInfoCache, payloads, ias: CountingIAS) -> float:
+    verifier = TagVerifier(ias, cache, NullWriter(), max_concurrency=16)
+    verifier.load_verdict = cache.load  # no-op unless lazy_load
+    seen_at = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    for p in payloads:
+        if cache.get(p.tidHex) is None:
+            verifier.submit(p, None, seen_at)
+    await verifier.drain()
+    return time.perf_counter() - t0
+
+
+async def main_async(args) -> dict:
+    payloads = load_payloads(args.extra)
+    unique = len({p.tidHex for p in payloads})
+    results = {"reads": len(payloads), "unique_tags": unique}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "verdicts.db")
+
+        # first boot: empty cache and store
+        store = VerdictStore(path)
+        cache = TagInfoCache(store=store)
+        ias = CountingIAS(args.ias_latency_ms)
+        elapsed = await replay(cache, payloads, ias)
+        await cache.flush_store()
+        store.close()
+        results["cold"] = {"ias_calls": ias.calls, "seconds_to_all_verdicts": elapsed}
+
+        # restart, bulk warm start
+        store = VerdictStore(path)
+        cache = TagInfoCache(store=store)
+        t0 = time.perf_counter()
+        loaded = cache.warm_start()
+        load_seconds = time.perf_counter() - t0
+        ias = CountingIAS(args.ias_latency_ms)
+        elapsed = await replay(cache, payloads, ias)
+        store.close()
+        results["warm_bulk"] = {
+            "loaded": loaded,
+            "load_seconds": load_seconds,
+            "ias_calls": ias.calls,
+            "seconds_to_all_verdicts": elapsed,
+        }
+
+        # restart, lazy read-through
+        store = VerdictStore(path)
+        cache = TagInfoCache(store=store, lazy_load=True)
+        ias = CountingIAS(args.ias_latency_ms)
+        elapsed = await replay(cache, payloads, ias)
+        store.close()
+        results["warm_lazy"] = {"ias_calls": ias.calls, "seconds_to_all_verdicts": elapsed}
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extra", type=int, default=10000, help="synthetic tags added to the fixtures")
+    parser.add_argument("--ias-latency-ms", type=float, default=20.0)
+    print(json.dumps(asyncio.run(main_async(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
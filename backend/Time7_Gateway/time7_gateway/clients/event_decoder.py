@@ -0,0 +1,352 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Fast JSON backends are optional: msgspec decodes straight into typed structs
+# and skips unknown fields; orjson is a faster drop-in for json.loads.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from time7_gateway.services.metrics import EVENTS_SKIPPED
+
+
+# cheap pre-filter: every tagInventory event contains this, most other events don't
+_INVENTORY_MARKER = b'"tagInventory'
+
+
+class TagEvent:
+
+    # Only the fields the gateway uses from a tagInventory event.
+    # hasAuth is False when tagAuthenticationResponse is missing or empty;
+    # responseHex is "" when the tag could not answer the challenge.
+    # readTime is the reader's own timestamp (lastSeenTime, else the event
+    # timestamp), kept as the raw string; parse_reader_time() converts it
+    # only where it is needed. antenna (antennaPort) and rssi (peakRssiCdbm,
+    # centi-dBm) are only used by the sighting log.
+
+    __slots__ = (
+        "tidHex", "epcHex", "hasAuth", "messageHex", "responseHex", "authTidHex", "readTime", "antenna", "rssi",
+    )
+
+    def __init__(
+        self,
+        tidHex: str,
+        epcHex: Optional[str] = None,
+        hasAuth: bool = False,
+        messageHex: str = "",
+        responseHex: str = "",
+        authTidHex: str = "",
+        readTime: Optional[str] = None,
+        antenna: Optional[int] = None,
+        rssi: Optional[int] = None,
+    ) -> None:
+        self.tidHex = tidHex
+        self.epcHex = epcHex
+        self.hasAuth = hasAuth
+        self.messageHex = messageHex
+        self.responseHex = responseHex
+        self.authTidHex = authTidHex
+        self.readTime = readTime
+        self.antenna = antenna
+        self.rssi = rssi
+
+    def __repr__(self) -> str:
+        return f"TagEvent(tidHex={self.tidHex!r}, epcHex={self.epcHex!r}, hasAuth={self.hasAuth})"
+
+    @classmethod
+    def from_dict(cls, ev: Any) -> Optional["TagEvent"]:
+        # None for anything that is not a tagInventory event; ValueError for
+        # one whose nested objects are not objects (a malformed line, as the
+        # msgspec backend reports it)
+        if not isinstance(ev, dict) or ev.get("eventType") != "tagInventory":
+            return None
+        tie = ev.get("tagInventoryEvent") or {}
+        if not isinstance(tie, dict):
+            raise ValueError("tagInventoryEvent is not an object")
+        tar = tie.get("tagAuthenticationResponse") or {}
+        if not isinstance(tar, dict):
+            raise ValueError("tagAuthenticationResponse is not an object")
+        # positional: this runs once per event on the stdlib/orjson backends
+        get = tie.get
+        read_time = get("lastSeenTime") or ev.get("timestamp")
+        if not tar:
+            return cls(get("tidHex") or "", get("epcHex"), False, "", "", "", read_time,
+                       get("antennaPort"), get("peakRssiCdbm"))
+        return cls(
+            get("tidHex") or "", get("epcHex"), True,
+            tar.get("messageHex") or "", tar.get("responseHex") or "", tar.get("tidHex") or "",
+            read_time, get("antennaPort"), get("peakRssiCdbm"),
+        )
+
+
+if msgspec is not None:
+
+    class _Tar(msgspec.Struct):
+        messageHex: Optional[str] = None
+        responseHex: Optional[str] = None
+        tidHex: Optional[str] = None
+
+    class _Tie(msgspec.Struct):
+        tidHex: Optional[str] = None
+        epcHex: Optional[str] = None
+        lastSeenTime: Optional[str] = None
+        antennaPort: Optional[int] = None
+        peakRssiCdbm: Optional[int] = None
+        tagAuthenticationResponse: Optional[_Tar] = None
+
+    class _Event(msgspec.Struct):
+        eventType: Optional[str] = None
+        timestamp: Optional[str] = None
+        tagInventoryEvent: Optional[_Tie] = None
+
+    _msgspec_decoder = msgspec.json.Decoder(_Event)
+
+    def _decode_msgspec(line: bytes) -> Optional[TagEvent]:
+        ev = _msgspec_decoder.decode(line)
+        if ev.eventType != "tagInventory":
+            return None
+        tie = ev.tagInventoryEvent
+        if tie is None:
+            return TagEvent(tidHex="", readTime=ev.timestamp)
+        read_time = tie.lastSeenTime or ev.timestamp
+        tar = tie.tagAuthenticationResponse
+        # an empty {} decodes to a struct of Nones; treat it like a missing response
+        if tar is None or (tar.messageHex is None and tar.responseHex is None and tar.tidHex is None):
+            return TagEvent(
+                tidHex=tie.tidHex or "",
+                epcHex=tie.epcHex,
+                readTime=read_time,
+                antenna=tie.antennaPort,
+                rssi=tie.peakRssiCdbm,
+            )
+        return TagEvent(
+            tidHex=tie.tidHex or "",
+            epcHex=tie.epcHex,
+            hasAuth=True,
+            messageHex=tar.messageHex or "",
+            responseHex=tar.responseHex or "",
+            authTidHex=tar.tidHex or "",
+            readTime=read_time,
+            antenna=tie.antennaPort,
+            rssi=tie.peakRssiCdbm,
+        )
+
+
+def parse_reader_time(value: Optional[str]) -> Optional[datetime]:
+    # Reader timestamps are RFC 3339 with up to nanosecond precision and a
+    # "Z" suffix ("2026-02-08T22:43:36.736669722Z"); datetime takes at most
+    # microseconds. None if missing or unparseable.
+    if not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    dot = value.find(".")
+    if dot != -1:
+        end = dot + 1
+        while end < len(value) and value[end].isdigit():
+            end += 1
+        if end - dot > 7:
+            value = value[:dot + 7] + value[end:]
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _decode_stdlib(line: bytes) -> Optional[TagEvent]:
+    return TagEvent.from_dict(json.loads(line))
+
+
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+def _parse_stdlib_many(lines: List[bytes]) -> Optional[List[Any]]:
+    # The stdlib parser's per-call overhead is as large as the parse of a
+    # reader line, so a chunk's lines are parsed as one array instead (~1.7x).
+    # A malformed line breaks the array, or merges into a neighbour and
+    # changes the count; None then, and the lines are decoded one by one.
+    if not lines:
+        return []
+    try:
+        text = (b"[" + b",".join(lines) + b"]").decode("utf-8")
+        values, end = _raw_decode(text)
+    except ValueError:
+        return None
+    if end != len(text) or not isinstance(values, list) or len(values) != len(lines):
+        return None
+    return values
+
+
+DECODERS: Dict[str, Callable[[bytes], Optional[TagEvent]]] = {"json": _decode_stdlib}
+if orjson is not None:
+    DECODERS["orjson"] = lambda line: TagEvent.from_dict(orjson.loads(line))
+if msgspec is not None:
+    DECODERS["msgspec"] = _decode_msgspec
+
+# backends that parse a whole chunk of lines at once
+PARSE_MANY: Dict[str, Callable[[List[bytes]], Optional[List[Any]]]] = {"json": _parse_stdlib_many}
+
+# fastest available backend
+BACKEND = next(name for name in ("msgspec", "orjson", "json") if name in DECODERS)
+
+
+def decode_lines(lines: Iterable[bytes], backend: str = BACKEND) -> Iterator[TagEvent]:
+    decode = DECODERS[backend]
+    parse_many = PARSE_MANY.get(backend)
+    skipped = malformed = 0  # counted locally, added to the metrics once per call
+    try:
+        if parse_many is not None:
+            candidates = []
+            for line in lines:
+                if not line:
+                    continue
+                if _INVENTORY_MARKER not in line:
+                    skipped += 1
+                    continue
+                candidates.append(line)
+            values = parse_many(candidates)
+            if values is not None:
+                for value in values:
+                    try:
+                        ev = TagEvent.from_dict(value)
+                    except ValueError:
+                        malformed += 1
+                        continue
+                    if ev is None:
+                        skipped += 1
+                    else:
+                        yield ev
+                return
+            lines = candidates  # something in the chunk is malformed: line by line
+        for line in lines:
+            if not line:
+                continue
+            if _INVENTORY_MARKER not in line:
+                skipped += 1
+                continue
+            try:
+                ev = decode(line)
+            except ValueError:
+                malformed += 1  # malformed line from the reader; skip it
+                continue
+            if ev is None:
+                skipped += 1
+            else:
+                yield ev
+    finally:
+        if skipped:
+            EVENTS_SKIPPED.inc("non_inventory", amount=skipped)
+        if malformed:
+            EVENTS_SKIPPED.inc("malformed", amount=malformed)
+
+
+class NDJSONSplitter:
+
+    # Turns arbitrary byte chunks into complete lines without decoding them to
+    # str; the trailing partial line is carried over to the next chunk.
+
+    __slots__ = ("_tail",)
+
+    def __init__(self) -> None:
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        if self._tail:
+            chunk = self._tail + chunk
+        lines = chunk.split(b"\n")
+        self._tail = lines.pop()
+        return lines
+
+    def flush(self) -> List[bytes]:
+        tail, self._tail = self._tail, b""
+        return [tail] if tail.strip() else []
+
+
+# Text between brackets, with strings skipped whole. Written as unrolled
+# loops (no possessive quantifiers, which need Python 3.11): every run of
+# input can only be split one way, so a failed match backtracks linearly.
+_FILL = rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*'
+
+# one step of JSONArraySplitter: everything up to the next bracket; ends on
+# the bracket, or on a quote whose string is not complete yet
+_JSON_STEP = re.compile(_FILL + rb'(?:([{}\[\]])|")', re.S)
+
+
+def _nested(levels: int) -> bytes:
+    # a complete object/array nested at most `levels` deep (bracket kinds are
+    # not paired up; a mismatch is left for the JSON decoder to reject)
+    value = rb'[{\[]' + _FILL + rb'[}\]]'
+    for _ in range(levels - 1):
+        value = rb'[{\[]' + _FILL + rb'(?:' + value + _FILL + rb')*[}\]]'
+    return value
+
+
+# fast path: one whole array element (tagInventory events nest 3 deep)
+_JSON_ELEMENT = re.compile(rb'[\s,]*(' + _nested(6) + rb')', re.S)
+
+
+class JSONArraySplitter:
+
+    # Same interface as NDJSONSplitter for a body that is one JSON array of
+    # events (HTTP webhook style): feed() returns the raw bytes of each
+    # top-level element once it is complete, so the array never has to be
+    # held or parsed as a whole. Only brackets are looked at; the elements
+    # themselves are decoded by decode_lines like NDJSON lines. Between
+    # elements, a whole element is matched in one go; the bracket-by-bracket
+    # scan only runs for elements split across chunks or nested deeper.
+
+    __slots__ = ("_buf", "_pos", "_depth", "_start")
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._pos = 0  # scan position in _buf
+        self._depth = 0  # 1 = inside the top-level array
+        self._start = 0  # start of the current element
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buf = self._buf + chunk if self._buf else chunk
+        pos, depth, start = self._pos, self._depth, self._start
+        out: List[bytes] = []
+        step = _JSON_STEP.match
+        element = _JSON_ELEMENT.match
+        while True:
+            if depth == 1:
+                m = element(buf, pos)
+                if m is not None:
+                    out.append(m.group(1))
+                    pos = m.end()
+                    continue
+            m = step(buf, pos)
+            if m is None or m.group(1) is None:
+                break  # no bracket left, or a string continues in the next chunk
+            pos = m.end()
+            if m.group(1) in b"{[":
+                depth += 1
+                if depth == 2:
+                    start = pos - 1
+            else:
+                depth -= 1
+                if depth == 1:
+                    out.append(buf[start:pos])
+                elif depth <= 0:
+                    depth = 0  # end of the array; anything after it is ignored
+        # keep only the unfinished element
+        keep = start if depth >= 2 else pos
+        self._buf = buf[keep:]
+        self._pos, self._depth, self._start = pos - keep, depth, start - keep if depth >= 2 else 0
+        return out
+
+    def flush(self) -> List[bytes]:
+        # an element still open at the end of the body is incomplete; it is
+        # passed on so decode_lines counts it as malformed
+        tail = self._buf[self._start:] if self._depth >= 2 else b""
+        self._buf, self._pos, self._depth, self._start = b"", 0, 0, 0
+        return [tail] if tail.strip() else []
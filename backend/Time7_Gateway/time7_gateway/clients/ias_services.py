@@ -1,9 +1,175 @@
-from typing import Tuple
-from time7_gateway.models.schemas import AuthPayload
+import asyncio
+import os
+import random
+import time
+from typing import List, Optional, Sequence, Tuple
 
-def ias_lookup(tag_id: AuthPayload) -> Tuple[bool, str]:
+import httpx
 
+from time7_gateway.models.schemas import AuthBatchRequest, AuthBatchResponse, AuthPayload, AuthResult
 
+try:  # HTTP/2 needs the optional "h2" package (httpx[http2])
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
 
-    return False, "Actual connection to IAS yet to establish"
 
+class IASUnavailableError(Exception):
+    """IAS could not be reached (timeouts, 5xx, or circuit breaker open)."""
+
+
+class CircuitBreaker:
+
+    # closed -> open after `failure_threshold` consecutive failures;
+    # open -> half-open after `reset_timeout` seconds, which lets one trial
+    # request through (and re-arms the timer so only one goes through);
+    # a success closes the breaker, a failure keeps it open.
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = int(failure_threshold)
+        self.reset_timeout = float(reset_timeout)
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open":
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+class IASClient:
+
+    # Pooled keep-alive (HTTP/2 when available) client for the IAS.
+    # Every call has an overall deadline; transient failures (transport
+    # errors, 429, 5xx) are retried with jittered exponential backoff until
+    # the deadline runs out, and a circuit breaker fails fast while IAS is down.
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        deadline: float = 2.0,
+        retries: int = 2,
+        backoff: float = 0.05,
+        max_connections: int = 100,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        self.base_url = base_url.rstrip("/")
+        self.deadline = float(deadline)
+        self.retries = int(retries)
+        self.backoff = float(backoff)
+        self.breaker = breaker or CircuitBreaker()
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            http2=_HTTP2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            transport=transport,
+        )
+
+    async def _post(self, path: str, body: dict) -> dict:
+        if not self.breaker.allow():
+            raise IASUnavailableError("IAS circuit breaker open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        attempt = 0
+
+        while True:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    raise httpx.TimeoutException("IAS deadline exceeded")
+                r = await self._client.post(path, json=body, timeout=remaining)
+                if r.status_code == 429 or r.status_code >= 500:
+                    raise httpx.HTTPStatusError(f"IAS returned {r.status_code}", request=r.request, response=r)
+            except httpx.HTTPError as e:
+                sleep = random.uniform(0, self.backoff * (2 ** attempt))  # full jitter
+                if attempt >= self.retries or loop.time() + sleep >= deadline:
+                    self.breaker.record_failure()
+                    raise IASUnavailableError(str(e)) from e
+                attempt += 1
+                await asyncio.sleep(sleep)
+                continue
+
+            # IAS answered; other 4xx are our fault and are not retried
+            self.breaker.record_success()
+            r.raise_for_status()
+            return r.json()
+
+    async def lookup(self, auth_payload: AuthPayload) -> Tuple[bool, Optional[str]]:
+        data = await self._post("/verify", auth_payload.model_dump())
+        res = AuthResult.model_validate(data)
+        return res.auth, res.info
+
+    async def batch_lookup(self, auth_payloads: Sequence[AuthPayload]) -> List[Tuple[bool, Optional[str]]]:
+        # one request for many tags; results come back in request order
+        if not auth_payloads:
+            return []
+        body = AuthBatchRequest(items=list(auth_payloads)).model_dump()
+        data = AuthBatchResponse.model_validate(await self._post("/verify/batch", body))
+        if len(data.results) != len(auth_payloads):
+            raise IASUnavailableError("IAS batch response size mismatch")
+        return [(r.auth, r.info) for r in data.results]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: Optional[IASClient] = None
+
+
+def get_ias_client() -> IASClient:
+    global _client
+    if _client is None:
+        _client = IASClient(
+            base_url=os.environ["IAS_BASE_URL"],
+            api_key=os.getenv("IAS_API_KEY") or None,
+            deadline=float(os.getenv("IAS_DEADLINE_SECONDS", "2.0")),
+            retries=int(os.getenv("IAS_RETRIES", "2")),
+            max_connections=int(os.getenv("IAS_MAX_CONNECTIONS", "100")),
+        )
+    return _client
+
+
+async def close_ias_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def ias_lookup(tag_id: AuthPayload) -> Tuple[bool, Optional[str]]:
+    return await get_ias_client().lookup(tag_id)
+
+
+async def ias_batch_lookup(tag_ids: Sequence[AuthPayload]) -> List[Tuple[bool, Optional[str]]]:
+    return await get_ias_client().batch_lookup(tag_ids)
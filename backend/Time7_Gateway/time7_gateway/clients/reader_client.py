@@ -1,20 +1,26 @@
-import json
+import asyncio
 import os
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from time7_gateway.models.schemas import AuthPayload #---NEW
+from time7_gateway.clients.event_decoder import NDJSONSplitter, decode_lines, parse_reader_time
+from time7_gateway.services.metrics import DECODE_SECONDS, EVENTS_SKIPPED
 
 import httpx
 
-from time7_gateway.services.database import upsert_latest_tag
-
 
 class ImpinjReaderClient:
-    def __init__(self, base_url: str, username: str, password: str):
+    def __init__(self, base_url: str, username: str, password: str, tracer=None):
         self.base_url = base_url 
         self._client = httpx.AsyncClient(auth=(username, password), timeout=None)
+        self.tracer = tracer  # optional LatencyTracer, sees every decoded chunk
 
-    async def stream_events(self, on_connect=None):
-    #async def stream_events(self):
+    async def stream_batches(self, on_connect=None):
+        # Yields one list of TagEvents per byte chunk read from the socket
+        # (tagInventory events only). Chunks are split into lines without
+        # decoding to str; lines that cannot be tagInventory events are
+        # dropped before JSON parsing.
         url = f"{self.base_url}/data/stream" 
         async with self._client.stream("GET", url) as r:
             r.raise_for_status()
@@ -22,10 +28,27 @@ class ImpinjReaderClient:
             if on_connect:
                on_connect()
 
-            async for line in r.aiter_lines():
-                if not line:
-                    continue
-                yield json.loads(line)
+            splitter = NDJSONSplitter()
+            tracer = self.tracer
+            async for chunk in r.aiter_bytes():
+                received_at = time.time() if tracer is not None else 0.0
+                t0 = time.perf_counter()
+                events = list(decode_lines(splitter.feed(chunk)))
+                DECODE_SECONDS.observe(time.perf_counter() - t0)
+                if events:
+                    if tracer is not None:
+                        tracer.on_decoded(events, received_at, time.time())
+                    yield events
+            events = list(decode_lines(splitter.flush()))
+            if events:
+                yield events
+
+    async def stream_events(self, on_connect=None):
+    #async def stream_events(self):
+        # Same stream, one TagEvent at a time
+        async for events in self.stream_batches(on_connect=on_connect):
+            for ev in events:
+                yield ev
 
     async def aclose(self):
         await self._client.aclose()
@@ -36,70 +59,302 @@ def handle_invalid_tag(
     seen_at,
     active_tags,
     cache,
-    info_message
+    db_writer,
+    info_message,
+    first_seen=None
 ):
-    auth = False
     info = info_message
 
     active_tags.sync_seen(
         [tidHex],
         epcHex={tidHex: epcHex},
-        seen_at=seen_at
+        seen_at=seen_at,
+        first_seen=first_seen
     )
 
+    record_invalid_verdict(tidHex, epcHex, seen_at, cache, db_writer, info)
+
+
+def record_invalid_verdict(tidHex, epcHex, seen_at, cache, db_writer, info):
+    auth = False
+
+    # Same cache lookup as the valid path: only write when the tag first
+    # appears, its verdict changes, or the cached verdict has expired.
+    if cache.get(tidHex) == (auth, info):
+        db_writer.skip()
+        return
+
     cache.set(tidHex, auth, info)
 
-    upsert_latest_tag(
+    db_writer.enqueue(
         tidHex=tidHex,
         seen_at=seen_at,
         auth=auth,
         info=info,
         epcHex=epcHex,
     )
+
+
+def reader_first_seen(active_tags, tidHex, read_time, seen_at, max_lag: float):
+    # first_seen for a tag the gateway has not seen yet: the reader's own read
+    # time, so a backlog in the gateway does not make tags look newer than
+    # they are. A reader time in the future, or more than max_lag seconds old
+    # (skewed reader clock), is ignored. None for tags already active.
+    if active_tags.get(tidHex) is not None:
+        return None
+    read = parse_reader_time(read_time)
+    if read is None or read > seen_at or (seen_at - read) > timedelta(seconds=max_lag):
+        return None
+    return {tidHex: read}
+
+
+_STREAM_END = object()
+
+
+async def window_batches(batches, max_events: int, window: float) -> AsyncIterator[List]:
+    # Regroups per-chunk event lists into batches of at most max_events.
+    # A batch is closed as soon as it is full, or `window` seconds after its
+    # first event. Under load the queue is never empty, so batches fill up
+    # without waiting; when the stream is quiet a partial batch waits at most
+    # one window. The socket is read by a separate task so a stalled reader
+    # cannot hold back a partial batch.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+
+    async def pump():
+        try:
+            async for events in batches:
+                await queue.put(events)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_STREAM_END)
+        finally:
+            await batches.aclose()
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(pump())
+    try:
+        end = None
+        while end is None:
+            item = await queue.get()
+            if item is _STREAM_END or isinstance(item, Exception):
+                end = item
+                break
+
+            batch = list(item)
+            deadline = loop.time() + window
+            while len(batch) < max_events:
+                if queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    await asyncio.sleep(remaining)
+                    if queue.empty():
+                        break
+                item = queue.get_nowait()
+                if item is _STREAM_END or isinstance(item, Exception):
+                    end = item
+                    break
+                batch.extend(item)
+
+            for i in range(0, len(batch), max_events):
+                yield batch[i:i + max_events]
+
+        if isinstance(end, Exception):
+            raise end
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+# Per-tag update after collapsing a batch: (epcHex, invalid_info, messageHex,
+# responseHex, readTime). invalid_info is None for tags that need IAS
+# verification; readTime is the reader's raw timestamp string.
+TagUpdate = Tuple[Optional[str], Optional[str], str, str, Optional[str]]
+
+
+def collapse_events(events) -> Dict[str, TagUpdate]:
+    # Repeated reads of a tag inside the batch collapse to the last one,
+    # except for the read time, which stays the first read's (the first_seen
+    # of a tag that is new). Plain tuples so the result is cheap to pickle
+    # (sharded ingestion).
+    latest: Dict[str, TagUpdate] = {}
+    missing_tid = auth_disabled = unsupported = 0
+    for ev in events:
+        tidHex = ev.tidHex
+        if not tidHex:
+            missing_tid += 1
+            continue
+        if ev.hasAuth:
+            tidHex = ev.authTidHex or tidHex
+        prev = latest.get(tidHex)
+        read_time = prev[4] or ev.readTime if prev is not None else ev.readTime
+        if not ev.hasAuth:
+            auth_disabled += 1
+            latest[tidHex] = (ev.epcHex, "Authentication Disabled", "", "", read_time)
+        elif ev.responseHex == "":
+            unsupported += 1
+            latest[tidHex] = (ev.epcHex, "Unsupported Tag", "", "", read_time)
+        else:
+            latest[tidHex] = (ev.epcHex, None, ev.messageHex, ev.responseHex, read_time)
+
+    if missing_tid:
+        EVENTS_SKIPPED.inc("missing_tid", amount=missing_tid)
+    if auth_disabled:
+        EVENTS_SKIPPED.inc("auth_disabled", amount=auth_disabled)
+    if unsupported:
+        EVENTS_SKIPPED.inc("unsupported_tag", amount=unsupported)
+    return latest
+
+
+def apply_tag_updates(
+    latest: Dict[str, TagUpdate],
+    seen_at,
+    active_tags,
+    cache,
+    verifier,
+    db_writer,
+    tracer=None,
+    max_lag: float = 60.0,
+) -> int:
+    # One sync_seen call for the whole batch; only unique cache misses that
+    # are not already being verified build an AuthPayload.
+    # Returns the number of tags handed to the verifier.
+    if not latest:
+        return 0
+
+    first_seen: Dict[str, datetime] = {}
+    for tid, u in latest.items():
+        new = reader_first_seen(active_tags, tid, u[4], seen_at, max_lag)
+        if new:
+            first_seen.update(new)
+
+    active_tags.sync_seen(
+        latest.keys(),
+        epcHex={tid: u[0] for tid, u in latest.items()},
+        seen_at=seen_at,
+        first_seen=first_seen or None,
+    )
+    if tracer:
+        tracer.mark_many(latest.keys(), "state_updated")
+
+    submitted = 0
+    for tidHex, (epcHex, invalid_info, messageHex, responseHex, _) in latest.items():
+        if invalid_info is not None:
+            record_invalid_verdict(tidHex, epcHex, seen_at, cache, db_writer, invalid_info)
+            if tracer:
+                tracer.mark(tidHex, "verified")
+            continue
+        if verifier.is_pending(tidHex):
+            if tracer:
+                tracer.mark(tidHex, "verified")
+            continue
+        cached = cache.get(tidHex)
+        if cached is None:
+            auth_payload = AuthPayload(
+                messageHex=messageHex,
+                responseHex=responseHex,
+                tidHex=tidHex,
+            )
+            if verifier.submit(auth_payload, epcHex=epcHex, seen_at=seen_at):
+                submitted += 1
+        elif verifier.check_cached(tidHex, messageHex, responseHex, epcHex, seen_at, cached):
+            submitted += 1  # new challenge, verified again
+        elif tracer:
+            tracer.mark(tidHex, "verified")  # verdict already known
+    return submitted
+
+
+def process_tag_batch(events, seen_at, active_tags, cache, verifier, db_writer, tracer=None, max_lag: float = 60.0) -> int:
+    # Batched equivalent of the per-event loop in run_reader_stream: one
+    # timestamp and one sync_seen call per batch.
+    return apply_tag_updates(
+        collapse_events(events), seen_at, active_tags, cache, verifier, db_writer, tracer, max_lag
+    )
                 
 
+async def run_reader_stream(app, reader=None, status=None):
+    # reader: a ReaderConfig (name, base_url, user, password); defaults to the
+    # single READER_BASE_URL reader. status: a ReaderStatus the supervisor
+    # reads for /api/reader-status; without one, app.state.reader_connected
+    # is used as before.
+    if reader is None:
+        reader_base_url = os.getenv("READER_BASE_URL", "").strip()
+        reader_user = os.getenv("READER_USER", "").strip()
+        reader_password = os.getenv("READER_PASSWORD", "").strip()
+    else:
+        reader_base_url, reader_user, reader_password = reader.base_url, reader.user, reader.password
 
-async def run_reader_stream(app):
-    reader_base_url = os.getenv("READER_BASE_URL", "").strip()
-    reader_user = os.getenv("READER_USER", "").strip()
-    reader_password = os.getenv("READER_PASSWORD", "").strip()
+    # sampled per-stage latency tracing (None when disabled)
+    tracer = getattr(app.state, "tracer", None)
+    # reader read times more than this far behind are not trusted for first_seen
+    max_lag = float(os.getenv("READER_MAX_LAG_SECONDS", "60"))
 
-    client = ImpinjReaderClient(reader_base_url, reader_user, reader_password)
+    client = ImpinjReaderClient(reader_base_url, reader_user, reader_password, tracer=tracer)
 
     
 
     active_tags = app.state.active_tags
     cache = app.state.tag_info_cache
-    ias_lookup = app.state.ias_lookup
+    verifier = app.state.verifier
+    db_writer = app.state.db_writer
+    # optional sighting log (SIGHTING_LOG_DIR); every read is recorded there
+    sightings = getattr(app.state, "sighting_log", None)
+    reader_name = reader.name if reader is not None else "reader-1"
     
     # reader status flag
-    app.state.reader_connected = False
-    def mark_connected():
-        app.state.reader_connected = True
+    if status is None:
+        app.state.reader_connected = False
+        def mark_connected():
+            app.state.reader_connected = True
+    else:
+        mark_connected = status.mark_connected
+
+    # READER_BATCH_MAX > 1 switches to the micro-batched path: events are
+    # grouped for up to READER_BATCH_WINDOW_MS and handled by process_tag_batch
+    batch_max = int(os.getenv("READER_BATCH_MAX", "1"))
+    batch_window = float(os.getenv("READER_BATCH_WINDOW_MS", "20")) / 1000.0
      
       
 
     try:
+        if batch_max > 1:
+            batches = window_batches(client.stream_batches(on_connect=mark_connected), batch_max, batch_window)
+            async for batch in batches:
+                if status is not None:
+                    status.events += len(batch)
+                if sightings is not None:
+                    sightings.record(batch, reader_name)
+                process_tag_batch(
+                    batch,
+                    seen_at=datetime.now(timezone.utc),
+                    active_tags=active_tags,
+                    cache=cache,
+                    verifier=verifier,
+                    db_writer=db_writer,
+                    tracer=tracer,
+                    max_lag=max_lag,
+                )
+            return
         
         # Subscribe to data-stream
         async for ev in client.stream_events(on_connect=mark_connected): 
         #async for ev in client.stream_events():
-            # Skip if not a valid tagInventoryEvent
-            
-            if ev.get("eventType") != "tagInventory":
-                
-                continue
-
-            # Save required variables:
-            tieDict = ev.get("tagInventoryEvent", {}) # a dict object holding the variables needed for Authentication
-
-            tidHex = tieDict.get("tidHex") # Unique tag identification number
-            epcHex = tieDict.get("epcHex") # Product information number
-
+            # Only tagInventory events reach here (filtered by the decoder)
+            if status is not None:
+                status.events += 1
+            if sightings is not None:
+                sightings.record((ev,), reader_name)
 
+            tidHex = ev.tidHex # Unique tag identification number
+            epcHex = ev.epcHex # Product information number
 
             # Skip if no tidHex:
             if not tidHex:
+                EVENTS_SKIPPED.inc("missing_tid")
                 continue
             
             # Save timestamp as variable:
@@ -109,23 +364,27 @@ async def run_reader_stream(app):
             tidHex_from_event = tidHex
             
             # ----- TAG AUTHENTICATION RESPONSE INGESTION -----
-            tarDict = tieDict.get("tagAuthenticationResponse", {}) # a dict object holding authentication payload to be sent to IAS
-            
-            if not tarDict:
+            if not ev.hasAuth:
                 #authentication failed, display tag as invalid
+                EVENTS_SKIPPED.inc("auth_disabled")
                 handle_invalid_tag(
                     tidHex=tidHex_from_event,
                     epcHex=epcHex,
                     seen_at=seen_at,
                     active_tags=active_tags,
                     cache=cache,
-                    info_message="Authentication Disabled")
+                    db_writer=db_writer,
+                    info_message="Authentication Disabled",
+                    first_seen=reader_first_seen(active_tags, tidHex_from_event, ev.readTime, seen_at, max_lag))
+                if tracer:
+                    tracer.mark(tidHex_from_event, "state_updated")
+                    tracer.mark(tidHex_from_event, "verified")
                 continue 
 
             # Save tagAuthenticationResponse variables:
-            messageHex=tarDict.get("messageHex") # Challenge that was sent to the tag, will always be included.
-            responseHex=tarDict.get("responseHex") # Always will be included, but will be an empty string if failed/invalid.
-            tidHex=tarDict.get("tidHex") # May be empty, if so, use the tidHex variable from above.
+            messageHex=ev.messageHex # Challenge that was sent to the tag, will always be included.
+            responseHex=ev.responseHex # Always will be included, but will be an empty string if failed/invalid.
+            tidHex=ev.authTidHex # May be empty, if so, use the tidHex variable from above.
             
             # If tidHex was not found inside tagAuthenticationResponse, use tidHex
             if not tidHex:
@@ -134,43 +393,55 @@ async def run_reader_stream(app):
            # Final checks:
             if responseHex == "":
                 #unable to authenticate due to missing responseHex. marked as incompatible tag
+                EVENTS_SKIPPED.inc("unsupported_tag")
                 handle_invalid_tag(
                     tidHex=tidHex,
                     epcHex=epcHex,
                     seen_at=seen_at,
                     active_tags=active_tags,
                     cache=cache,
-                    info_message="Unsupported Tag")
+                    db_writer=db_writer,
+                    info_message="Unsupported Tag",
+                    first_seen=reader_first_seen(active_tags, tidHex, ev.readTime, seen_at, max_lag))
+                if tracer:
+                    tracer.mark(tidHex, "state_updated")
+                    tracer.mark(tidHex, "verified")
                 continue
 
             # ----- AUTHENTICATION RESPONSE VALID -----
-            # Create auth_payload:
-            auth_payload = AuthPayload(
-                    messageHex=messageHex,
-                    responseHex=responseHex,
-                    tidHex=tidHex
-                )
-            
-            # Update active live tags
+            # Update active live tags (shown as pending until IAS answers)
             active_tags.sync_seen(
                 [tidHex],
                 epcHex={tidHex: epcHex},
-                seen_at=seen_at
+                seen_at=seen_at,
+                first_seen=reader_first_seen(active_tags, tidHex, ev.readTime, seen_at, max_lag)
             )
-            
+            if tracer:
+                tracer.mark(tidHex, "state_updated")
 
             # --- SENDING TO IAS ---
             # Check if this event's tidHex exists in the cache:
-            if cache.get(tidHex) is None: 
-                
-                # Send event payload to clients/ias_services.py
-                auth, info = ias_lookup(auth_payload) 
-                # returns auth(bool): true if valid; else false
-                #         info(str) : information about the authentication request
+            cached = cache.get(tidHex)
+            if cached is None:
+
+                # Create auth_payload:
+                auth_payload = AuthPayload(
+                        messageHex=messageHex,
+                        responseHex=responseHex,
+                        tidHex=tidHex
+                    )
 
-                cache.set(tidHex, auth, info)   # IAS results
-                upsert_latest_tag(tidHex=tidHex, seen_at=seen_at, auth=auth, info=info,epcHex=epcHex) # Sending to database
+                # Hand off to the verification stage; the reader loop does not
+                # wait for IAS. Result goes to the cache and the database.
+                verifier.submit(auth_payload, epcHex=epcHex, seen_at=seen_at)
+            # a verdict issued for another challenge is checked for replay first
+            elif not verifier.check_cached(tidHex, messageHex, responseHex, epcHex, seen_at, cached) and tracer:
+                tracer.mark(tidHex, "verified")  # verdict already known
 
     finally:
         await client.aclose()
-        app.state.reader_connected = False #reader status
+        #reader status
+        if status is None:
+            app.state.reader_connected = False
+        else:
+            status.connected = False
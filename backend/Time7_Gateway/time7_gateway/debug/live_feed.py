@@ -0,0 +1,63 @@
+import json
+import os
+import time
+import requests
+
+from time7_gateway.debug.config import BASE_URL
+
+URL = f"{BASE_URL}/api/active-tags/stream"
+
+
+def clear_screen() -> None:
+    os.system("cls" if os.name == "nt" else "clear")
+
+
+def render(tags: dict) -> None:
+    clear_screen()
+    print("LIVE FEED (server push)")
+    print(f"Endpoint: {URL}")
+    print(f"Count: {len(tags)}\n")
+
+    for t in tags.values():
+        print(f"- {t.get('tidHex')} | auth={t.get('auth')} | info={t.get('info')} | firstSeen={t.get('first_seen')}")
+
+    print("\nCTRL+C to stop.")
+
+
+def main() -> None:
+    # same view as reader_extraction/postIAS, but the gateway pushes changes
+    # instead of this tool re-fetching the full list several times a second
+    while True:
+        try:
+            with requests.get(URL, stream=True, timeout=(5, 60)) as r:
+                r.raise_for_status()
+                tags: dict = {}
+                event = None
+
+                for line in r.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        event = line[7:]
+                    elif line.startswith("data: "):
+                        data = json.loads(line[6:])
+                        if event == "snapshot":
+                            tags = {t["tidHex"]: t for t in data}
+                        elif event == "delta":
+                            for tid in data["remove"]:
+                                tags.pop(tid, None)
+                            for t in data["upsert"]:
+                                tags[t["tidHex"]] = t
+                        render(tags)
+
+        except KeyboardInterrupt:
+            break
+        except Exception as e:
+            clear_screen()
+            print("LIVE FEED (server push)")
+            print(f"Endpoint: {URL}\n")
+            print("Cannot connect to live feed yet.")
+            print(f"Error: {e}")
+            time.sleep(1.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,4 @@
-import asyncio
 from fastapi import APIRouter, Request, HTTPException
-from time7_gateway.clients.reader_client import run_reader_stream
 
 router = APIRouter(prefix="/debug", tags=["debug"])
 
@@ -19,18 +17,46 @@ def post_ias_snapshot(request: Request):
     """
     return request.app.state.tag_info_cache.snapshot()
 
+@router.get("/metrics")
+def metrics(request: Request):
+    """
+    Internal pipeline stats (DB write-behind queue depth, flush latency,
+    cache hit rate and size, ...)
+    """
+    guard = request.app.state.verifier.replay_guard
+    sightings = getattr(request.app.state, "sighting_log", None)
+    return {
+        "tag_info_cache": request.app.state.tag_info_cache.stats(),
+        "db_writer": request.app.state.db_writer.stats(),
+        "verifier": request.app.state.verifier.stats(),
+        "replay_guard": guard.stats() if guard is not None else None,
+        "readers": request.app.state.readers.stats(),
+        "sighting_log": sightings.stats() if sightings is not None else None,
+    }
+
+@router.get("/latency")
+def latency(request: Request):
+    """
+    Sampled read-to-stage lag percentiles (received, decoded, state_updated,
+    verified, persisted, pushed), measured from the reader's own read time.
+    """
+    tracer = getattr(request.app.state, "tracer", None)
+    if tracer is None:
+        raise HTTPException(status_code=404, detail="latency tracing disabled (TRACE_SAMPLE_EVERY=0)")
+    return tracer.stats()
+
 @router.post("/reader/start")
 async def start_reader(request: Request):
-    if getattr(request.app.state, "reader_task", None):
-        raise HTTPException(status_code=409, detail="reader_task already running")
-    request.app.state.reader_task = asyncio.create_task(run_reader_stream(request.app))
+    readers = request.app.state.readers
+    if readers.running:
+        raise HTTPException(status_code=409, detail="readers already running")
+    readers.start()
     return {"ok": True}
 
 @router.post("/reader/stop")
 async def stop_reader(request: Request):
-    task = getattr(request.app.state, "reader_task", None)
-    if not task:
-        raise HTTPException(status_code=404, detail="reader_task not running")
-    task.cancel()
-    request.app.state.reader_task = None
+    readers = request.app.state.readers
+    if not readers.running:
+        raise HTTPException(status_code=404, detail="readers not running")
+    await readers.stop()
     return {"ok": True}
\ No newline at end of file
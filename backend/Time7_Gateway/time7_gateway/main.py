@@ -2,14 +2,28 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import asyncio
+import logging
 import os
 
-from time7_gateway.clients.reader_client import run_reader_stream
 from time7_gateway.services.active_tags import ActiveTags
 from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verdict_store import VerdictStore
+from time7_gateway.services.db_writer import DBWriter
+from time7_gateway.services.database import repository_from_env
+from time7_gateway.services.verifier import TagVerifier
+from time7_gateway.services.replay_guard import ReplayGuard
+from time7_gateway.services.live_feed import LiveFeedHub
+from time7_gateway.services.reader_supervisor import ReaderSupervisor, reader_configs_from_env
+from time7_gateway.services.sharded_ingest import ShardedIngest
+from time7_gateway.services.sighting_log import SightingLog
+from time7_gateway.services.tracing import LatencyTracer
 from time7_gateway.api.dashboard import router as dashboard_router
+from time7_gateway.api.live_feed import router as live_feed_router
+from time7_gateway.api.ingest import router as ingest_router
+from time7_gateway.api.history import router as history_router
+from time7_gateway.api.metrics import register_state_metrics, router as metrics_router
 from time7_gateway.simulators.ias_services import mock_ias_lookup
-from time7_gateway.clients.ias_services import ias_lookup as real_ias_lookup
+from time7_gateway.clients.ias_services import ias_lookup as real_ias_lookup, close_ias_client
 
 #for debug
 from time7_gateway.debug.routes import router as debug_router
@@ -22,7 +36,10 @@ from time7_gateway.simulators.reader_streamer import router as reader_stream_rou
 
 load_dotenv()
 
-def create_app() -> FastAPI:
+log = logging.getLogger(__name__)
+
+def create_app(db_upsert=None) -> FastAPI:
+    # db_upsert: replaces the DB_BACKEND repository (benchmarks use an in-memory one)
     app = FastAPI(title="Time7 Gateway")
 
     app.add_middleware(
@@ -35,17 +52,126 @@ def create_app() -> FastAPI:
 
     # Shared in-memory state
     app.state.active_tags = ActiveTags(remove_grace_seconds=5.0)
-    app.state.tag_info_cache = TagInfoCache(cache_ttl_hours=24)
-    app.state.reader_connected = False #for reader status
+    # Optional on-disk verdict tier so restarts come up with a warm cache
+    store_path = os.getenv("VERDICT_STORE_PATH", "").strip()
+    warm_mode = os.getenv("VERDICT_STORE_WARM", "bulk")  # "bulk" or "lazy"
+    app.state.verdict_store = VerdictStore(store_path) if store_path else None
+    cache_ttl_hours = 24
+    app.state.tag_info_cache = TagInfoCache(
+        cache_ttl_hours=cache_ttl_hours,
+        max_entries=int(os.getenv("TAG_CACHE_MAX_ENTRIES", "500000")),
+        store=app.state.verdict_store,
+        lazy_load=warm_mode == "lazy",
+    )
+
+    # Write-behind DB persistence (batched upserts off the event loop) into
+    # the DB_BACKEND repository (supabase, postgres or sqlite)
+    app.state.repository = repository_from_env() if db_upsert is None else None
+    app.state.db_writer = DBWriter(
+        upsert=db_upsert or app.state.repository.upsert_tags,
+        max_queue=int(os.getenv("DB_QUEUE_MAX", "10000")),
+        batch_size=int(os.getenv("DB_BATCH_SIZE", "500")),
+        flush_interval=float(os.getenv("DB_FLUSH_SECONDS", "0.5")),
+        max_retries=int(os.getenv("DB_MAX_RETRIES", "5")),
+    )
+    # a row that is never written takes its verdict with it, so the next
+    # read of that tag is verified and written again
+    app.state.db_writer.on_drop = app.state.tag_info_cache.discard
 
     # IAS switch (mock vs real)
     ias_mode = os.getenv("IAS_MODE", "mock")
     app.state.ias_lookup = real_ias_lookup if ias_mode == "real" else mock_ias_lookup
 
+    # Async IAS verification stage (concurrent, de-duplicated per tidHex)
+    app.state.verifier = TagVerifier(
+        ias_lookup=app.state.ias_lookup,
+        cache=app.state.tag_info_cache,
+        db_writer=app.state.db_writer,
+        max_concurrency=int(os.getenv("IAS_MAX_CONCURRENCY", "16")),
+    )
+    if app.state.verdict_store is not None and warm_mode == "lazy":
+        # misses are looked up in the store (worker thread) before IAS
+        app.state.verifier.load_verdict = app.state.tag_info_cache.load
+
+    # Replay check: challenges IAS has answered are remembered for
+    # REPLAY_WINDOW_HOURS (0 = off; must be below the verdict TTL) in bounded
+    # memory sized for REPLAY_CAPACITY verifications per window
+    replay_hours = float(os.getenv("REPLAY_WINDOW_HOURS", "12"))
+    if replay_hours >= cache_ttl_hours:
+        raise ValueError(f"REPLAY_WINDOW_HOURS must be below the {cache_ttl_hours} h verdict TTL")
+    if replay_hours > 0:
+        app.state.verifier.replay_guard = ReplayGuard(
+            window=replay_hours * 3600.0,
+            capacity=int(os.getenv("REPLAY_CAPACITY", "1000000")),
+        )
+
+    # Sampled per-stage latency tracing (one read in TRACE_SAMPLE_EVERY; 0 = off)
+    trace_every = int(os.getenv("TRACE_SAMPLE_EVERY", "1000"))
+    app.state.tracer = LatencyTracer(sample_every=trace_every) if trace_every > 0 else None
+    app.state.verifier.tracer = app.state.tracer
+    app.state.db_writer.tracer = app.state.tracer
+
+    # Live tag feed: state changes fan out to SSE clients as deltas
+    app.state.live_feed = LiveFeedHub()
+    app.state.active_tags.on_change = app.state.live_feed.notify
+    app.state.tag_info_cache.on_change = app.state.live_feed.notify
+    app.state.verifier.on_change = app.state.live_feed.notify
+
+    # Optional append-only sighting log for /api/history: reads collapsed per
+    # tag, reader and antenna every SIGHTING_FLUSH_SECONDS into compressed
+    # segments of SIGHTING_SEGMENT_MINUTES, kept SIGHTING_RETENTION_HOURS
+    # (0 = forever) under SIGHTING_LOG_DIR (unset = off)
+    sighting_dir = os.getenv("SIGHTING_LOG_DIR", "").strip()
+    app.state.sighting_log = SightingLog(
+        sighting_dir,
+        segment_seconds=float(os.getenv("SIGHTING_SEGMENT_MINUTES", "60")) * 60.0,
+        flush_interval=float(os.getenv("SIGHTING_FLUSH_SECONDS", "5")),
+        retention=float(os.getenv("SIGHTING_RETENTION_HOURS", "168")) * 3600.0,
+        verdict=app.state.tag_info_cache.peek,
+        max_lag=float(os.getenv("READER_MAX_LAG_SECONDS", "60")),
+    ) if sighting_dir else None
+
+    # One ingestion task per reader (READER_URLS, or READER_BASE_URL),
+    # reconnecting with backoff; per-reader status for /api/reader-status.
+    # INGEST_WORKERS > 0 moves the reader streams into that many worker
+    # processes; this process still owns all tag state.
+    readers = reader_configs_from_env()
+    backoff_initial = float(os.getenv("READER_BACKOFF_SECONDS", "0.5"))
+    backoff_max = float(os.getenv("READER_BACKOFF_MAX_SECONDS", "30"))
+    ingest_workers = int(os.getenv("INGEST_WORKERS", "0"))
+    if ingest_workers > 0:
+        app.state.readers = ShardedIngest(
+            app,
+            readers,
+            workers=ingest_workers,
+            batch_max=max(int(os.getenv("READER_BATCH_MAX", "256")), 1),
+            batch_window=float(os.getenv("READER_BATCH_WINDOW_MS", "20")) / 1000.0,
+            backoff_initial=backoff_initial,
+            backoff_max=backoff_max,
+            sightings=app.state.sighting_log is not None,
+        )
+    else:
+        app.state.readers = ReaderSupervisor(
+            app,
+            readers,
+            backoff_initial=backoff_initial,
+            backoff_max=backoff_max,
+        )
+
+    # Push ingest (POST /api/ingest/events): events are applied in batches of
+    # up to INGEST_BATCH_MAX, same path as the reader stream
+    app.state.ingest_batch_max = max(int(os.getenv("INGEST_BATCH_MAX", "1000")), 1)
+    app.state.reader_max_lag = float(os.getenv("READER_MAX_LAG_SECONDS", "60"))
+
     # Routers
     app.include_router(reader_stream_router, tags=["reader-stream-sim"])
     app.include_router(terminal_inject_router, prefix="/api/sim", tags=["reader-terminal-sim"])
+    app.include_router(ingest_router, prefix="/api", tags=["ingest"])
+    app.include_router(history_router, prefix="/api", tags=["history"])
     app.include_router(dashboard_router, prefix="/api", tags=["dashboard"])
+    app.include_router(live_feed_router, prefix="/api", tags=["dashboard"])
+    app.include_router(metrics_router, tags=["metrics"])
+    register_state_metrics(app)
 
     # Debug endpoints
     app.include_router(debug_router)
@@ -55,10 +181,56 @@ def create_app() -> FastAPI:
         return {"ok": True}
 
  
+    async def _housekeeping():
+        # periodic expiry sweeps and verdict-store flushes, kept off the
+        # reader and request paths. A failing round is logged and the next
+        # one runs as usual (a failed store write keeps its rows for it).
+        # Active tags expire every HOUSEKEEPING_SECONDS; the verdict cache is
+        # swept every CACHE_SWEEP_SECONDS, as before housekeeping was shared.
+        interval = float(os.getenv("HOUSEKEEPING_SECONDS", "1"))
+        sweep_every = float(os.getenv("CACHE_SWEEP_SECONDS", "60"))
+        loop = asyncio.get_running_loop()
+        next_sweep = loop.time() + sweep_every
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                app.state.active_tags.remove_inactive()
+                if loop.time() >= next_sweep:
+                    next_sweep = loop.time() + sweep_every
+                    app.state.tag_info_cache.sweep()
+                if app.state.tracer is not None:
+                    app.state.tracer.expire()
+                await app.state.tag_info_cache.flush_store()
+            except Exception:
+                log.exception("housekeeping failed")
+
     @app.on_event("startup")
     async def _start_reader_stream():
-        asyncio.create_task(run_reader_stream(app))
-        
+        if app.state.verdict_store is not None and warm_mode == "bulk":
+            app.state.tag_info_cache.warm_start()
+        if app.state.repository is not None:
+            await app.state.repository.open()
+        app.state.db_writer.start()
+        if app.state.sighting_log is not None:
+            app.state.sighting_log.start()
+        app.state.housekeeping_task = asyncio.create_task(_housekeeping())
+        app.state.readers.start()
+
+    @app.on_event("shutdown")
+    async def _stop_db_writer():
+        # stop ingesting, finish pending verifications, then flush queued rows
+        await app.state.readers.stop()
+        if app.state.sighting_log is not None:
+            await app.state.sighting_log.stop()
+        app.state.housekeeping_task.cancel()
+        await app.state.verifier.drain()
+        await app.state.db_writer.stop()
+        if app.state.repository is not None:
+            await app.state.repository.close()
+        await close_ias_client()
+        await app.state.tag_info_cache.flush_store()
+        if app.state.verdict_store is not None:
+            app.state.verdict_store.close()
 
     return app
 
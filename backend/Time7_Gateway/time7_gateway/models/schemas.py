@@ -9,9 +9,9 @@ class ReaderEventBatch(BaseModel):
 #Scan-Result to be displayed on the Dashboard
 class ScanResult(BaseModel):
     tidHex: str
-    epcHex: str
+    epcHex: Optional[str] = None  # None for reads without an EPC (terminal sim, bare pushes)
     first_seen: datetime
-    auth: bool
+    auth: Optional[bool] = None  # None while IAS verification is pending
     info: Optional[str] = None
 
 # Authentication payload to be sent to IAS
@@ -19,3 +19,18 @@ class AuthPayload(BaseModel):
     messageHex: str
     responseHex: str
     tidHex: str
+
+
+# IAS verdict for one AuthPayload
+class AuthResult(BaseModel):
+    auth: bool
+    info: Optional[str] = None
+
+
+# Batch verification: results are returned in request order
+class AuthBatchRequest(BaseModel):
+    items: List[AuthPayload]
+
+
+class AuthBatchResponse(BaseModel):
+    results: List[AuthResult]
@@ -1,9 +1,12 @@
+from array import array
 from dataclasses import dataclass
+from itertools import compress
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Iterable, List, Optional, Set
+from sys import intern
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, cast
 
 
-@dataclass
+@dataclass(slots=True)
 class ActiveTag:
     tidHex: str
     first_seen: datetime
@@ -19,11 +22,59 @@ def _utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_us(dt: datetime) -> int:
+    # exact: microseconds since the epoch, naive datetimes taken as UTC
+    return (_utc(dt) - _EPOCH) // _MICROSECOND
+
+
+def _from_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+def _now_us() -> int:
+    return _to_us(datetime.now(timezone.utc))
+
+
+class _Times(dict):
+    # us -> datetime, converting each distinct value once; used through
+    # map(times.__getitem__, ...) so hits never leave C
+    def __missing__(self, us: int) -> datetime:
+        dt = self[us] = _from_us(us)
+        return dt
+
+
 class ActiveTags:
 
+    # Column storage: one slot per tag, per-slot values in arrays/lists,
+    # timestamps as int microseconds (datetimes only on read-out). Slots are
+    # in first_seen order (re-sorted before a read-out if a tag arrived out
+    # of order) and chained in last-seen order (_prev/_next), so expiry only
+    # touches the tags that expire. Removed slots stay empty until more than
+    # half are, then the columns are compacted. version changes whenever the
+    # tag set (or a tag's epcHex) changes; on_change gets each changed tidHex.
+
     def __init__(self, remove_grace_seconds: float) -> None:
-        self._tags: Dict[str, ActiveTag] = {}
-        self._grace = timedelta(seconds=float(remove_grace_seconds))
+        self._slot: Dict[str, int] = {}
+        self._tid: List[Optional[str]] = []     # None: empty slot
+        self._epc: List[Optional[str]] = []
+        self._first = array("q")
+        self._last = array("q")
+        self._prev = array("i")                 # last-seen chain, -1 = none
+        self._next = array("i")
+        self._head = -1                         # least recently seen
+        self._tail = -1                         # most recently seen
+        self._empty = 0
+        # messageHex/responseHex, only for tags that were given any
+        self._auth: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._grace_us = int(float(remove_grace_seconds) * 1_000_000)
+        self._newest_first_seen: Optional[int] = None
+        self._ordered = True                    # slots are in first_seen order
+        self.version = 0
+        self.on_change: Optional[Callable[[str], None]] = None
 
     def sync_seen(
         self,
@@ -32,72 +83,225 @@ class ActiveTags:
         messageHex: Optional[Dict[str, str]] = None,
         responseHex: Optional[Dict[str, str]] = None,
         seen_at: Optional[datetime] = None,
+        first_seen: Optional[Dict[str, datetime]] = None,
     ) -> Set[str]:
 
-        now = _utc(seen_at) if seen_at else datetime.now(timezone.utc)
+        now = _to_us(seen_at) if seen_at else _now_us()
         seen_now: Set[str] = {str(t) for t in (tidHex or [])}
 
         new_ids: Set[str] = set()
 
-        for tid in seen_now:
+        order: Iterable[str] = seen_now
+        if first_seen:
+            # insert new tags oldest first, so a batch alone keeps the order
+            order = sorted(seen_now, key=lambda t: _to_us(first_seen[t]) if t in first_seen else now)
+
+        slots = self._slot
+        last = self._last
+        for tid in order:
             epc_val = epcHex.get(tid) if epcHex else None
-            msg_val = messageHex.get(tid) if messageHex else None
-            resp_val = responseHex.get(tid) if responseHex else None
-
-            cur = self._tags.get(tid)
-            if cur is None:
-                self._tags[tid] = ActiveTag(
-                    tidHex=tid,
-                    first_seen=now,
-                    last_seen=now,
-                    epcHex=epc_val,
-                    messageHex=msg_val,
-                    responseHex=resp_val,
-                )
+
+            s = slots.get(tid)
+            if s is None:
+                first = now
+                if first_seen and tid in first_seen:
+                    first = _to_us(first_seen[tid])
+                if self._newest_first_seen is None or first >= self._newest_first_seen:
+                    self._newest_first_seen = first
+                else:
+                    self._ordered = False
+                self._append(tid, epc_val, first, now)
+                if messageHex is not None or responseHex is not None:
+                    self._set_auth(tid, messageHex, responseHex)
                 new_ids.add(tid)
+                if self.on_change:
+                    self.on_change(tid)
             else:
-             
-                cur.last_seen = now
-                if epcHex is not None:
-                    cur.epcHex = epc_val
-                if messageHex is not None:
-                    cur.messageHex = msg_val
-                if responseHex is not None:
-                    cur.responseHex = resp_val
-
+                last[s] = now
+                if s != self._tail:
+                    self._move_to_tail(s)
+                if epcHex is not None and self._epc[s] != epc_val:
+                    self._epc[s] = intern(epc_val) if epc_val else epc_val
+                    self.version += 1
+                    if self.on_change:
+                        self.on_change(tid)
+                if messageHex is not None or responseHex is not None:
+                    self._set_auth(tid, messageHex, responseHex)
 
+        if new_ids:
+            self.version += 1
+        self._expire(now)
         return new_ids
 
     def remove_inactive(self, now: Optional[datetime] = None) -> int:
-        now_utc = _utc(now) if now else datetime.now(timezone.utc)
-        cutoff = now_utc - self._grace
+        return self._expire(_to_us(now) if now else _now_us())
+
+    def _expire(self, now: int) -> int:
+        cutoff = now - self._grace_us
 
         removed = 0
-        for tid in list(self._tags.keys()):
-            if self._tags[tid].last_seen < cutoff:
-                del self._tags[tid]
-                removed += 1
+        last, nxt = self._last, self._next
+        while self._head >= 0 and last[self._head] < cutoff:
+            s = self._head
+            tid = cast(str, self._tid[s])  # chained slots are never empty
+            self._head = nxt[s]
+            del self._slot[tid]
+            self._tid[s] = self._epc[s] = None
+            self._auth.pop(tid, None)
+            removed += 1
+            if self.on_change:
+                self.on_change(tid)
+        if removed:
+            if self._head >= 0:
+                self._prev[self._head] = -1
+            else:
+                self._tail = -1
+            self._empty += removed
+            self.version += 1
+            if self._empty > 1024 and self._empty * 2 > len(self._tid):
+                self._compact()
         return removed
 
+    def _append(self, tid: str, epc: Optional[str], first: int, now: int) -> None:
+        s = len(self._tid)
+        self._tid.append(tid)
+        self._epc.append(intern(epc) if epc else epc)
+        self._first.append(first)
+        self._last.append(now)
+        self._prev.append(self._tail)
+        self._next.append(-1)
+        if self._tail >= 0:
+            self._next[self._tail] = s
+        else:
+            self._head = s
+        self._tail = s
+        self._slot[tid] = s
+
+    def _move_to_tail(self, s: int) -> None:
+        prev, nxt = self._prev, self._next
+        p, n = prev[s], nxt[s]
+        if p >= 0:
+            nxt[p] = n
+        else:
+            self._head = n
+        prev[n] = p  # s is not the tail, so n >= 0
+        prev[s] = self._tail
+        nxt[s] = -1
+        nxt[self._tail] = s
+        self._tail = s
+
+    def _set_auth(self, tid: str, messageHex, responseHex) -> None:
+        msg, resp = self._auth.get(tid, (None, None))
+        if messageHex is not None:
+            msg = messageHex.get(tid)
+        if responseHex is not None:
+            resp = responseHex.get(tid)
+        if msg is None and resp is None:
+            self._auth.pop(tid, None)
+        else:
+            self._auth[tid] = (msg, resp)
+
+    def _compact(self) -> None:
+        # drop empty slots and put the rest in first_seen order (stable, so
+        # ties keep insertion order); rebuilds the slot dict too, which
+        # (unlike a dict that had keys deleted) is sized to fit
+        live = [s for s, tid in enumerate(self._tid) if tid is not None]
+        if not self._ordered:
+            live.sort(key=self._first.__getitem__)
+            self._ordered = True
+        new_slot = array("i", [-1]) * len(self._tid)
+        for new, old in enumerate(live):
+            new_slot[old] = new
+
+        chain = []
+        s = self._head
+        while s >= 0:
+            chain.append(new_slot[s])
+            s = self._next[s]
+
+        self._tid = [self._tid[s] for s in live]
+        self._epc = [self._epc[s] for s in live]
+        self._first = array("q", [self._first[s] for s in live])
+        self._last = array("q", [self._last[s] for s in live])
+        self._slot = {cast(str, tid): s for s, tid in enumerate(self._tid)}
+        self._prev = array("i", [-1]) * len(live)
+        self._next = array("i", [-1]) * len(live)
+        for a, b in zip(chain, chain[1:]):
+            self._next[a] = b
+            self._prev[b] = a
+        self._head = chain[0] if chain else -1
+        self._tail = chain[-1] if chain else -1
+        self._empty = 0
+
+    def _columns(self, with_last: bool = False):
+        # live tags as parallel iterators, newest first_seen first (slots in
+        # reverse, after a re-sort if a tag arrived out of order): tidHex, epcHex, first_seen[, last_seen]
+        # as datetimes. Empty slots are dropped by compress(); everything
+        # runs in C except one datetime conversion per distinct timestamp.
+        if not self._ordered:
+            self._compact()
+        times = _Times()
+        tids, epcs = self._tid, self._epc
+        cols = [
+            compress(reversed(tids), reversed(tids)),
+            compress(reversed(epcs), reversed(tids)),
+            compress(map(times.__getitem__, reversed(self._first)), reversed(tids)),
+        ]
+        if with_last:
+            cols.append(compress(map(times.__getitem__, reversed(self._last)), reversed(tids)))
+        return cols
+
+    def _tag(self, s: int) -> ActiveTag:
+        tid = cast(str, self._tid[s])  # s comes from _slot, so it is live
+        msg, resp = self._auth.get(tid, (None, None)) if self._auth else (None, None)
+        return ActiveTag(tid, _from_us(self._first[s]), _from_us(self._last[s]), self._epc[s], msg, resp)
+
     def get_active(self) -> List[ActiveTag]:
-        self.remove_inactive()
-        return sorted(self._tags.values(), key=lambda x: x.first_seen, reverse=True)
+        # newest first_seen first
+        tids, epcs, firsts, lasts = self._columns(with_last=True)
+        tags = list(map(ActiveTag, tids, firsts, lasts, epcs))
+        if self._auth:
+            for t in tags:
+                auth = self._auth.get(t.tidHex)
+                if auth is not None:
+                    t.messageHex, t.responseHex = auth
+        return tags
+
+    def rows(self) -> List[Tuple[str, Optional[str], datetime]]:
+        # (tidHex, epcHex, first_seen) per tag, newest first_seen first; what
+        # the dashboard needs, without building an ActiveTag per tag
+        return list(zip(*self._columns()))
+
+    def get(self, tidHex: str) -> Optional[ActiveTag]:
+        s = self._slot.get(tidHex)
+        return self._tag(s) if s is not None else None
+
+    def __contains__(self, tidHex: str) -> bool:
+        return tidHex in self._slot
 
     def get_active_ids(self) -> List[str]:
-        self.remove_inactive()
-        return list(self._tags.keys())
+        # least recently seen first
+        ids: List[str] = []
+        s = self._head
+        while s >= 0:
+            ids.append(cast(str, self._tid[s]))
+            s = self._next[s]
+        return ids
+
+    def __len__(self) -> int:
+        return len(self._slot)
 
     def snapshot(self) -> dict:
-        self.remove_inactive()
+        auth = self._auth
         items = [
             {
-                "tidHex": t.tidHex,
-                "first_seen": t.first_seen,
-                "last_seen": t.last_seen,
-                "epcHex": t.epcHex,
-                "messageHex": t.messageHex,
-                "responseHex": t.responseHex,
+                "tidHex": tid,
+                "first_seen": first,
+                "last_seen": last,
+                "epcHex": epc,
+                "messageHex": auth[tid][0] if tid in auth else None,
+                "responseHex": auth[tid][1] if tid in auth else None,
             }
-            for t in self.get_active()
+            for tid, epc, first, last in zip(*self._columns(with_last=True))
         ]
-        return {"count": len(items), "items": items}
\ No newline at end of file
+        return {"count": len(items), "items": items}
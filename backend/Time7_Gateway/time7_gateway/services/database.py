@@ -1,14 +1,236 @@
-from datetime import datetime
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 from time7_gateway.clients.supabase_client import get_supabase
 
 
-def upsert_latest_tag(tidHex: str, seen_at: datetime, auth: bool, info: str | None, epcHex: str | None):
-    sb = get_supabase()
-    payload = {
+def tag_row(tidHex: str, seen_at: datetime, auth: bool, info: Optional[str], epcHex: Optional[str]) -> Dict[str, Any]:
+    # one row of the "data" table
+    return {
         "tid_hex": tidHex,
         "first_seen": seen_at.isoformat(),
         "auth": auth,
         "info": info,
         "epc_hex": epcHex,
     }
-    sb.table("data").upsert(payload).execute()
\ No newline at end of file
+
+
+def upsert_latest_tag(tidHex: str, seen_at: datetime, auth: bool, info: str | None, epcHex: str | None):
+    upsert_tags([tag_row(tidHex, seen_at, auth, info, epcHex)])
+
+
+def upsert_tags(rows: List[Dict[str, Any]]) -> None:
+    # multi-row upsert, one round trip for the whole batch
+    if not rows:
+        return
+    sb = get_supabase()
+    sb.table("data").upsert(rows).execute()
+
+
+# ----- REPOSITORIES -----
+# Where DBWriter sends its batches, chosen by DB_BACKEND:
+#   supabase  the Supabase REST client above (default)
+#   postgres  direct asyncpg pool on DATABASE_URL
+#   sqlite    embedded file (SQLITE_PATH), for offline runs, tests, benchmarks
+# Every backend upserts whole rows keyed by tid_hex (latest row wins), the
+# same as the Supabase upsert.
+
+COLUMNS = ("tid_hex", "first_seen", "auth", "info", "epc_hex")
+
+
+class TagRepository(ABC):
+
+    name = ""
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def upsert_tags(self, rows: List[Dict[str, Any]]) -> None:
+        ...
+
+    @abstractmethod
+    async def get_tag(self, tidHex: str) -> Optional[Dict[str, Any]]:
+        ...
+
+
+class SupabaseRepository(TagRepository):
+
+    name = "supabase"
+
+    async def upsert_tags(self, rows: List[Dict[str, Any]]) -> None:
+        # the client is blocking; keep it off the event loop
+        await asyncio.to_thread(upsert_tags, rows)
+
+    async def get_tag(self, tidHex: str) -> Optional[Dict[str, Any]]:
+        def fetch():
+            res = get_supabase().table("data").select("*").eq("tid_hex", tidHex).limit(1).execute()
+            return res.data[0] if res.data else None
+        return await asyncio.to_thread(fetch)
+
+
+class SQLiteRepository(TagRepository):
+
+    # One connection used from worker threads under a lock; WAL so readers
+    # (sqlite3 CLI, benchmarks) do not block the writer.
+
+    name = "sqlite"
+
+    UPSERT = (
+        "INSERT INTO data (tid_hex, first_seen, auth, info, epc_hex) "
+        "VALUES (:tid_hex, :first_seen, :auth, :info, :epc_hex) "
+        "ON CONFLICT (tid_hex) DO UPDATE SET first_seen = excluded.first_seen, "
+        "auth = excluded.auth, info = excluded.info, epc_hex = excluded.epc_hex"
+    )
+
+    def __init__(self, path: str = "time7.db") -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS data ("
+            " tid_hex TEXT PRIMARY KEY, first_seen TEXT NOT NULL, auth BOOLEAN, info TEXT, epc_hex TEXT)"
+        )
+        conn.commit()
+        self._conn = conn
+
+    async def open(self) -> None:
+        if self._conn is None:
+            await asyncio.to_thread(self._open)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(conn.close)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("SQLiteRepository is not open; call open() first")
+        return self._conn
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        conn = self._connection()
+        with self._lock, conn:
+            conn.executemany(self.UPSERT, rows)
+
+    async def upsert_tags(self, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            await asyncio.to_thread(self._upsert, rows)
+
+    def _get(self, tidHex: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        with self._lock:
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM data WHERE tid_hex = ?", (tidHex,)
+            ).fetchone()
+        if row is None:
+            return None
+        out = dict(zip(COLUMNS, row))
+        out["auth"] = None if out["auth"] is None else bool(out["auth"])
+        return out
+
+    async def get_tag(self, tidHex: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, tidHex)
+
+
+def pg_record(row: Dict[str, Any]) -> tuple:
+    # asyncpg wants native types; first_seen is "timestamp without time zone",
+    # stored as UTC
+    seen = datetime.fromisoformat(row["first_seen"])
+    if seen.tzinfo is not None:
+        seen = seen.astimezone(timezone.utc).replace(tzinfo=None)
+    return (row["tid_hex"], seen, row["auth"], row["info"], row["epc_hex"])
+
+
+class PostgresRepository(TagRepository):
+
+    # Direct connection pool (asyncpg). Small batches use executemany on a
+    # prepared upsert; batches of copy_min_rows or more are COPYed into a
+    # per-session temp table and merged with one INSERT ... SELECT.
+
+    name = "postgres"
+
+    UPSERT = (
+        "INSERT INTO data (tid_hex, first_seen, auth, info, epc_hex) VALUES ($1, $2, $3, $4, $5) "
+        "ON CONFLICT (tid_hex) DO UPDATE SET first_seen = EXCLUDED.first_seen, "
+        "auth = EXCLUDED.auth, info = EXCLUDED.info, epc_hex = EXCLUDED.epc_hex"
+    )
+    STAGE = "CREATE TEMP TABLE IF NOT EXISTS data_stage (LIKE data INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    MERGE = (
+        "INSERT INTO data (tid_hex, first_seen, auth, info, epc_hex) "
+        "SELECT tid_hex, first_seen, auth, info, epc_hex FROM data_stage "
+        "ON CONFLICT (tid_hex) DO UPDATE SET first_seen = EXCLUDED.first_seen, "
+        "auth = EXCLUDED.auth, info = EXCLUDED.info, epc_hex = EXCLUDED.epc_hex"
+    )
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 4, copy_min_rows: int = 1000) -> None:
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.copy_min_rows = copy_min_rows
+        self._pool: Optional[Any] = None  # asyncpg.Pool once open
+
+    async def open(self) -> None:
+        if self._pool is None:
+            import asyncpg  # optional: only needed for DB_BACKEND=postgres
+
+            self._pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+
+    def _acquire(self):
+        if self._pool is None:
+            raise RuntimeError("PostgresRepository is not open; call open() first")
+        return self._pool.acquire()
+
+    async def upsert_tags(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        records = [pg_record(r) for r in rows]
+        async with self._acquire() as conn:
+            async with conn.transaction():
+                if len(records) < self.copy_min_rows:
+                    await conn.executemany(self.UPSERT, records)
+                else:
+                    await conn.execute(self.STAGE)
+                    await conn.copy_records_to_table("data_stage", records=records, columns=COLUMNS)
+                    await conn.execute(self.MERGE)
+
+    async def get_tag(self, tidHex: str) -> Optional[Dict[str, Any]]:
+        async with self._acquire() as conn:
+            row = await conn.fetchrow(f"SELECT {', '.join(COLUMNS)} FROM data WHERE tid_hex = $1", tidHex)
+        return dict(row) if row is not None else None
+
+
+def repository_from_env() -> TagRepository:
+    backend = os.getenv("DB_BACKEND", "supabase").strip().lower()
+    if backend == "supabase":
+        return SupabaseRepository()
+    if backend == "sqlite":
+        return SQLiteRepository(os.getenv("SQLITE_PATH", "time7.db"))
+    if backend == "postgres":
+        dsn = os.getenv("DATABASE_URL", "").strip()
+        if not dsn:
+            raise ValueError("DB_BACKEND=postgres needs DATABASE_URL")
+        return PostgresRepository(
+            dsn,
+            min_size=int(os.getenv("DB_POOL_MIN", "1")),
+            max_size=int(os.getenv("DB_POOL_MAX", "4")),
+            copy_min_rows=int(os.getenv("DB_COPY_MIN_ROWS", "1000")),
+        )
+    raise ValueError(f"unknown DB_BACKEND {backend!r} (expected supabase, postgres or sqlite)")
@@ -0,0 +1,203 @@
+import asyncio
+import inspect
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from time7_gateway.services.database import tag_row, upsert_tags
+from time7_gateway.services.metrics import DB_UPSERT_SECONDS
+
+log = logging.getLogger(__name__)
+
+
+class DBWriter:
+
+    # Write-behind persistence stage.
+    # The reader loop only enqueues rows; a background flusher merges them by
+    # tid_hex and sends one multi-row upsert per flush interval / batch size.
+    # A blocking upsert (the Supabase call) runs in a worker thread so the
+    # event loop (reader stream, dashboard, /health) never stalls on a DB
+    # round trip; an async one (TagRepository.upsert_tags) is awaited.
+    # Rows of a failed flush are sent again, merged with newer rows, every
+    # retry_interval seconds, up to max_retries times. A row that is given up
+    # on, or does not fit in the queue, is reported to on_drop: its verdict
+    # is already cached, so without that the tag would not be written again
+    # until the verdict expires.
+
+    def __init__(
+        self,
+        upsert: Callable[[List[Dict[str, Any]]], Any] = upsert_tags,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_retries: int = 5,
+        retry_interval: float = 2.0,
+    ) -> None:
+        self._upsert = upsert
+        self._upsert_is_async = inspect.iscoroutinefunction(upsert) or inspect.iscoroutinefunction(
+            getattr(upsert, "__call__", None)
+        )
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=int(max_queue))
+        self.batch_size = int(batch_size)
+        self.flush_interval = float(flush_interval)
+        self.max_retries = int(max_retries)
+        self.retry_interval = float(retry_interval)
+        self._retry: Dict[str, Dict[str, Any]] = {}  # rows of the last failed flush, by tid_hex
+        self._failures: Dict[str, int] = {}  # tid_hex -> failed flushes of its current row
+        self._task: Optional[asyncio.Task] = None
+        self.tracer = None  # optional LatencyTracer
+        self.on_drop: Optional[Callable[[str], None]] = None  # called with the tid_hex of a dropped row
+
+        # stats
+        self.enqueued = 0
+        self.dropped = 0
+        self.writes_saved = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.retried = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self._total_flush_seconds = 0.0
+
+    def enqueue(
+        self,
+        tidHex: str,
+        seen_at: datetime,
+        auth: bool,
+        info: Optional[str],
+        epcHex: Optional[str],
+    ) -> bool:
+        # never blocks the caller; a full queue means the DB is far behind
+        try:
+            self._queue.put_nowait(tag_row(tidHex, seen_at, auth, info, epcHex))
+        except asyncio.QueueFull:
+            log.warning("db writer queue full, dropping row for %s", tidHex)
+            self._drop(tidHex)
+            return False
+        self.enqueued += 1
+        return True
+
+    def _drop(self, tidHex: str) -> None:
+        self.dropped += 1
+        if self.on_drop:
+            self.on_drop(tidHex)
+
+    def skip(self) -> None:
+        # caller decided a write was redundant (verdict unchanged)
+        self.writes_saved += 1
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # drain everything already queued, then exit
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            # merge by tid_hex: latest row for a tag wins
+            pending, self._retry = self._retry, {}
+            if pending:
+                # last flush failed: back off, then send it with whatever arrived
+                await asyncio.sleep(self.retry_interval)
+            else:
+                row = await self._queue.get()
+                if row is None:
+                    break
+                pending[row["tid_hex"]] = row
+            deadline = loop.time() + self.flush_interval
+
+            while len(pending) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                if self._failures:
+                    self._failures.pop(row["tid_hex"], None)  # a newer row starts over
+                pending[row["tid_hex"]] = row
+
+            await self._flush(list(pending.values()))
+
+        # shutdown: flush whatever is still sitting in the queue (one attempt)
+        rest, self._retry = self._retry, {}
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not None:
+                rest[row["tid_hex"]] = row
+        if rest:
+            await self._flush(list(rest.values()))
+        self._retry.clear()
+        self._failures.clear()
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        t0 = time.perf_counter()
+        try:
+            if self._upsert_is_async:
+                await self._upsert(rows)
+            else:
+                await asyncio.to_thread(self._upsert, rows)
+        except Exception:
+            self.flush_errors += 1
+            log.exception("db writer flush of %d rows failed", len(rows))
+            self._requeue(rows)
+            return
+        finally:
+            elapsed = time.perf_counter() - t0
+            DB_UPSERT_SECONDS.observe(elapsed)
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            self._total_flush_seconds += elapsed
+            self.flushes += 1
+
+        self.rows_written += len(rows)
+        if self._failures:
+            for row in rows:
+                self._failures.pop(row["tid_hex"], None)
+        if self.tracer:
+            self.tracer.mark_many((row["tid_hex"] for row in rows), "persisted")
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            tid = row["tid_hex"]
+            failures = self._failures.get(tid, 0) + 1
+            if failures > self.max_retries:
+                del self._failures[tid]
+                log.warning("db writer giving up on the row for %s", tid)
+                self._drop(tid)
+                continue
+            self._failures[tid] = failures
+            self._retry[tid] = row
+            self.retried += 1
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "writes_saved": self.writes_saved,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "retried": self.retried,
+            "retry_pending": len(self._retry),
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds,
+            "avg_flush_seconds": self._total_flush_seconds / self.flushes if self.flushes else 0.0,
+        }
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Set
+
+
+class Subscription:
+
+    # Per-client change buffer. Changes are coalesced by tidHex (a tag that
+    # changes ten times between ticks is sent once). If a slow client lets
+    # more than max_pending distinct tags pile up, the buffer is dropped and
+    # the client is sent a fresh snapshot instead.
+
+    __slots__ = ("pending", "resync", "wakeup", "max_pending")
+
+    def __init__(self, max_pending: int) -> None:
+        self.pending: Set[str] = set()
+        self.resync = False
+        self.wakeup = asyncio.Event()
+        self.max_pending = max_pending
+
+    def notify(self, tidHex: str) -> None:
+        if self.resync:
+            return
+        self.pending.add(tidHex)
+        if len(self.pending) > self.max_pending:
+            self.pending = set()
+            self.resync = True
+        self.wakeup.set()
+
+    def take(self) -> Set[str]:
+        changed, self.pending = self.pending, set()
+        self.wakeup.clear()
+        return changed
+
+
+class LiveFeedHub:
+
+    # Fan-out point for tag changes. ActiveTags, TagInfoCache and TagVerifier
+    # call notify(tidHex) through their on_change hook; each connected client
+    # gets the tidHex in its own coalescing buffer. Work per change is
+    # O(subscribers), independent of how many tags are in the field.
+
+    def __init__(self, max_pending: int = 10_000) -> None:
+        self.max_pending = int(max_pending)
+        self._subs: Set[Subscription] = set()
+
+    def notify(self, tidHex: str) -> None:
+        for sub in self._subs:
+            sub.notify(tidHex)
+
+    def subscribe(self) -> Subscription:
+        sub = Subscription(self.max_pending)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subs.discard(sub)
+
+    def __len__(self) -> int:
+        return len(self._subs)
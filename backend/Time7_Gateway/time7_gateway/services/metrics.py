@@ -0,0 +1,206 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus-style metrics (text exposition format 0.0.4).
+#
+# Hot-path metrics are plain Python objects: Counter.inc is one dict update,
+# Histogram.observe is one bisect over a short bucket list. Anything the
+# gateway already counts (cache hits, rows written, queue sizes, ...) is not
+# counted twice; it is read from the existing stats at scrape time through
+# callback metrics registered in main.py.
+
+Labels = Tuple[str, ...]
+
+# seconds; covers a sub-ms decode up to a multi-second IAS/DB round trip
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+
+    __slots__ = ("name", "help", "labelnames", "_values")
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_num(v)}")
+        return lines
+
+
+class Histogram:
+
+    __slots__ = ("name", "help", "labelnames", "buckets", "_series")
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [per-bucket counts (non-cumulative) + overflow, sum]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = 'le="' + _num(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+
+    # Value(s) read at scrape time. fn returns a number, or a mapping of
+    # label-value tuples to numbers; exceptions and None skip the sample.
+
+    __slots__ = ("name", "help", "kind", "labelnames", "fn")
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        items: Iterable = value.items() if isinstance(value, dict) else [((), value)]
+        for labels, v in items:
+            if v is None:
+                continue
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_num(float(v))}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+
+    def _add(self, metric):
+        # re-registering a name replaces it (create_app may run more than once)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def gauge_func(self, name: str, help: str, fn: Callable, labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self._add(CallbackMetric(name, help, "gauge", fn, labelnames))
+
+    def counter_func(self, name: str, help: str, fn: Callable, labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self._add(CallbackMetric(name, help, "counter", fn, labelnames))
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ----- hot-path metrics -----
+EVENTS_SKIPPED = REGISTRY.counter(
+    "time7_events_skipped_total",
+    "Reader events not sent to IAS, by reason",
+    ["reason"],
+)
+PUSH_EVENTS = REGISTRY.counter(
+    "time7_push_events_total",
+    "tagInventory events received on the push ingest endpoint",
+)
+DECODE_SECONDS = REGISTRY.histogram(
+    "time7_decode_seconds",
+    "Time to split and decode one chunk of the reader stream",
+)
+IAS_CALLS = REGISTRY.counter(
+    "time7_ias_calls_total",
+    "IAS verification calls, by outcome",
+    ["outcome"],
+)
+IAS_SECONDS = REGISTRY.histogram(
+    "time7_ias_latency_seconds",
+    "IAS lookup latency (including retries)",
+)
+DB_UPSERT_SECONDS = REGISTRY.histogram(
+    "time7_db_upsert_seconds",
+    "Latency of one batched database upsert",
+)
+READ_TO_VERDICT_SECONDS = REGISTRY.histogram(
+    "time7_read_to_verdict_seconds",
+    "Time from a tag read to its IAS verdict being cached",
+)
+STAGE_LAG_SECONDS = REGISTRY.histogram(
+    "time7_stage_lag_seconds",
+    "Sampled reads: time from the reader's read time to each pipeline stage",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
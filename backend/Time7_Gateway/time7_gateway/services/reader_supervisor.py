@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from time7_gateway.clients.reader_client import run_reader_stream
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReaderConfig:
+    name: str
+    base_url: str
+    user: str = ""
+    password: str = ""
+
+
+def reader_configs_from_env() -> List[ReaderConfig]:
+    # READER_URLS is a comma-separated list of base URLs, optionally named:
+    #   READER_URLS="dock-1=http://impinj-13-fb-57.local/api/v1,http://10.0.0.12/api/v1"
+    # All readers share READER_USER / READER_PASSWORD. Without READER_URLS the
+    # single READER_BASE_URL is used, as before.
+    user = os.getenv("READER_USER", "").strip()
+    password = os.getenv("READER_PASSWORD", "").strip()
+
+    entries = [e.strip() for e in os.getenv("READER_URLS", "").split(",") if e.strip()]
+    if not entries:
+        entries = [os.getenv("READER_BASE_URL", "").strip()]
+
+    configs = []
+    for i, entry in enumerate(entries, start=1):
+        name, sep, url = entry.partition("=")
+        if not sep or "://" in name:
+            name, url = f"reader-{i}", entry
+        configs.append(ReaderConfig(name=name.strip(), base_url=url.strip(), user=user, password=password))
+    return configs
+
+
+class ReaderStatus:
+
+    # Per-reader state, updated in place by run_reader_stream (connected,
+    # events) and by the supervisor (everything else).
+
+    __slots__ = (
+        "name", "base_url", "state", "connected", "events", "connects",
+        "failures", "last_error", "connected_since", "next_retry_at",
+    )
+
+    def __init__(self, name: str, base_url: str) -> None:
+        self.name = name
+        self.base_url = base_url
+        self.state = "stopped"  # connecting | streaming | backoff | stopped
+        self.connected = False
+        self.events = 0
+        self.connects = 0
+        self.failures = 0  # consecutive attempts that ended without a healthy stream
+        self.last_error: Optional[str] = None
+        self.connected_since: Optional[float] = None
+        self.next_retry_at: Optional[float] = None
+
+    def mark_connected(self) -> None:
+        self.connected = True
+        self.state = "streaming"
+        self.connects += 1
+        self.connected_since = time.time()
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "base_url": self.base_url,
+            "state": self.state,
+            "connected": self.connected,
+            "events": self.events,
+            "connects": self.connects,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "connected_since": self.connected_since,
+            "next_retry_at": self.next_retry_at,
+        }
+
+
+class ReaderSupervisor:
+
+    # One ingestion task per configured reader, all feeding the shared
+    # ActiveTags / TagVerifier on app.state. A stream that ends or fails is
+    # reopened after an exponential backoff with jitter; the backoff resets
+    # once a connection has stayed up for stable_seconds.
+    # run(app, reader=, status=) is the per-reader ingestion coroutine;
+    # run_reader_stream unless given (sharded ingestion forwards instead).
+
+    def __init__(
+        self,
+        app,
+        readers: List[ReaderConfig],
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        stable_seconds: float = 10.0,
+        run: Optional[Callable[..., Awaitable[None]]] = None,
+    ) -> None:
+        self.app = app
+        self._run = run
+        self.readers = list(readers)
+        self.backoff_initial = float(backoff_initial)
+        self.backoff_max = float(backoff_max)
+        self.stable_seconds = float(stable_seconds)
+        self.status: Dict[str, ReaderStatus] = {
+            r.name: ReaderStatus(r.name, r.base_url) for r in self.readers
+        }
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks.values())
+
+    @property
+    def connected(self) -> bool:
+        return any(s.connected for s in self.status.values())
+
+    def start(self) -> None:
+        for reader in self.readers:
+            task = self._tasks.get(reader.name)
+            if task is None or task.done():
+                self._tasks[reader.name] = asyncio.create_task(self._supervise(reader))
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def backoff_delay(self, failures: int) -> float:
+        # "equal jitter": half the exponential step is fixed, half is random,
+        # so many readers dropping together do not all retry at the same
+        # instant, and a flapping reader never retries with zero delay
+        step = min(self.backoff_max, self.backoff_initial * (2 ** max(failures - 1, 0)))
+        return step / 2 + random.uniform(0, step / 2)
+
+    async def _supervise(self, reader: ReaderConfig) -> None:
+        status = self.status[reader.name]
+        try:
+            while True:
+                status.state = "connecting"
+                status.next_retry_at = None
+                try:
+                    run = self._run or run_reader_stream
+                    await run(self.app, reader=reader, status=status)
+                    status.last_error = "stream ended"
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    status.last_error = f"{type(e).__name__}: {e}"
+                    log.warning("reader %s (%s) failed: %s", reader.name, reader.base_url, status.last_error)
+
+                up_for = time.time() - status.connected_since if status.connected_since else 0.0
+                if status.connected_since is not None and up_for >= self.stable_seconds:
+                    status.failures = 1
+                else:
+                    status.failures += 1
+                status.connected_since = None
+
+                delay = self.backoff_delay(status.failures)
+                status.state = "backoff"
+                status.next_retry_at = time.time() + delay
+                await asyncio.sleep(delay)
+        finally:
+            status.state = "stopped"
+            status.connected = False
+            status.connected_since = None
+            status.next_retry_at = None
+
+    def stats(self) -> List[dict]:
+        return [s.as_dict() for s in self.status.values()]
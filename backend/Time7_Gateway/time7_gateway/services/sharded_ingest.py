@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import queue as queue_mod
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from time7_gateway.clients.reader_client import (
+    ImpinjReaderClient,
+    apply_tag_updates,
+    collapse_events,
+    window_batches,
+)
+from time7_gateway.services.reader_supervisor import ReaderConfig, ReaderSupervisor
+from time7_gateway.services.sighting_log import SightingBuffer
+
+log = logging.getLogger(__name__)
+
+STATUS_SECONDS = 1.0
+
+
+# ----- worker process -----
+# Each worker owns a subset of the readers: it holds the HTTP streams, splits
+# and decodes NDJSON, and collapses every micro-batch to one compact update
+# per tag (collapse_events). Only those updates cross the process boundary,
+# plus, with the sighting log on, the worker's collapsed sightings once per
+# status interval.
+
+async def _put(out, msg) -> None:
+    # mp.Queue.put blocks the calling thread when the queue is full, which
+    # would freeze every reader's stream in this worker. Only the coroutine
+    # that hit the full queue waits, off the loop, so backpressure stays per
+    # reader.
+    try:
+        out.put_nowait(msg)
+    except queue_mod.Full:
+        await asyncio.to_thread(out.put, msg)
+
+
+async def _forward_stream(out, batch_max: int, batch_window: float, reader: ReaderConfig, status, sightings) -> None:
+    client = ImpinjReaderClient(reader.base_url, reader.user, reader.password)
+    try:
+        batches = window_batches(client.stream_batches(on_connect=status.mark_connected), batch_max, batch_window)
+        async for batch in batches:
+            status.events += len(batch)
+            if sightings is not None:
+                sightings.record(batch, reader.name, int(time.time() * 1000))
+            # waits when the coordinator is behind, which backs up this socket
+            await _put(out, ("batch", len(batch), time.time(), collapse_events(batch)))
+    finally:
+        await client.aclose()
+        status.connected = False
+
+
+async def _worker(readers, out, batch_max, batch_window, backoff_initial, backoff_max, sightings=False) -> None:
+    buffer = SightingBuffer(float(os.getenv("READER_MAX_LAG_SECONDS", "60"))) if sightings else None
+
+    def run(app, reader, status):
+        return _forward_stream(out, batch_max, batch_window, reader, status, buffer)
+
+    sup = ReaderSupervisor(None, readers, backoff_initial=backoff_initial, backoff_max=backoff_max, run=run)
+    sup.start()
+    while True:
+        try:
+            out.put_nowait(("status", sup.stats()))
+        except queue_mod.Full:
+            pass  # a newer report follows in STATUS_SECONDS
+        if buffer is not None and len(buffer):
+            await _put(out, ("sightings", buffer.drain()))
+        await asyncio.sleep(STATUS_SECONDS)
+
+
+def _worker_main(readers, out, batch_max, batch_window, backoff_initial, backoff_max, sightings=False) -> None:
+    try:
+        asyncio.run(_worker(readers, out, batch_max, batch_window, backoff_initial, backoff_max, sightings))
+    except KeyboardInterrupt:
+        pass
+
+
+# ----- coordinator (gateway process) -----
+
+class ShardedIngest:
+
+    # Optional multi-process ingestion (INGEST_WORKERS > 0). Readers are
+    # spread round-robin over worker processes; the gateway process stays the
+    # only owner of ActiveTags, TagInfoCache and the verifier and applies the
+    # workers' updates in arrival order, so /api/active-tags and the live
+    # feed are unchanged. Same interface as ReaderSupervisor (start, stop,
+    # running, connected, stats). A worker that dies is restarted.
+
+    def __init__(
+        self,
+        app,
+        readers: List[ReaderConfig],
+        workers: int,
+        batch_max: int = 256,
+        batch_window: float = 0.02,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        queue_max: int = 1024,
+        sightings: bool = False,
+    ) -> None:
+        self.app = app
+        self.readers = list(readers)
+        self.workers = max(1, min(int(workers), len(self.readers) or 1))
+        self.shards: List[List[ReaderConfig]] = [self.readers[i::self.workers] for i in range(self.workers)]
+        self.batch_max = int(batch_max)
+        self.batch_window = float(batch_window)
+        self.backoff_initial = float(backoff_initial)
+        self.backoff_max = float(backoff_max)
+        self.sightings = sightings  # workers ship sightings for app.state.sighting_log
+
+        self.queue_max = int(queue_max)
+        self._ctx = mp.get_context("spawn")
+        self._queue = None
+        self._procs: List[Optional[mp.process.BaseProcess]] = [None] * self.workers
+        self._task: Optional[asyncio.Task] = None
+        self._status: Dict[str, dict] = {}
+
+        # stats
+        self.batches = 0
+        self.events = 0
+        self.updates = 0
+        self.restarts = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def connected(self) -> bool:
+        return any(s["connected"] for s in self.stats())
+
+    def _spawn(self, i: int) -> None:
+        p = self._ctx.Process(
+            target=_worker_main,
+            args=(self.shards[i], self._queue, self.batch_max, self.batch_window,
+                  self.backoff_initial, self.backoff_max, self.sightings),
+            name=f"ingest-worker-{i}",
+            daemon=True,
+        )
+        p.start()
+        self._procs[i] = p
+
+    def start(self) -> None:
+        if self.running:
+            return
+        # fresh queue per start: a worker terminated mid-put can leave the old one unusable
+        self._queue = self._ctx.Queue(maxsize=self.queue_max)
+        for i in range(self.workers):
+            self._spawn(i)
+        self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        procs = [p for p in self._procs if p is not None]
+        self._procs = [None] * self.workers
+        for p in procs:
+            p.terminate()
+        await asyncio.to_thread(lambda: [p.join(5.0) for p in procs])
+        self._status.clear()
+
+    def _get(self):
+        try:
+            return self._queue.get(timeout=0.5)
+        except queue_mod.Empty:
+            return None
+
+    async def _consume(self) -> None:
+        while True:
+            msg = await asyncio.to_thread(self._get)
+            if msg is not None:
+                self.apply(msg)
+                # drain whatever else is already queued without a thread hop
+                while True:
+                    try:
+                        msg = self._queue.get_nowait()
+                    except queue_mod.Empty:
+                        break
+                    self.apply(msg)
+
+            for i, p in enumerate(self._procs):
+                if p is not None and not p.is_alive():
+                    log.warning("ingest worker %d exited (%s), restarting", i, p.exitcode)
+                    self.restarts += 1
+                    self._spawn(i)
+
+    def apply(self, msg) -> None:
+        kind = msg[0]
+        if kind == "batch":
+            _, n_events, ts, updates = msg
+            state = self.app.state
+            apply_tag_updates(
+                updates,
+                seen_at=datetime.fromtimestamp(ts, timezone.utc),
+                active_tags=state.active_tags,
+                cache=state.tag_info_cache,
+                verifier=state.verifier,
+                db_writer=state.db_writer,
+                tracer=getattr(state, "tracer", None),
+                max_lag=getattr(state, "reader_max_lag", 60.0),
+            )
+            self.batches += 1
+            self.events += n_events
+            self.updates += len(updates)
+        elif kind == "sightings":
+            log = getattr(self.app.state, "sighting_log", None)
+            if log is not None:
+                log.extend(msg[1])
+        elif kind == "status":
+            for s in msg[1]:
+                self._status[s["name"]] = s
+
+    def stats(self) -> List[dict]:
+        out = []
+        for i, shard in enumerate(self.shards):
+            p = self._procs[i]
+            alive = p is not None and p.is_alive()
+            for r in shard:
+                s = dict(self._status.get(r.name) or {"name": r.name, "base_url": r.base_url, "events": 0})
+                if not alive:
+                    s.update(state="stopped", connected=False)
+                s.setdefault("state", "connecting")
+                s.setdefault("connected", False)
+                s["worker"] = i
+                out.append(s)
+        return out
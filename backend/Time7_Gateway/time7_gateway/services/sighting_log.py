@@ -0,0 +1,506 @@
+import asyncio
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from time7_gateway.clients.event_decoder import parse_reader_time
+
+log = logging.getLogger(__name__)
+
+# One sighting as it is buffered and written:
+# (tidHex, epcHex, reader, antenna, rssi, seen_ms, reads)
+# seen_ms is the reader time of the first read in the flush interval (unix
+# milliseconds), rssi
+# the peak (centi-dBm), reads the number of reads it stands for.
+Sighting = Tuple[str, Optional[str], str, Optional[int], Optional[int], int, int]
+
+# A segment's block directory ([offset, length, min_ts, max_ts] per block)
+# and TID index (tid -> [block, row offset, block, row offset, ...]).
+Blocks = List[List[int]]
+TidIndex = Dict[str, List[int]]
+
+_LEN = struct.Struct(">I")
+
+
+class SightingBuffer:
+
+    # Collapses reads to one sighting per (tag, reader, antenna) until the
+    # next drain(), so a tag sitting in the field costs one row per flush
+    # interval instead of one per read. Used by SightingLog and, with
+    # INGEST_WORKERS > 0, inside each worker process (drained rows are
+    # shipped to the gateway process).
+    #
+    # A sighting's time is the reader's readTime, so a gateway backlog does
+    # not shift the history; as for first_seen (reader_first_seen), a reader
+    # time in the future or more than max_lag seconds behind seen_ms falls
+    # back to seen_ms. Only the first read per key is parsed.
+
+    __slots__ = ("_pending", "max_lag_ms")
+
+    def __init__(self, max_lag: float = 60.0) -> None:
+        self._pending: Dict[tuple, list] = {}
+        self.max_lag_ms = int(max_lag * 1000)
+
+    def record(self, events, reader: str, seen_ms: int) -> None:
+        pending = self._pending
+        for ev in events:
+            tid = ev.tidHex
+            if not tid:
+                continue
+            key = (tid, reader, ev.antenna)
+            entry = pending.get(key)
+            if entry is None:
+                pending[key] = [ev.epcHex, ev.rssi, self._read_ms(ev.readTime, seen_ms), 1]
+                continue
+            entry[3] += 1
+            if ev.epcHex:
+                entry[0] = ev.epcHex
+            rssi = ev.rssi
+            if rssi is not None and (entry[1] is None or rssi > entry[1]):
+                entry[1] = rssi
+
+    def _read_ms(self, read_time: Optional[str], seen_ms: int) -> int:
+        read = parse_reader_time(read_time)
+        if read is None:
+            return seen_ms
+        read_ms = int(read.timestamp() * 1000)
+        if read_ms > seen_ms or seen_ms - read_ms > self.max_lag_ms:
+            return seen_ms
+        return read_ms
+
+    def drain(self) -> List[Sighting]:
+        pending, self._pending = self._pending, {}
+        return [(tid, e[0], reader, antenna, e[1], e[2], e[3]) for (tid, reader, antenna), e in pending.items()]
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+def encode_block(rows: List[tuple]) -> Tuple[bytes, List[int]]:
+    # One JSON array per line, zlib-compressed (reader names, verdict strings
+    # and the shared TID/EPC prefixes compress away; ~11 bytes per sighting).
+    # Returns the block and each row's offset in the uncompressed text, which
+    # the TID index keeps so a tag lookup parses only that tag's rows.
+    offsets, pos, lines = [], 0, []
+    for row in rows:
+        line = json.dumps(row, separators=(",", ":")).encode()
+        offsets.append(pos)
+        pos += len(line) + 1
+        lines.append(line)
+    return zlib.compress(b"\n".join(lines) + b"\n", 6), offsets
+
+
+def decode_block(data: bytes) -> List[list]:
+    # JSON never has a raw newline inside a value, so the lines join into an array
+    raw = zlib.decompress(data)
+    return json.loads(b"[" + raw[:-1].replace(b"\n", b",") + b"]")
+
+
+def decode_rows(data: bytes, offsets: Iterable[int]) -> List[list]:
+    raw = zlib.decompress(data)
+    return [json.loads(raw[off:raw.index(b"\n", off)]) for off in offsets]
+
+
+class _Segment:
+
+    # One time partition on disk: <name>.seg holds length-prefixed blocks,
+    # <name>.idx (written when the segment is sealed) the block directory
+    # and the TID index. min_ts/max_ts always stay in memory; the index of a
+    # sealed segment is loaded on demand (blocks and tids stay empty).
+
+    __slots__ = ("path", "start_ms", "min_ts", "max_ts", "size", "blocks", "tids", "sealed")
+
+    def __init__(self, path: str, start_ms: int) -> None:
+        self.path = path
+        self.start_ms = start_ms
+        self.min_ts: Optional[int] = None
+        self.max_ts: Optional[int] = None
+        self.size = 0
+        self.blocks: Blocks = []
+        self.tids: TidIndex = {}
+        self.sealed = False
+
+    def overlaps(self, since_ms: int, until_ms: int) -> bool:
+        if self.min_ts is None or self.max_ts is None:
+            return False
+        return self.min_ts <= until_ms and self.max_ts >= since_ms
+
+
+class SightingLog:
+
+    # Append-only history of tag sightings (SIGHTING_LOG_DIR).
+    #
+    # ActiveTags forgets a tag once it leaves the field and the "data" table
+    # keeps only the latest verdict; this keeps every sighting:
+    # (tidHex, epcHex, reader, antenna, rssi, seen_at, reads, auth, info).
+    # Reads are collapsed per tag, reader and antenna for flush_interval
+    # seconds (SightingBuffer); each flush appends one zlib-compressed block
+    # of JSON rows, one line per sighting (encode_block), to the segment of the current time partition (segment_seconds),
+    # from a worker thread. Verdicts are the ones known at flush time.
+    #
+    # Every segment carries a min/max time index and a TID index (TID ->
+    # blocks), so "where was this tag" reads only the blocks that hold it and
+    # "what was present between T1 and T2" only segments and blocks whose
+    # time range overlaps. Sightings still in the buffer are not visible to
+    # queries yet. Segments older than `retention` seconds are deleted.
+
+    def __init__(
+        self,
+        directory: str,
+        segment_seconds: float = 3600.0,
+        flush_interval: float = 5.0,
+        retention: float = 7 * 24 * 3600.0,
+        verdict: Optional[Callable[[str], Optional[Tuple[Optional[bool], Optional[str]]]]] = None,
+        index_cache: int = 16,
+        max_lag: float = 60.0,
+    ) -> None:
+        self.directory = directory
+        self.segment_ms = max(int(segment_seconds * 1000), 1000)
+        self.flush_interval = float(flush_interval)
+        self.retention_ms = int(retention * 1000)
+        self.verdict = verdict
+        self._buffer = SightingBuffer(max_lag)
+        self._ready: List[Sighting] = []  # already collapsed (worker processes)
+        self._lock = threading.Lock()  # segments and files; writes run in a thread
+        self._segments: List[_Segment] = []
+        self._active: Optional[_Segment] = None
+        self._file: Optional[BinaryIO] = None
+        self._index_cache: "OrderedDict[str, Tuple[Blocks, TidIndex]]" = OrderedDict()  # sealed segment -> (blocks, tids)
+        self._index_cache_max = max(int(index_cache), 1)
+        self._task: Optional[asyncio.Task] = None
+
+        # stats
+        self.sightings = 0
+        self.blocks_written = 0
+        self.bytes_written = 0
+        self.flush_errors = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # ----- recording (event loop) -----
+
+    def record(self, events, reader: str, seen_at: Optional[float] = None) -> None:
+        self._buffer.record(events, reader, int((time.time() if seen_at is None else seen_at) * 1000))
+
+    def extend(self, rows: Iterable[Sighting]) -> None:
+        self._ready.extend(rows)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        await asyncio.to_thread(self.close)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                self.flush_errors += 1
+                log.exception("sighting log flush failed")
+
+    async def flush(self) -> int:
+        rows = self._take()
+        if rows:
+            await asyncio.to_thread(self.append, rows)
+        return len(rows)
+
+    def _take(self) -> List[tuple]:
+        # verdicts are looked up here, on the event loop, where the cache lives
+        ready, self._ready = self._ready, []
+        ready.extend(self._buffer.drain())
+        verdict = self.verdict
+        rows = []
+        for tid, epc, reader, antenna, rssi, ts, reads in ready:
+            v = verdict(tid) if verdict is not None else None
+            auth, info = v if v is not None else (None, None)
+            rows.append((tid, epc, reader, antenna, rssi, ts, reads, auth, info))
+        return rows
+
+    # ----- segments (worker thread) -----
+
+    def _name(self, start_ms: int) -> str:
+        stamp = datetime.fromtimestamp(start_ms / 1000, timezone.utc).strftime("%Y%m%dT%H%M%S")
+        n = 0
+        while os.path.exists(os.path.join(self.directory, f"sightings-{stamp}-{n:03d}.seg")):
+            n += 1
+        return os.path.join(self.directory, f"sightings-{stamp}-{n:03d}.seg")
+
+    def append(self, rows: List[tuple]) -> None:
+        # one block per call; a call whose newest row falls in a later
+        # partition seals the current segment first. Late rows from an
+        # earlier partition go into the current one (the time index covers
+        # them).
+        if not rows:
+            return
+        ts = [r[5] for r in rows]
+        lo, hi = min(ts), max(ts)
+        data, offsets = encode_block(rows)
+        with self._lock:
+            part = hi // self.segment_ms * self.segment_ms
+            seg = self._active
+            if seg is None or part > seg.start_ms:
+                if seg is not None:
+                    self._seal(seg)
+                seg = self._open_segment(part)
+            f = self._file
+            if f is None:
+                raise RuntimeError("sighting log: active segment has no open file")
+            offset = seg.size
+            f.write(_LEN.pack(len(data)))
+            f.write(data)
+            f.flush()
+            seg.size += _LEN.size + len(data)
+            self._add_block(seg, offset + _LEN.size, len(data), lo, hi, zip((r[0] for r in rows), offsets))
+            self.sightings += len(rows)
+            self.blocks_written += 1
+            self.bytes_written += _LEN.size + len(data)
+            self._prune(hi)
+
+    def _open_segment(self, start_ms: int) -> _Segment:
+        seg = _Segment(self._name(start_ms), start_ms)
+        self._file = open(seg.path, "ab")
+        self._segments.append(seg)
+        self._active = seg
+        return seg
+
+    @staticmethod
+    def _add_block(seg: _Segment, offset: int, length: int, lo: int, hi: int, rows) -> None:
+        # rows: (tid, row offset) pairs
+        n = len(seg.blocks)
+        seg.blocks.append([offset, length, lo, hi])
+        index = seg.tids
+        for tid, row in rows:
+            entry = index.get(tid)
+            if entry is None:
+                index[tid] = [n, row]
+            else:
+                entry += [n, row]
+        seg.min_ts = lo if seg.min_ts is None else min(seg.min_ts, lo)
+        seg.max_ts = hi if seg.max_ts is None else max(seg.max_ts, hi)
+
+    def _seal(self, seg: _Segment) -> None:
+        if seg is self._active:
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+            self._active = None
+        if seg.blocks:
+            index = {"start": seg.start_ms, "min": seg.min_ts, "max": seg.max_ts, "blocks": seg.blocks, "tids": seg.tids}
+            tmp = seg.path[:-4] + ".idx.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(json.dumps(index, separators=(",", ":")).encode(), 6))
+            os.replace(tmp, seg.path[:-4] + ".idx")
+        seg.sealed = True
+        # the index is on disk now; keep only the time range in memory
+        seg.blocks, seg.tids = [], {}
+
+    def _prune(self, now_ms: int) -> None:
+        if self.retention_ms <= 0:
+            return
+        keep = []
+        for seg in self._segments:
+            if seg.sealed and seg.max_ts is not None and seg.max_ts < now_ms - self.retention_ms:
+                for path in (seg.path, seg.path[:-4] + ".idx"):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                self._index_cache.pop(seg.path, None)
+            else:
+                keep.append(seg)
+        self._segments = keep
+
+    def _load(self) -> None:
+        # sealed segments: time range from the .idx; a segment without one
+        # (the process stopped while writing it) is rebuilt from its blocks,
+        # dropping a torn last block, and sealed. New writes always start a
+        # new segment.
+        for fname in sorted(os.listdir(self.directory)):
+            if not (fname.startswith("sightings-") and fname.endswith(".seg")):
+                continue
+            path = os.path.join(self.directory, fname)
+            stamp = fname[len("sightings-"):-len(".seg")].rsplit("-", 1)[0]
+            start = datetime.strptime(stamp, "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+            seg = _Segment(path, int(start.timestamp() * 1000))
+            try:
+                with open(path[:-4] + ".idx", "rb") as f:
+                    index = json.loads(zlib.decompress(f.read()))
+                seg.min_ts, seg.max_ts = index["min"], index["max"]
+                seg.sealed = True
+            except FileNotFoundError:
+                self._rebuild(seg)
+                self._seal(seg)
+            if seg.min_ts is None:
+                os.remove(path)  # nothing was ever written to it
+            else:
+                self._segments.append(seg)
+
+    def _rebuild(self, seg: _Segment) -> None:
+        with open(seg.path, "rb") as f:
+            data = f.read()
+        pos = 0
+        while pos + _LEN.size <= len(data):
+            (length,) = _LEN.unpack_from(data, pos)
+            start = pos + _LEN.size
+            if start + length > len(data):
+                break
+            try:
+                raw = zlib.decompress(data[start:start + length])
+                rows, offsets, off = [], [], 0
+                for line in raw.splitlines():
+                    rows.append(json.loads(line))
+                    offsets.append(off)
+                    off += len(line) + 1
+            except (zlib.error, ValueError):
+                break
+            ts = [r[5] for r in rows]
+            self._add_block(seg, start, length, min(ts), max(ts), zip((r[0] for r in rows), offsets))
+            pos = start + length
+        if pos < len(data):
+            log.warning("sighting log: dropping %d torn bytes at the end of %s", len(data) - pos, seg.path)
+            with open(seg.path, "r+b") as f:
+                f.truncate(pos)
+        seg.size = pos
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._seal(self._active)
+
+    # ----- queries (worker thread) -----
+
+    def _index(self, seg: _Segment) -> Tuple[Blocks, TidIndex]:
+        # caller holds the lock
+        if not seg.sealed:
+            return seg.blocks, seg.tids
+        cached = self._index_cache.get(seg.path)
+        if cached is not None:
+            self._index_cache.move_to_end(seg.path)
+            return cached
+        with open(seg.path[:-4] + ".idx", "rb") as f:
+            index = json.loads(zlib.decompress(f.read()))
+        out: Tuple[Blocks, TidIndex] = (index["blocks"], index["tids"])
+        self._index_cache[seg.path] = out
+        if len(self._index_cache) > self._index_cache_max:
+            self._index_cache.popitem(last=False)
+        return out
+
+    def _plan(self, since_ms: int, until_ms: int, tid: Optional[str]) -> List[Tuple[str, list]]:
+        # (path, [(block, row offsets or None for all rows)]) per candidate
+        # segment, newest segment first
+        plan = []
+        with self._lock:
+            for seg in reversed(self._segments):
+                if not seg.overlaps(since_ms, until_ms):
+                    continue
+                try:
+                    blocks, tids = self._index(seg)
+                except FileNotFoundError:
+                    continue  # pruned meanwhile
+                wanted: List[Tuple[List[int], Optional[List[int]]]]
+                if tid is None:
+                    wanted = [(b, None) for b in blocks]
+                else:
+                    rows: Dict[int, List[int]] = {}
+                    entry = tids.get(tid, ())
+                    for i in range(0, len(entry), 2):
+                        rows.setdefault(entry[i], []).append(entry[i + 1])
+                    wanted = [(blocks[n], offsets) for n, offsets in rows.items()]
+                wanted = [(b, rows) for b, rows in wanted if b[2] <= until_ms and b[3] >= since_ms]
+                if wanted:
+                    plan.append((seg.path, wanted))
+        return plan
+
+    def _scan(self, since_ms: int, until_ms: int, tid: Optional[str]):
+        # segments are append-only, so blocks planned under the lock stay
+        # valid without it
+        for path, blocks in self._plan(since_ms, until_ms, tid):
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                for (offset, length, _, _), rows in blocks:
+                    f.seek(offset)
+                    data = f.read(length)
+                    for row in decode_block(data) if rows is None else decode_rows(data, rows):
+                        if since_ms <= row[5] <= until_ms:
+                            yield row
+
+    def history(self, tidHex: str, since: float = 0.0, until: Optional[float] = None, limit: int = 1000) -> List[dict]:
+        # sightings of one tag, newest first
+        until_ms = int((time.time() if until is None else until) * 1000)
+        rows = sorted(self._scan(int(since * 1000), until_ms, tidHex), key=lambda r: r[5], reverse=True)
+        return [sighting_dict(r) for r in rows[:limit]]
+
+    def present(self, since: float, until: Optional[float] = None, limit: int = 10_000) -> List[dict]:
+        # tags seen between since and until, one entry per tag, most recently
+        # seen first
+        until_ms = int((time.time() if until is None else until) * 1000)
+        tags: Dict[str, dict] = {}
+        for tid, epc, reader, antenna, rssi, ts, reads, auth, info in self._scan(int(since * 1000), until_ms, None):
+            t = tags.get(tid)
+            if t is None:
+                tags[tid] = t = {
+                    "tidHex": tid, "epcHex": epc, "first_ms": ts, "last_ms": ts, "reads": 0,
+                    "readers": set(), "auth": auth, "info": info,
+                }
+            elif ts >= t["last_ms"]:
+                t["last_ms"] = ts
+                t["epcHex"] = epc or t["epcHex"]
+                t["auth"], t["info"] = auth, info
+            if ts < t["first_ms"]:
+                t["first_ms"] = ts
+            t["reads"] += reads
+            t["readers"].add(reader)
+        out = sorted(tags.values(), key=lambda t: t["last_ms"], reverse=True)[:limit]
+        for t in out:
+            t["first_seen"] = _iso(t.pop("first_ms"))
+            t["last_seen"] = _iso(t.pop("last_ms"))
+            t["readers"] = sorted(t["readers"])
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "segments": len(self._segments),
+            "buffered": len(self._buffer) + len(self._ready),
+            "sightings": self.sightings,
+            "blocks": self.blocks_written,
+            "bytes": self.bytes_written,
+            "flush_errors": self.flush_errors,
+        }
+
+
+def _iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).isoformat()
+
+
+def sighting_dict(row: tuple) -> dict:
+    tid, epc, reader, antenna, rssi, ts, reads, auth, info = row
+    return {
+        "tidHex": tid,
+        "epcHex": epc,
+        "reader": reader,
+        "antenna": antenna,
+        "rssi": rssi,
+        "seen_at": _iso(ts),
+        "reads": reads,
+        "auth": auth,
+        "info": info,
+    }
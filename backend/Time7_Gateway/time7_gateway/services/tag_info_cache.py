@@ -1,43 +1,257 @@
+import asyncio
+import heapq
+import sys
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Callable, List, Optional, Set, Tuple
 
+from time7_gateway.services.verdict_store import VerdictRow, VerdictStore
 
-@dataclass
+
+@dataclass(slots=True)
 class TagInfo:
     auth: bool
     info: Optional[str]
     fetched_at: datetime
+    challenge: Optional[str] = None  # messageHex IAS answered
+
+
+# rough per-entry overhead on top of the key string: OrderedDict node,
+# slotted TagInfo, its datetime and one expiry-heap tuple
+_ENTRY_OVERHEAD_BYTES = 104 + sys.getsizeof(TagInfo(True, None, datetime.now(timezone.utc))) + 48 + 64
 
 
 class TagInfoCache:
 
 
     #caches IAS results. Avoid repeating checking with IAS
+    # Bounded: least recently used entries are evicted past max_entries, and
+    # sweep() drops expired entries using an expiry heap instead of waiting
+    # for get() to touch them.
+    # Optional on-disk tier (VerdictStore): new verdicts are written behind in
+    # batches by flush_store(), and warm_start() reloads non-expired entries
+    # after a restart. With lazy_load, the verifier awaits load() before
+    # asking IAS instead: the store is read in a worker thread, never from
+    # get(), and store misses are remembered for miss_ttl seconds.
 
-    def __init__(self, cache_ttl_hours: int = 24):
+    def __init__(
+        self,
+        cache_ttl_hours: int = 24,
+        max_entries: int = 500_000,
+        store: Optional[VerdictStore] = None,
+        lazy_load: bool = False,
+        miss_ttl: float = 300.0,
+        max_misses: int = 100_000,
+    ):
         self.cache_ttl = timedelta(hours=int(cache_ttl_hours))
-        self._cache: Dict[str, TagInfo] = {}
+        self.max_entries = int(max_entries)
+        self._store = store
+        self._lazy_load = bool(lazy_load and store is not None)
+        self._store_pending: List[VerdictRow] = []
+        self._store_deletes: Set[str] = set()  # discarded verdicts still on disk
+        self.miss_ttl = float(miss_ttl)
+        self.max_misses = int(max_misses)
+        self._store_misses: "OrderedDict[str, float]" = OrderedDict()  # tid_hex -> monotonic time of the miss
+        self._last_prune = 0.0
+        self._cache: "OrderedDict[str, TagInfo]" = OrderedDict()
+        self._expiry: List[Tuple[datetime, str]] = []  # (expires_at, tid_hex), may hold stale items
+        self._key_bytes = 0
+        self.version = 0  # bumped whenever a verdict is added, changed or dropped
+        self.on_change: Optional[Callable[[str], None]] = None  # called with the tid_hex
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.store_loads = 0
 
     def get(self, tid_hex: str) -> Optional[Tuple[bool, Optional[str]]]:
         cur = self._cache.get(tid_hex)
         if cur is None:
+            self.misses += 1
             return None
 
         now = datetime.now(timezone.utc)
         if now - cur.fetched_at > self.cache_ttl:
-            del self._cache[tid_hex]
+            self._delete(tid_hex)
+            self.expirations += 1
+            self.misses += 1
             return None
 
+        self._cache.move_to_end(tid_hex)
+        self.hits += 1
+        return (cur.auth, cur.info)
+
+    def peek(self, tid_hex: str) -> Optional[Tuple[bool, Optional[str]]]:
+        # read-only lookup for views: no LRU touch, no stats, no deletion
+        cur = self._cache.get(tid_hex)
+        if cur is None or datetime.now(timezone.utc) - cur.fetched_at > self.cache_ttl:
+            return None
         return (cur.auth, cur.info)
 
-    def set(self, tid_hex: str, auth: bool, info: Optional[str]) -> None:
-        self._cache[tid_hex] = TagInfo(
-            auth=auth,
-            info=info,
-            fetched_at=datetime.now(timezone.utc),
-        )
-        
+    def challenge(self, tid_hex: str) -> Optional[str]:
+        # the challenge the cached verdict was issued for, if known
+        cur = self._cache.get(tid_hex)
+        return cur.challenge if cur is not None else None
+
+    def set(self, tid_hex: str, auth: bool, info: Optional[str], challenge: Optional[str] = None) -> None:
+        now = datetime.now(timezone.utc)
+        self._put(tid_hex, auth, info, now, challenge)
+        if self._store_misses:
+            self._store_misses.pop(tid_hex, None)
+        if self._store is not None:
+            self._store_deletes.discard(tid_hex)
+            self._store_pending.append((tid_hex, auth, info, now.timestamp(), challenge))
+
+    def discard(self, tid_hex: str) -> None:
+        # forget a verdict whose database row was dropped (DBWriter.on_drop),
+        # here and on disk, so the next read verifies and writes it again
+        if tid_hex in self._cache:
+            self._delete(tid_hex)
+        if self._store is not None:
+            self._store_deletes.add(tid_hex)
+
+    def _put(
+        self, tid_hex: str, auth: bool, info: Optional[str], fetched_at: datetime, challenge: Optional[str] = None
+    ) -> TagInfo:
+        if isinstance(info, str):
+            info = sys.intern(info)  # only a handful of distinct verdict strings
+
+        prev = self._cache.get(tid_hex)
+        if prev is not None:
+            self._cache.move_to_end(tid_hex)
+        else:
+            self._key_bytes += sys.getsizeof(tid_hex)
+        if prev is None or prev.auth != auth or prev.info != info:
+            self.version += 1
+            if self.on_change:
+                self.on_change(tid_hex)
+        entry = self._cache[tid_hex] = TagInfo(auth=auth, info=info, fetched_at=fetched_at, challenge=challenge)
+
+        heapq.heappush(self._expiry, (fetched_at + self.cache_ttl, tid_hex))
+        if len(self._expiry) > 2 * len(self._cache) + 1024:
+            self._rebuild_expiry()
+
+        while len(self._cache) > self.max_entries:
+            old, _ = self._cache.popitem(last=False)
+            self._key_bytes -= sys.getsizeof(old)
+            self.evictions += 1
+            self.version += 1
+            if self.on_change:
+                self.on_change(old)
+        return entry
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        # pop heap items that are due; cost is proportional to what expired
+        now = now or datetime.now(timezone.utc)
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, tid_hex = heapq.heappop(self._expiry)
+            cur = self._cache.get(tid_hex)
+            # stale heap item: entry was refreshed, evicted or already gone
+            if cur is None or now - cur.fetched_at <= self.cache_ttl:
+                continue
+            self._delete(tid_hex)
+            removed += 1
+        self.expirations += removed
+        return removed
+
+    # ----- on-disk tier -----
+
+    def _not_before(self) -> float:
+        return (datetime.now(timezone.utc) - self.cache_ttl).timestamp()
+
+    async def load(self, tid_hex: str) -> Optional[Tuple[bool, Optional[str]]]:
+        # lazy read-through for a cache miss (None unless lazy_load)
+        if not self._lazy_load:
+            return None
+        if tid_hex in self._cache:
+            return self.peek(tid_hex)
+        now = time.monotonic()
+        missed = self._store_misses.get(tid_hex)
+        if missed is not None and now - missed < self.miss_ttl:
+            return None
+        row = await asyncio.to_thread(self._store.get, tid_hex, self._not_before())
+        if row is None:
+            self._store_misses[tid_hex] = now
+            self._store_misses.move_to_end(tid_hex)
+            while len(self._store_misses) > self.max_misses:
+                self._store_misses.popitem(last=False)
+            return None
+        if tid_hex in self._cache:
+            return self.peek(tid_hex)  # set() while the store was read: that verdict is newer
+        self.store_loads += 1
+        _, auth, info, fetched_at, challenge = row
+        self._put(tid_hex, auth, info, datetime.fromtimestamp(fetched_at, timezone.utc), challenge)
+        return self.peek(tid_hex)
+
+    def warm_start(self) -> int:
+        # bulk-load the newest non-expired verdicts (up to max_entries)
+        if self._store is None:
+            return 0
+        self._store.prune(self._not_before())
+        rows = self._store.load(self._not_before(), self.max_entries)
+        for tid_hex, auth, info, fetched_at, challenge in rows:
+            self._put(tid_hex, auth, info, datetime.fromtimestamp(fetched_at, timezone.utc), challenge)
+        self.store_loads += len(rows)
+        return len(rows)
+
+    async def flush_store(self) -> int:
+        # write buffered verdicts to disk from a worker thread
+        if self._store is None or not (self._store_pending or self._store_deletes):
+            return 0
+        rows, self._store_pending = self._store_pending, []
+        deletes, self._store_deletes = self._store_deletes, set()
+        try:
+            if rows:
+                await asyncio.to_thread(self._store.put_many, rows)
+            if deletes:
+                await asyncio.to_thread(self._store.delete_many, deletes)
+        except Exception:
+            # keep them, ahead of anything set meanwhile, for the next flush
+            self._store_pending[:0] = rows
+            self._store_deletes |= {tid for tid in deletes if tid not in self._cache}
+            raise
+
+        if time.monotonic() - self._last_prune > 3600:
+            self._last_prune = time.monotonic()
+            await asyncio.to_thread(self._store.prune, self._not_before())
+        return len(rows)
+
+    def _delete(self, tid_hex: str) -> None:
+        del self._cache[tid_hex]
+        self._key_bytes -= sys.getsizeof(tid_hex)
+        self.version += 1
+        if self.on_change:
+            self.on_change(tid_hex)
+
+    def _rebuild_expiry(self) -> None:
+        # drop heap items left behind by refreshed/evicted entries
+        self._expiry = [(v.fetched_at + self.cache_ttl, k) for k, v in self._cache.items()]
+        heapq.heapify(self._expiry)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "bytes_estimate": self._key_bytes + len(self._cache) * _ENTRY_OVERHEAD_BYTES,
+            "store_enabled": self._store is not None,
+            "store_loads": self.store_loads,
+            "store_pending": len(self._store_pending),
+        }
+
     # for debugging
     def snapshot(self) -> dict:
         items = []
@@ -51,4 +265,4 @@ class TagInfoCache:
             items.append({"id": tid_hex, "auth": auth, "info": info})
 
         items.sort(key=lambda x: x.get("id") or "")
-        return {"count": len(items), "items": items}
\ No newline at end of file
+        return {"count": len(items), "items": items}
@@ -0,0 +1,138 @@
+import statistics
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, Optional
+
+from time7_gateway.clients.event_decoder import parse_reader_time
+from time7_gateway.services.metrics import STAGE_LAG_SECONDS
+
+# pipeline stages, in order
+STAGES = ("received", "decoded", "state_updated", "verified", "persisted", "pushed")
+
+
+class _Trace:
+
+    __slots__ = ("origin", "from_reader", "last", "stages")
+
+    def __init__(self, origin: float, from_reader: bool) -> None:
+        self.origin = origin            # reader read time, else gateway receive time
+        self.from_reader = from_reader
+        self.last = origin
+        self.stages: Dict[str, float] = {}
+
+
+class LatencyTracer:
+
+    # Per-stage timings for a sample of reads (one event in every
+    # `sample_every`). A sampled tag gets a trace that starts at the reader's
+    # own read time (or at receipt if the reader clock is off); each stage it
+    # then passes (received, decoded, state_updated, verified, persisted,
+    # pushed) records the lag since that read. Stages a read never reaches (cache hit -> no IAS call, no
+    # dashboard client -> no push) are simply absent. Traces are keyed by
+    # tidHex, bounded in number, and dropped after max_age seconds.
+    #
+    # Unsampled events cost one countdown; later stages cost one dict lookup
+    # per tag, and nothing at all while no trace is open.
+
+    def __init__(self, sample_every: int = 1000, max_open: int = 1000, max_age: float = 60.0, keep: int = 2048) -> None:
+        self.sample_every = max(1, int(sample_every))
+        self.max_open = int(max_open)
+        self.max_age = float(max_age)
+        self._countdown = self.sample_every
+        self._open: "OrderedDict[str, _Trace]" = OrderedDict()
+        # recent samples per stage, for percentiles
+        self._lag: Dict[str, Deque[float]] = {s: deque(maxlen=keep) for s in STAGES}
+        self._step: Dict[str, Deque[float]] = {s: deque(maxlen=keep) for s in STAGES}
+        self.started = 0
+
+    def __bool__(self) -> bool:
+        # lets hot paths write `if tracer:` to skip work while nothing is open
+        return bool(self._open)
+
+    def on_decoded(self, events, received_at: float, decoded_at: float) -> None:
+        # called once per decoded chunk; opens a trace for sampled events
+        n = len(events)
+        if n < self._countdown:
+            self._countdown -= n
+            return
+        idx = self._countdown - 1
+        while idx < n:
+            ev = events[idx]
+            tid = ev.authTidHex or ev.tidHex
+            if tid and tid not in self._open:
+                self._start(tid, ev.readTime, received_at, decoded_at)
+            idx += self.sample_every
+        self._countdown = idx - n + 1
+
+    def _start(self, tid: str, read_time: Optional[str], received_at: float, decoded_at: float) -> None:
+        read = parse_reader_time(read_time)
+        read_ts = read.timestamp() if read else None
+        # a reader clock that is ahead, or implausibly far behind, is not
+        # trusted; the trace then starts when the gateway received the chunk
+        if read_ts is None or not (0.0 <= received_at - read_ts <= self.max_age):
+            read_ts = None
+        trace = _Trace(received_at if read_ts is None else read_ts, read_ts is not None)
+        self._open[tid] = trace
+        self.started += 1
+        if len(self._open) > self.max_open:
+            self._open.popitem(last=False)
+        if trace.from_reader:
+            self._record(trace, "received", received_at)
+        else:
+            trace.stages["received"] = received_at
+        self._record(trace, "decoded", decoded_at)
+
+    def _record(self, trace: _Trace, stage: str, at: float) -> None:
+        if stage in trace.stages:
+            return
+        trace.stages[stage] = at
+        lag = at - trace.origin
+        self._lag[stage].append(lag)
+        self._step[stage].append(at - trace.last)
+        trace.last = at
+        STAGE_LAG_SECONDS.observe(max(lag, 0.0), stage)
+
+    def mark(self, tid: str, stage: str, at: Optional[float] = None) -> None:
+        trace = self._open.get(tid)
+        if trace is not None:
+            self._record(trace, stage, at or time.time())
+
+    def mark_many(self, tids: Iterable[str], stage: str) -> None:
+        if not self._open:
+            return
+        at = time.time()
+        for tid in tids:
+            trace = self._open.get(tid)
+            if trace is not None:
+                self._record(trace, stage, at)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        cutoff = (now or time.time()) - self.max_age
+        removed = 0
+        while self._open:
+            tid, trace = next(iter(self._open.items()))
+            if trace.stages.get("received", trace.origin) >= cutoff:
+                break
+            self._open.popitem(last=False)
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        # lag: seconds from the reader's read time to each stage;
+        # step: seconds from the previous recorded stage
+        def pct(samples):
+            if not samples:
+                return None
+            data = sorted(samples)
+            if len(data) == 1:
+                return {"n": 1, "p50": data[0], "p90": data[0], "p99": data[0], "max": data[0]}
+            q = statistics.quantiles(data, n=100, method="inclusive")
+            return {"n": len(data), "p50": q[49], "p90": q[89], "p99": q[98], "max": data[-1]}
+
+        return {
+            "sample_every": self.sample_every,
+            "traces_started": self.started,
+            "traces_open": len(self._open),
+            "lag_seconds": {s: pct(self._lag[s]) for s in STAGES},
+            "step_seconds": {s: pct(self._step[s]) for s in STAGES},
+        }
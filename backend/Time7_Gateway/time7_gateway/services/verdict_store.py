@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+# (tid_hex, auth, info, fetched_at as unix seconds, challenge IAS answered)
+VerdictRow = Tuple[str, bool, Optional[str], float, Optional[str]]
+
+
+class VerdictStore:
+
+    # On-disk tier behind TagInfoCache (SQLite, WAL mode).
+    # Lets the gateway come back up with a warm cache instead of sending
+    # every tag in the field back to IAS after a restart.
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # writes come from a worker thread, reads from the event loop thread
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                " tid_hex TEXT PRIMARY KEY,"
+                " auth INTEGER NOT NULL,"
+                " info TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " challenge TEXT)"
+            )
+            # files written before the challenge was kept
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(verdicts)")}
+            if "challenge" not in columns:
+                self._conn.execute("ALTER TABLE verdicts ADD COLUMN challenge TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS verdicts_fetched_at ON verdicts (fetched_at)")
+
+    def put_many(self, rows: Iterable[VerdictRow]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO verdicts (tid_hex, auth, info, fetched_at, challenge) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(tid_hex) DO UPDATE SET"
+                    " auth=excluded.auth, info=excluded.info, fetched_at=excluded.fetched_at,"
+                    " challenge=excluded.challenge",
+                    ((tid, int(auth), info, fetched_at, challenge) for tid, auth, info, fetched_at, challenge in rows),
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def delete_many(self, tid_hexes: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM verdicts WHERE tid_hex = ?", ((tid,) for tid in tid_hexes))
+
+    def get(self, tid_hex: str, not_before: float) -> Optional[VerdictRow]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tid_hex, auth, info, fetched_at, challenge FROM verdicts WHERE tid_hex = ? AND fetched_at >= ?",
+                (tid_hex, not_before),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], bool(row[1]), row[2], row[3], row[4]
+
+    def load(self, not_before: float, limit: int) -> List[VerdictRow]:
+        # newest `limit` non-expired rows, returned oldest first
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tid_hex, auth, info, fetched_at, challenge FROM verdicts WHERE fetched_at >= ?"
+                " ORDER BY fetched_at DESC LIMIT ?",
+                (not_before, int(limit)),
+            ).fetchall()
+        rows.reverse()
+        return [(tid, bool(auth), info, fetched_at, challenge) for tid, auth, info, fetched_at, challenge in rows]
+
+    def prune(self, before: float) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM verdicts WHERE fetched_at < ?", (before,))
+        return cur.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
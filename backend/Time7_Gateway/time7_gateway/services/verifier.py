@@ -0,0 +1,170 @@
+import asyncio
+import inspect
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.services.metrics import EVENTS_SKIPPED, IAS_CALLS, IAS_SECONDS, READ_TO_VERDICT_SECONDS
+from time7_gateway.services.replay_guard import REPLAY_INFO
+
+log = logging.getLogger(__name__)
+
+PENDING_INFO = "Verification Pending"
+
+
+class TagVerifier:
+
+    # Async IAS verification stage.
+    # The reader loop submits cache misses and moves on; lookups run as
+    # background tasks under a concurrency limit. A tag that is already being
+    # verified is not submitted twice, so concurrent misses for the same
+    # tidHex share one in-flight request.
+
+    def __init__(
+        self,
+        ias_lookup: Callable,
+        cache,
+        db_writer,
+        max_concurrency: int = 16,
+    ) -> None:
+        self._ias_lookup = ias_lookup
+        self._cache = cache
+        self._db_writer = db_writer
+        self._sem = asyncio.Semaphore(int(max_concurrency))
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.version = 0  # bumped whenever the set of pending tags changes
+        self.on_change: Optional[Callable[[str], None]] = None  # called with the tidHex
+        self.tracer = None  # optional LatencyTracer
+        self.replay_guard = None  # optional ReplayGuard: answered challenges are not accepted again
+        self.load_verdict = None  # optional async read-through (TagInfoCache.load, lazy verdict store)
+
+        # stats
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.replays = 0
+
+    def is_pending(self, tidHex: str) -> bool:
+        return tidHex in self._inflight
+
+    def submit(self, auth_payload: AuthPayload, epcHex: Optional[str], seen_at: datetime) -> bool:
+        tidHex = auth_payload.tidHex
+        if tidHex in self._inflight:
+            self.deduplicated += 1
+            return False
+
+        task = asyncio.create_task(self._verify(auth_payload, epcHex, seen_at))
+        self._inflight[tidHex] = task
+        self.version += 1
+        if self.on_change:
+            self.on_change(tidHex)
+        self.submitted += 1
+        return True
+
+    def check_cached(
+        self,
+        tidHex: str,
+        messageHex: str,
+        responseHex: str,
+        epcHex: Optional[str],
+        seen_at: datetime,
+        verdict: Tuple[bool, Optional[str]],
+    ) -> bool:
+        # Cache hit whose verdict was issued for a different challenge (the
+        # only way a played-back response reaches the gateway while the tag's
+        # verdict is cached). A challenge IAS has already answered is flagged
+        # without an IAS call; a new one (new reader session) is verified
+        # again, the cached verdict standing until IAS answers. A cache miss
+        # (expired or evicted verdict) never comes here: it goes to IAS.
+        # A verdict with no known challenge (store rows written before it was
+        # kept) is verified again as well. Returns True if a verification
+        # was started.
+        guard = self.replay_guard
+        if guard is None or verdict[1] == REPLAY_INFO or tidHex in self._inflight:
+            return False
+        issued = self._cache.challenge(tidHex)
+        if issued == messageHex:
+            return False
+        if issued is not None and guard.seen(tidHex, messageHex):
+            self._flag_replay(tidHex, epcHex, seen_at, issued)
+            return False
+        payload = AuthPayload(messageHex=messageHex, responseHex=responseHex, tidHex=tidHex)
+        return self.submit(payload, epcHex=epcHex, seen_at=seen_at)
+
+    def _flag_replay(self, tidHex: str, epcHex: Optional[str], seen_at: datetime, issued: str) -> None:
+        # shown and stored as failed until the verdict expires; the challenge
+        # stays the tag's current one, so further playbacks are not counted again
+        self.replays += 1
+        EVENTS_SKIPPED.inc("replayed_challenge")
+        log.warning("replayed challenge for %s", tidHex)
+        self._cache.set(tidHex, False, REPLAY_INFO, challenge=issued)
+        if self.tracer:
+            self.tracer.mark(tidHex, "verified")
+        self._db_writer.enqueue(tidHex=tidHex, seen_at=seen_at, auth=False, info=REPLAY_INFO, epcHex=epcHex)
+
+    async def _lookup(self, auth_payload: AuthPayload):
+        # IAS lookups may be async (network client) or plain functions (mock)
+        fn = self._ias_lookup
+        if inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(getattr(fn, "__call__", None)):
+            return await fn(auth_payload)
+        return await asyncio.to_thread(fn, auth_payload)
+
+    async def _verify(self, auth_payload: AuthPayload, epcHex: Optional[str], seen_at: datetime) -> None:
+        tidHex = auth_payload.tidHex
+        try:
+            async with self._sem:
+                # lazy verdict store: a verdict from before a restart saves the IAS call
+                if self.load_verdict is not None and await self.load_verdict(tidHex) is not None:
+                    if self.tracer:
+                        self.tracer.mark(tidHex, "verified")
+                    return
+                t0 = time.perf_counter()
+                try:
+                    auth, info = await self._lookup(auth_payload)
+                    # returns auth(bool): true if valid; else false
+                    #         info(str) : information about the authentication request
+                finally:
+                    IAS_SECONDS.observe(time.perf_counter() - t0)
+        except Exception:
+            # not cached: the tag is retried the next time it is read
+            self.failed += 1
+            IAS_CALLS.inc("error")
+            log.exception("IAS lookup failed for %s", tidHex)
+            return
+        finally:
+            self._inflight.pop(tidHex, None)
+            self.version += 1
+            if self.on_change:
+                self.on_change(tidHex)
+
+        self.completed += 1
+        IAS_CALLS.inc("ok")
+        if self.replay_guard is None:
+            self._cache.set(tidHex, auth, info)   # IAS results
+        else:
+            # the answered challenge is kept with the verdict for check_cached
+            self.replay_guard.add(tidHex, auth_payload.messageHex)
+            self._cache.set(tidHex, auth, info, challenge=auth_payload.messageHex)
+        read_at = seen_at if seen_at.tzinfo else seen_at.replace(tzinfo=timezone.utc)
+        READ_TO_VERDICT_SECONDS.observe((datetime.now(timezone.utc) - read_at).total_seconds())
+        if self.tracer:
+            self.tracer.mark(tidHex, "verified")
+        self._db_writer.enqueue(tidHex=tidHex, seen_at=seen_at, auth=auth, info=info, epcHex=epcHex)
+
+    async def drain(self) -> None:
+        # wait for every verification submitted so far
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight.values()), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "replays": self.replays,
+        }
@@ -0,0 +1,71 @@
+"""
+Local stand-in IAS for offline throughput/latency measurements.
+
+Run:
+    uvicorn time7_gateway.simulators.ias_server:app --port 8001 --log-level warning --no-access-log
+
+Then start the gateway with IAS_MODE=real and IAS_BASE_URL=http://127.0.0.1:8001
+
+IAS_SIM_WORKERS > 0 verifies large /verify/batch requests in that many worker
+processes.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from time7_gateway.models.schemas import AuthBatchRequest, AuthBatchResponse, AuthPayload, AuthResult
+from time7_gateway.simulators.ias_services import POOL_MIN_BATCH, mock_ias_lookup, mock_ias_lookup_batch
+
+# optional artificial latency per request, to mimic a remote IAS
+IAS_SIM_LATENCY_MS = float(os.getenv("IAS_SIM_LATENCY_MS", "0"))
+IAS_SIM_WORKERS = int(os.getenv("IAS_SIM_WORKERS", "0"))
+
+# AuthResult JSON per distinct verdict; a batch response is these joined, so
+# large batches are not built and re-validated as one model per item
+_result_json = {}
+
+
+def batch_response_json(verdicts) -> bytes:
+    parts = []
+    for verdict in verdicts:
+        part = _result_json.get(verdict)
+        if part is None:
+            part = _result_json[verdict] = AuthResult(auth=verdict[0], info=verdict[1]).model_dump_json().encode()
+        parts.append(part)
+    return b'{"results":[' + b",".join(parts) + b"]}"
+
+
+def create_app(latency_ms: float = IAS_SIM_LATENCY_MS, workers: int = IAS_SIM_WORKERS) -> FastAPI:
+    app = FastAPI(title="Time7 IAS stand-in")
+    latency = latency_ms / 1000.0
+    pool = ProcessPoolExecutor(workers) if workers > 0 else None
+    if pool is not None:
+        @app.on_event("shutdown")
+        def _stop_pool():
+            pool.shutdown(cancel_futures=True)
+
+    @app.post("/verify", response_model=AuthResult)
+    async def verify(payload: AuthPayload):
+        if latency:
+            await asyncio.sleep(latency)
+        auth, info = mock_ias_lookup(payload)
+        return AuthResult(auth=auth, info=info)
+
+    @app.post("/verify/batch", response_model=AuthBatchResponse)
+    async def verify_batch(batch: AuthBatchRequest):
+        if latency:
+            await asyncio.sleep(latency)
+        if pool is not None and len(batch.items) >= POOL_MIN_BATCH:
+            # waits for the pool in a thread, so other requests keep being served
+            verdicts = await asyncio.to_thread(mock_ias_lookup_batch, batch.items, pool, workers)
+        else:
+            verdicts = mock_ias_lookup_batch(batch.items)
+        return Response(content=batch_response_json(verdicts), media_type="application/json")
+
+    return app
+
+
+app = create_app()
@@ -1,7 +1,16 @@
-from typing import Dict, Tuple
+from concurrent.futures import Executor
+from typing import List, Optional, Sequence, Tuple
 from time7_gateway.models.schemas import AuthPayload
 from time7_gateway.utilities.simulate_encryption import generate_response
 
+PASSED = (True, "Authentication Passed")
+FAILED = (False, "Authentication Failed")
+
+# batches smaller than this are verified in the calling thread even when a
+# pool is given: below it, shipping the work costs more than the hashing
+POOL_MIN_BATCH = 2000
+
+
 def mock_ias_lookup(auth_payload: AuthPayload) -> Tuple[bool, str]:
     tidHex = auth_payload.tidHex # The tag_id
     messageHex = auth_payload.messageHex # The challenge message sent to the tag from the Reader
@@ -18,4 +27,29 @@ def mock_ias_lookup(auth_payload: AuthPayload) -> Tuple[bool, str]:
         return True, "Authentication Passed"
     else:
         return False, "Authentication Failed"
-    
+
+
+def verify_triples(items: Sequence[Tuple[str, str, str]]) -> List[bool]:
+    # (tidHex, messageHex, responseHex) -> passed?; plain tuples in and out so
+    # a chunk is cheap to send to a worker process
+    return [generate_response(tid, msg) == resp for tid, msg, resp in items]
+
+
+def mock_ias_lookup_batch(
+    auth_payloads: Sequence[AuthPayload],
+    executor: Optional[Executor] = None,
+    workers: int = 1,
+) -> List[Tuple[bool, str]]:
+    # Same verdicts as mock_ias_lookup, in request order. With an executor
+    # (a ProcessPoolExecutor: hashlib holds the GIL for inputs this small, so
+    # threads do not help), batches of POOL_MIN_BATCH or more are split into
+    # one slice per worker and verified in parallel.
+    if executor is None or len(auth_payloads) < POOL_MIN_BATCH:
+        return [
+            PASSED if generate_response(p.tidHex, p.messageHex) == p.responseHex else FAILED
+            for p in auth_payloads
+        ]
+    items = [(p.tidHex, p.messageHex, p.responseHex) for p in auth_payloads]
+    size = -(-len(items) // max(workers, 1))
+    parts = executor.map(verify_triples, [items[i:i + size] for i in range(0, len(items), size)])
+    return [PASSED if ok else FAILED for part in parts for ok in part]
@@ -1,46 +1,38 @@
-
+import secrets
 from datetime import datetime, timezone
-from typing import Any
 
-from fastapi import APIRouter, Body, HTTPException, Request
+from fastapi import APIRouter, Request
 
-from time7_gateway.services.database import upsert_latest_tag
+from time7_gateway.api.ingest import PushBatch
+from time7_gateway.clients.event_decoder import TagEvent
+from time7_gateway.models.schemas import ReaderEventBatch
+from time7_gateway.utilities.simulate_encryption import generate_response
 
 router = APIRouter()
 
 
-@router.post("/reader/events")
-def reader_events(request: Request, payload: Any = Body(...)):
-    active_tags = request.app.state.active_tags
-    cache = request.app.state.tag_info_cache
-
-    ias_lookup = getattr(request.app.state, "ias_lookup", None)
-    if not callable(ias_lookup):
-        raise HTTPException(status_code=500, detail="IAS lookup not configured (app.state.ias_lookup)")
-
-    tags_seen = 0
-    product_info_fetched = 0
-
-    if isinstance(payload, dict) and "tagIds" in payload:
-        now = datetime.now(timezone.utc)
-
-        tidHex = payload.get("tidHex") or []
-        tags_seen = len(tidHex)
-
-        active_tags.sync_seen(tidHex, seen_at=now)
-
-        for tidHex in tidHex:
-            tidHex = str(tidHex)
-            if cache.get(tidHex) is None:
-                auth, info = ias_lookup(tidHex)
-                cache.set(tidHex, auth, info)
-                product_info_fetched += 1
-                upsert_latest_tag(tidHex=tidHex, seen_at=now, auth=auth, info=info)
-
-        return {
-            "ok": True,
-            "tags_seen": tags_seen,
-            "product_info_fetched": product_info_fetched,
-        }
-
-    raise HTTPException(status_code=400, detail="Invalid payload.") 
\ No newline at end of file
+# Terminal reader sim: {"tagIds": [...]} becomes one tagInventory event per
+# TID with a freshly signed challenge (so the mock IAS passes it), applied
+# through the same batch path as POST /api/ingest/events. async, so tag state
+# is only touched from the event loop.
+@router.post("/reader/events", status_code=202)
+async def reader_events(request: Request, payload: ReaderEventBatch):
+    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    events = []
+    for tidHex in payload.tagIds:
+        tidHex = str(tidHex)
+        messageHex = secrets.token_hex(6).upper()
+        events.append(TagEvent(
+            tidHex=tidHex,
+            hasAuth=True,
+            messageHex=messageHex,
+            responseHex=generate_response(tidHex, messageHex),
+            readTime=now,
+        ))
+
+    state = request.app.state
+    batch = PushBatch(state, batch_max=getattr(state, "ingest_batch_max", 1000), max_lag=getattr(state, "reader_max_lag", 60.0))
+    batch.lines = len(events)
+    batch.add_events(events)
+    batch.apply()
+    return batch.as_dict()
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import os
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from typing import AsyncIterator
+from typing import AsyncIterator, Dict, List, Tuple
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 
+from time7_gateway.clients.event_decoder import parse_reader_time
+from time7_gateway.simulators.synthetic_stream import DEFAULT_MIX, SyntheticTagStream, parse_mix
+
 router = APIRouter()
 
 # ----- SWITCH SIMULATOR DATA-STREAM -----
@@ -17,32 +24,207 @@ router = APIRouter()
 DATA_FILE = Path(__file__).with_name("datastream5.ndjson")# use "datastream1", "datastream2", "datastream3", or "datastream4"
 
 
-async def ndjson_line_stream(loop: bool = True, rate_hz: float = 20.0) -> AsyncIterator[bytes]:
+class ReplayFile:
 
-    delay = 0.0 if rate_hz <= 0 else 1.0 / rate_hz
+    # A fixture loaded once: events normalised into one bytes buffer (one per
+    # line, "\n"-terminated) plus the byte offset where each line starts, so
+    # a replay pass only slices the buffer. times[i] is event i's timestamp in
+    # seconds after the first event, for time-faithful replay.
 
-    while True:
+    def __init__(self, path: Path) -> None:
+        lines = [line.strip() for line in path.read_bytes().splitlines()]
+        lines = [line for line in lines if line]
+        self.data = b"".join(line + b"\n" for line in lines)
+
+        self.offsets = array("Q", [0])
+        pos = 0
+        for line in lines:
+            pos += len(line) + 1
+            self.offsets.append(pos)
+
+        self.times: List[float] = []
+        first = last = None
+        for line in lines:
+            try:
+                ts = parse_reader_time(json.loads(line).get("timestamp"))
+            except (ValueError, AttributeError):
+                ts = None
+            t = ts.timestamp() if ts is not None else last
+            if t is None or (last is not None and t < last):
+                t = last or 0.0  # missing or out of order: same time as the previous event
+            if first is None:
+                first = t
+            last = t
+            self.times.append(t - first)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def slice(self, i: int, j: int) -> bytes:
+        return self.data[self.offsets[i]:self.offsets[j]]
+
+    def lines_within(self, i: int, size: int) -> int:
+        # end index of a line-aligned chunk of about `size` bytes starting at i
+        if i >= len(self):
+            return i
+        return min(max(bisect_left(self.offsets, self.offsets[i] + size, i + 1), i + 1), len(self))
+
+
+_REPLAY_CACHE: Dict[Path, Tuple[float, ReplayFile]] = {}
+
+
+def load_replay(path: Path) -> ReplayFile:
+    # cached per path; reloaded if the file changes
+    mtime = path.stat().st_mtime
+    cached = _REPLAY_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _REPLAY_CACHE[path] = (mtime, ReplayFile(path))
+    return cached[1]
 
-        with DATA_FILE.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
 
-            
-                yield (line + "\n").encode("utf-8")
+# shortest sleep between chunks: at high rates, lines due in the meantime go
+# out together as one chunk instead of one write per line
+MIN_SLEEP = 0.01
+MAX_CHUNK_LINES = 10_000
 
-                if delay:
-                    await asyncio.sleep(delay)
 
+async def ndjson_line_stream(
+    loop: bool = True,
+    rate_hz: float = 20.0,
+    speed: float = 0.0,
+    chunk_bytes: int = 65536,
+) -> AsyncIterator[bytes]:
+    # speed > 0: time-faithful, events spaced as their timestamps, speed x faster
+    # rate_hz > 0: rate_hz lines/s
+    # otherwise: as fast as the consumer reads, in ~chunk_bytes chunks
+    replay = load_replay(DATA_FILE)
+    if not len(replay):
+        return
+    if speed > 0:
+        chunks = _timed_chunks(replay, loop, speed)
+    elif rate_hz > 0:
+        chunks = _paced_chunks(replay, loop, rate_hz)
+    else:
+        chunks = _unpaced_chunks(replay, loop, chunk_bytes)
+    async for chunk in chunks:
+        yield chunk
+
+
+async def _unpaced_chunks(replay: ReplayFile, loop: bool, chunk_bytes: int) -> AsyncIterator[bytes]:
+    if loop and len(replay.data) < chunk_bytes:
+        # small fixture: send it several times per write
+        block = replay.data * -(-chunk_bytes // len(replay.data))
+        while True:
+            yield block
+            await asyncio.sleep(0)
+    while True:
+        i = 0
+        while i < len(replay):
+            j = replay.lines_within(i, chunk_bytes)
+            yield replay.slice(i, j)
+            i = j
+            await asyncio.sleep(0)
         if not loop:
-            break
+            return
+
+
+async def _paced_chunks(replay: ReplayFile, loop: bool, rate_hz: float) -> AsyncIterator[bytes]:
+    clock = asyncio.get_running_loop()
+    n = len(replay)
+    started = clock.time()
+    sent = pos = 0
+    while True:
+        # every line due by now (the first one immediately), in one chunk
+        due = min(int((clock.time() - started) * rate_hz) + 1 - sent, MAX_CHUNK_LINES)
+        if due > 0:
+            parts = []
+            left = due
+            while left:
+                j = min(pos + left, n)
+                parts.append(replay.slice(pos, j))
+                left -= j - pos
+                pos = j
+                if pos == n:
+                    if not loop:
+                        yield b"".join(parts)
+                        return
+                    pos = 0
+            yield b"".join(parts)
+            sent += due
+        await asyncio.sleep(max(started + sent / rate_hz - clock.time(), MIN_SLEEP))
+
+
+async def _timed_chunks(replay: ReplayFile, loop: bool, speed: float) -> AsyncIterator[bytes]:
+    clock = asyncio.get_running_loop()
+    n = len(replay)
+    times = replay.times
+    # one pass lasts the recorded span plus one average gap before it repeats
+    period = times[-1] + (times[-1] / (n - 1) if n > 1 and times[-1] > 0 else 1.0)
+    started = clock.time()
+    cycle = i = 0
+    while True:
+        at = (clock.time() - started) * speed - cycle * period
+        j = min(bisect_right(times, at, i), i + MAX_CHUNK_LINES)
+        if j > i:
+            yield replay.slice(i, j)
+            i = j
+        if i == n:
+            if not loop:
+                return
+            cycle += 1
+            i = 0
+            continue
+        next_at = started + (cycle * period + times[i]) / speed
+        await asyncio.sleep(max(next_at - clock.time(), MIN_SLEEP))
+
+
+# ----- SWITCH SIMULATOR MODE -----
+# replay    = DATA_FILE above (loaded once), rate_hz lines/s; rate_hz=0 as fast
+#             as possible; speed > 0 replays the recorded timestamp spacing,
+#             speed times faster
+# synthetic = generated tag population (see synthetic_stream.py), paced per batch
+# The gateway's reader client calls /data/stream without parameters, so the
+# defaults can be set from the environment.
+SIM_MODE = os.getenv("READER_SIM_MODE", "replay")
+SIM_RATE_HZ = float(os.getenv("READER_SIM_RATE_HZ", "20"))
+SIM_SPEED = float(os.getenv("READER_SIM_SPEED", "0"))
+SIM_TAGS = int(os.getenv("READER_SIM_TAGS", "1000000"))
+SIM_FIELD = int(os.getenv("READER_SIM_FIELD", "5000"))
+SIM_ZIPF = float(os.getenv("READER_SIM_ZIPF", "1.0"))
+SIM_CHURN = float(os.getenv("READER_SIM_CHURN", "50"))
+SIM_MIX = os.getenv("READER_SIM_MIX", ",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()))
 
 
 @router.get("/data/stream")
-async def data_stream(loop: bool = True, rate_hz: float = 20.0):
+async def data_stream(
+    loop: bool = True,
+    rate_hz: float = SIM_RATE_HZ,
+    mode: str = SIM_MODE,
+    speed: float = SIM_SPEED,
+    tags: int = SIM_TAGS,
+    field: int = SIM_FIELD,
+    zipf: float = SIM_ZIPF,
+    churn: float = SIM_CHURN,
+    mix: str = SIM_MIX,
+    seed: int = 7,
+):
+    """
+    mode=replay: DATA_FILE at rate_hz lines/s (0 = unpaced), or with speed > 0
+    at the spacing of the recorded timestamps, `speed` times faster.
+    mode=synthetic: rate_hz events/s over `tags` unique TIDs, `field` of them
+    in range at once, Zipf(`zipf`) re-reads, `churn` arrivals/departures per
+    second and a valid/tampered/disabled/unsupported `mix`.
+    """
+    if mode == "synthetic":
+        try:
+            stream = SyntheticTagStream(tags, field, zipf, churn, parse_mix(mix), seed)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return StreamingResponse(stream.stream(rate_hz), media_type="application/x-ndjson")
+    if mode != "replay":
+        raise HTTPException(status_code=422, detail="mode must be 'replay' or 'synthetic'")
 
     return StreamingResponse(
-        ndjson_line_stream(loop=loop, rate_hz=rate_hz),
+        ndjson_line_stream(loop=loop, rate_hz=rate_hz, speed=speed),
         media_type="application/x-ndjson",
     )
\ No newline at end of file
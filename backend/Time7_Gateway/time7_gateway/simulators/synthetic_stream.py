@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from bisect import bisect_right
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import AsyncIterator, Dict, List, Tuple
+
+from time7_gateway.utilities.simulate_encryption import generate_response
+
+# ----- SYNTHETIC READER STREAM -----
+# Generates tagInventory events for a large tag population instead of
+# replaying a fixture:
+#   population: unique TIDs that can ever appear (millions are fine; TIDs are
+#               derived from an index, nothing is stored per population tag)
+#   field:      tags in front of the reader at once
+#   zipf:       re-read skew over the field (0 = uniform; ~1 = a few tags are
+#               read far more often than the rest, as near an antenna)
+#   churn:      tags per second that leave the field, each replaced by a tag
+#               that has not been seen yet
+#   mix:        share of valid / tampered / disabled / unsupported tags
+# A tag's kind and challenge are fixed by its index, so repeated reads of a
+# tag are consistent. Valid responses are signed with generate_response, the
+# key the mock IAS and the IAS stand-in check against.
+
+KINDS = ("valid", "tampered", "disabled", "unsupported")
+DEFAULT_MIX = {"valid": 0.9, "tampered": 0.04, "disabled": 0.03, "unsupported": 0.03}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    # "valid=0.9,tampered=0.1" -> weights for KINDS (missing kinds are 0)
+    mix = {k: 0.0 for k in KINDS}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in mix:
+            raise ValueError(f"unknown tag kind {kind!r} (expected one of {', '.join(KINDS)})")
+        mix[kind] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("tag mix needs at least one positive weight")
+    return mix
+
+
+def _spread(i: int) -> int:
+    # cheap 32-bit integer hash, so kinds and challenges don't follow the index
+    i = ((i ^ 61) ^ (i >> 16)) * 9 & 0xFFFFFFFF
+    i = (i ^ (i >> 4)) * 0x27D4EB2D & 0xFFFFFFFF
+    return i ^ (i >> 15)
+
+
+class SyntheticTagStream:
+
+    def __init__(
+        self,
+        population: int = 1_000_000,
+        field: int = 5_000,
+        zipf: float = 1.0,
+        churn: float = 50.0,
+        mix: Dict[str, float] = DEFAULT_MIX,
+        seed: int = 7,
+    ) -> None:
+        self.population = max(1, int(population))
+        self.field_size = max(1, min(int(field), self.population))
+        self.churn = max(0.0, float(churn))
+        self._rng = random.Random(seed)
+
+        total = sum(mix.get(k, 0.0) for k in KINDS)
+        self._kind_bounds = list(accumulate(mix.get(k, 0.0) / total * 2**32 for k in KINDS))
+
+        # field slot k is read with weight 1 / (k + 1) ** zipf
+        self._cum_weights = list(accumulate(1.0 / (k + 1) ** zipf for k in range(self.field_size)))
+        self.field: List[int] = list(range(self.field_size))
+        self._next = self.field_size % self.population  # next never-seen tag index
+        self._churn_due = 0.0
+        self._tails: Dict[int, str] = {}  # line tail per tag in the field
+
+        self.events = 0
+        self.arrivals = self.field_size
+        self.departures = 0
+
+    def kind(self, idx: int) -> str:
+        return KINDS[min(bisect_right(self._kind_bounds, _spread(idx)), len(KINDS) - 1)]
+
+    @staticmethod
+    def tid(idx: int) -> str:
+        return f"E2806890{idx:016X}"
+
+    def _tail(self, idx: int) -> str:
+        # everything after lastSeenTime, built once per tag while it is in the field
+        tail = self._tails.get(idx)
+        if tail is not None:
+            return tail
+        tid = self.tid(idx)
+        kind = self.kind(idx)
+        msg = f"{_spread(idx * 31 + 7):08X}{idx & 0xFFFF:04X}"
+        head = f'","epcHex":"3036{idx:020X}","tidHex":"{tid}","antennaPort":1'
+        if kind == "disabled":
+            tail = head + "}}\n"
+        elif kind == "unsupported":
+            tail = head + f',"tagAuthenticationResponse":{{"messageHex":"{msg}","responseHex":""}}}}}}\n'
+        else:
+            response = generate_response(tid, msg)
+            if kind == "tampered":
+                response = response[::-1]
+            tail = head + (
+                f',"tagAuthenticationResponse":'
+                f'{{"messageHex":"{msg}","responseHex":"{response}","tidHex":"{tid}"}}}}}}\n'
+            )
+        self._tails[idx] = tail
+        return tail
+
+    def advance(self, seconds: float) -> None:
+        # churn: replace random field slots with tags that have not been seen
+        self._churn_due += self.churn * seconds
+        n = int(self._churn_due)
+        self._churn_due -= n
+        for _ in range(min(n, self.population)):
+            slot = self._rng.randrange(self.field_size)
+            self._tails.pop(self.field[slot], None)
+            self.field[slot] = self._next
+            self._next = (self._next + 1) % self.population
+            self.departures += 1
+            self.arrivals += 1
+
+    def batch(self, n: int, now: str = "") -> bytes:
+        # n events as one NDJSON chunk, all stamped with `now` (ISO, "Z")
+        now = now or datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        head = '{"timestamp":"' + now + '","eventType":"tagInventory","tagInventoryEvent":{"lastSeenTime":"' + now
+        field = self.field
+        slots = self._rng.choices(range(self.field_size), cum_weights=self._cum_weights, k=n)
+        self.events += n
+        return "".join([head + self._tail(field[s]) for s in slots]).encode()
+
+    def stats(self) -> dict:
+        return {
+            "events": self.events,
+            "arrivals": self.arrivals,
+            "departures": self.departures,
+            "field": self.field_size,
+            "population": self.population,
+        }
+
+    async def stream(self, rate_hz: float, tick: float = 0.05) -> AsyncIterator[bytes]:
+        # one chunk per tick holding rate_hz * tick events; sleeps are against
+        # a fixed schedule, so a slow consumer is not compounded by drift.
+        # rate_hz <= 0: unpaced, fixed-size chunks.
+        loop = asyncio.get_running_loop()
+        per_tick = max(1, round(rate_hz * tick)) if rate_hz > 0 else 500
+        started = last = loop.time()
+        sent = 0
+        while True:
+            now = loop.time()
+            self.advance(now - last)
+            last = now
+            yield self.batch(per_tick)
+            sent += per_tick
+            if rate_hz > 0:
+                await asyncio.sleep(max(started + sent / rate_hz - loop.time(), 0.0))
+            else:
+                await asyncio.sleep(0)
+
+
+def expected_verdict(kind: str) -> Tuple[bool, str]:
+    # what the gateway should end up showing for each kind
+    return {
+        "valid": (True, "Authentication Passed"),
+        "tampered": (False, "Authentication Failed"),
+        "disabled": (False, "Authentication Disabled"),
+        "unsupported": (False, "Unsupported Tag"),
+    }[kind]
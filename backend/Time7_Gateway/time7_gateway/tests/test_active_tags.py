@@ -73,4 +73,100 @@ def test_get_active_sorted_by_first_seen_desc():
     service.sync_seen(["B"], seen_at=t2)
 
     active = service.get_active()
-    assert [t.tag_id for t in active] == ["B", "A"]  # B first (newer first_seen)
\ No newline at end of file
+    assert [t.tag_id for t in active] == ["B", "A"]  # B first (newer first_seen)
+
+def test_remove_inactive_only_drops_expired_tags_in_last_seen_order():
+    service = ActiveTags(remove_grace_seconds=5.0)
+    t0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
+
+    service.sync_seen(["A", "B", "C"], seen_at=t0)
+    service.sync_seen(["A"], seen_at=t0 + timedelta(seconds=4))  # A refreshed
+
+    removed = service.remove_inactive(now=t0 + timedelta(seconds=6))
+
+    assert removed == 2
+    assert service.get_active_ids() == ["A"]
+
+
+def test_reads_do_not_expire_tags():
+    service = ActiveTags(remove_grace_seconds=1.0)
+    t0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
+    service.sync_seen(["A"], seen_at=t0)
+
+    # long past the grace period in wall-clock time, but no sweep has run
+    assert service.get_active_ids() == ["A"]
+    assert len(service.get_active()) == 1
+
+    service.remove_inactive()
+    assert service.get_active_ids() == []
+
+
+def test_version_changes_only_when_tag_set_changes():
+    service = ActiveTags(remove_grace_seconds=5.0)
+    t0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
+
+    service.sync_seen(["A"], epcHex={"A": "E1"}, seen_at=t0)
+    v1 = service.version
+    service.sync_seen(["A"], epcHex={"A": "E1"}, seen_at=t0 + timedelta(seconds=1))
+    assert service.version == v1
+
+    service.sync_seen(["B"], seen_at=t0 + timedelta(seconds=2))
+    v2 = service.version
+    assert v2 > v1
+
+    service.remove_inactive(now=t0 + timedelta(seconds=6.5))
+    assert service.version > v2
+    assert [t.tidHex for t in service.get_active()] == ["B"]
+
+
+def test_first_seen_uses_given_time_and_stays_in_first_seen_order():
+    at = ActiveTags(remove_grace_seconds=60)
+    now = datetime(2025, 1, 1, 12, 0, 10, tzinfo=timezone.utc)
+
+    at.sync_seen(["A"], seen_at=now, first_seen={"A": now - timedelta(seconds=4)})
+    at.sync_seen(["B"], seen_at=now, first_seen={"B": now - timedelta(seconds=8)})  # older than A
+    at.sync_seen(["A"], seen_at=now, first_seen={"A": now - timedelta(seconds=9)})  # already active
+    at.sync_seen(["C"], seen_at=now)
+
+    first = {t.tidHex: t.first_seen for t in at.get_active()}
+    assert first == {"A": now - timedelta(seconds=4), "B": now - timedelta(seconds=8), "C": now}
+    assert [t.tidHex for t in at.get_active()] == ["C", "A", "B"]
+    assert [r[0] for r in at.rows()] == ["C", "A", "B"]
+    assert at.get("A").last_seen == now and at.get("B").first_seen == now - timedelta(seconds=8)
+    assert at.get_active_ids() == ["B", "A", "C"]  # least recently seen first
+
+
+def test_rows_are_newest_first_with_datetimes_at_the_boundary():
+    at = ActiveTags(remove_grace_seconds=60)
+    t0 = datetime(2026, 2, 12, 0, 0, 0, 123456, tzinfo=timezone.utc)
+
+    at.sync_seen(["A", "B"], epcHex={"A": "EA", "B": "EB"}, seen_at=t0)
+    at.sync_seen(["C"], epcHex={"C": "EC"}, seen_at=t0 + timedelta(seconds=1))
+
+    rows = at.rows()
+    assert [r[0] for r in rows][0] == "C"
+    assert sorted(rows[1:]) == [("A", "EA", t0), ("B", "EB", t0)]
+    assert rows[0][2] == t0 + timedelta(seconds=1)
+    assert at.get("A").first_seen == t0 and at.get("A").epcHex == "EA"
+    assert "A" in at and "Z" not in at
+
+
+def test_compaction_keeps_order_lookup_and_expiry():
+    at = ActiveTags(remove_grace_seconds=5)
+    t0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
+
+    # 3000 short-lived tags, then 10 that stay; the expiry compacts the columns
+    at.sync_seen([f"old{i}" for i in range(3000)], seen_at=t0)
+    for i in range(10):
+        at.sync_seen([f"keep{i}"], epcHex={f"keep{i}": "SAME"}, seen_at=t0 + timedelta(seconds=4 + i * 0.1))
+    at.sync_seen(["keep0"], seen_at=t0 + timedelta(seconds=6))  # keep0 becomes most recently seen
+
+    assert len(at) == 10
+    assert len(at._tid) == 10  # compacted
+    assert [r[0] for r in at.rows()] == [f"keep{i}" for i in reversed(range(10))]
+    assert at.get_active_ids() == [f"keep{i}" for i in range(1, 10)] + ["keep0"]
+    assert at.get("keep3").last_seen == t0 + timedelta(seconds=4.3)
+    assert at.get("keep1").epcHex is at.get("keep2").epcHex  # EPC pool
+
+    at.remove_inactive(now=t0 + timedelta(seconds=9.25))
+    assert at.get_active_ids() == [f"keep{i}" for i in range(3, 10)] + ["keep0"]
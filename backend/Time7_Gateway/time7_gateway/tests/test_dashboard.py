@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.api.dashboard import router
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verifier import PENDING_INFO, TagVerifier
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.active_tags = ActiveTags(remove_grace_seconds=3600.0)
+    app.state.tag_info_cache = TagInfoCache()
+    app.state.verifier = TagVerifier(MagicMock(), app.state.tag_info_cache, MagicMock())
+    return app, TestClient(app)
+
+
+def test_active_tags_newest_first_with_verdicts():
+    app, client = make_client()
+    now = datetime.now(timezone.utc)
+    app.state.active_tags.sync_seen(["A"], epcHex={"A": "EA"}, seen_at=now)
+    app.state.active_tags.sync_seen(["B"], epcHex={"B": "EB"}, seen_at=now)
+    app.state.tag_info_cache.set("A", True, "Authentication Passed")
+    app.state.tag_info_cache.set("B", False, "Authentication Failed")
+
+    rows = client.get("/api/active-tags").json()
+
+    assert [r["tidHex"] for r in rows] == ["B", "A"]
+    assert rows[1]["auth"] is True and rows[1]["epcHex"] == "EA"
+
+
+def test_pending_tags_are_listed_with_null_auth():
+    app, client = make_client()
+    app.state.active_tags.sync_seen(["A"], epcHex={"A": "EA"})
+    app.state.verifier._inflight["A"] = MagicMock()
+    app.state.verifier.version += 1
+
+    rows = client.get("/api/active-tags").json()
+
+    assert rows == [{
+        "tidHex": "A", "epcHex": "EA", "first_seen": rows[0]["first_seen"],
+        "auth": None, "info": PENDING_INFO,
+    }]
+
+
+def test_response_is_reused_until_something_changes():
+    app, client = make_client()
+    app.state.active_tags.sync_seen(["A"], epcHex={"A": "EA"})
+    app.state.tag_info_cache.set("A", True, "ok")
+
+    first = client.get("/api/active-tags")
+    view = app.state.active_tags_view
+    second = client.get("/api/active-tags")
+    assert app.state.active_tags_view is view
+    assert first.content == second.content
+
+    # a re-read of a known tag does not invalidate the view
+    app.state.active_tags.sync_seen(["A"], epcHex={"A": "EA"})
+    client.get("/api/active-tags")
+    assert app.state.active_tags_view is view
+
+    # a verdict change does
+    app.state.tag_info_cache.set("A", False, "changed")
+    rows = client.get("/api/active-tags").json()
+    assert app.state.active_tags_view is not view
+    assert rows[0]["auth"] is False
+
+
+def fill(app, n, start):
+    # tags T0..T{n-1}, one second apart; even ones passed, odd ones failed
+    for i in range(n):
+        tid = f"T{i}"
+        app.state.active_tags.sync_seen([tid], epcHex={tid: f"E{i % 3}{i}"}, seen_at=start + timedelta(seconds=i))
+        if i % 2:
+            app.state.tag_info_cache.set(tid, False, "Authentication Failed")
+        else:
+            app.state.tag_info_cache.set(tid, True, "Authentication Passed")
+
+
+def test_filters_and_field_selection():
+    app, client = make_client()
+    start = datetime.now(timezone.utc) - timedelta(minutes=5)
+    fill(app, 10, start)
+
+    passed = client.get("/api/active-tags", params={"auth": "true"}).json()
+    assert [r["tidHex"] for r in passed] == ["T8", "T6", "T4", "T2", "T0"]
+
+    failed = client.get("/api/active-tags", params={"info": "Authentication Failed", "epc_prefix": "E0"}).json()
+    assert [r["tidHex"] for r in failed] == ["T9", "T3"]
+
+    recent = client.get("/api/active-tags", params={"since": (start + timedelta(seconds=7)).isoformat()}).json()
+    assert [r["tidHex"] for r in recent] == ["T9", "T8", "T7"]
+
+    slim = client.get("/api/active-tags", params={"auth": "false", "fields": "tidHex,auth"}).json()
+    assert slim[0] == {"tidHex": "T9", "auth": False}
+
+    assert client.get("/api/active-tags", params={"fields": "tidHex,secret"}).status_code == 422
+    assert client.get("/api/active-tags", params={"limit": 2, "cursor": "bogus"}).status_code == 422
+    assert client.get("/api/active-tags", params={"limit": 2, "cursor": "99999999999999999999_A"}).status_code == 422
+
+
+def test_cursor_pages_cover_every_tag_once():
+    app, client = make_client()
+    fill(app, 7, datetime.now(timezone.utc) - timedelta(minutes=5))
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/api/active-tags", params=params)
+        seen += [r["tidHex"] for r in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == [f"T{i}" for i in range(6, -1, -1)]
+
+    # a tag arriving between pages lands before the cursor, not in later pages
+    first = client.get("/api/active-tags", params={"limit": 3})
+    app.state.active_tags.sync_seen(["NEW"], epcHex={"NEW": "EN"})
+    app.state.tag_info_cache.set("NEW", True, "Authentication Passed")
+    rest = client.get("/api/active-tags", params={"limit": 10, "cursor": first.headers["X-Next-Cursor"]}).json()
+    assert [r["tidHex"] for r in rest] == ["T3", "T2", "T1", "T0"]
+
+
+def test_summary_counts():
+    app, client = make_client()
+    fill(app, 5, datetime.now(timezone.utc) - timedelta(minutes=5))
+    app.state.active_tags.sync_seen(["P"], epcHex={"P": "EP"})
+    app.state.verifier._inflight["P"] = MagicMock()
+    app.state.verifier.version += 1
+
+    assert client.get("/api/active-tags/summary").json() == {
+        "total": 6, "passed": 3, "failed": 2, "pending": 1,
+        "by_info": {"Authentication Passed": 3, "Authentication Failed": 2, PENDING_INFO: 1},
+    }
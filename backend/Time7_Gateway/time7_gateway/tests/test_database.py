@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from time7_gateway.services.database import (
+    PostgresRepository,
+    SQLiteRepository,
+    SupabaseRepository,
+    pg_record,
+    repository_from_env,
+    tag_row,
+)
+from time7_gateway.services.db_writer import DBWriter
+
+T0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_upsert_keeps_the_latest_row(tmp_path):
+    repo = SQLiteRepository(str(tmp_path / "tags.db"))
+    await repo.open()
+
+    await repo.upsert_tags([tag_row("A", T0, False, "Authentication Disabled", "E1"), tag_row("B", T0, True, "ok", None)])
+    await repo.upsert_tags([tag_row("A", T0 + timedelta(seconds=1), True, "Authentication Passed", "E1")])
+
+    assert await repo.get_tag("A") == {
+        "tid_hex": "A", "first_seen": (T0 + timedelta(seconds=1)).isoformat(),
+        "auth": True, "info": "Authentication Passed", "epc_hex": "E1",
+    }
+    assert (await repo.get_tag("B"))["epc_hex"] is None
+    assert await repo.get_tag("C") is None
+    await repo.close()
+
+
+@pytest.mark.asyncio
+async def test_repositories_must_be_opened_first(tmp_path):
+    with pytest.raises(RuntimeError, match="open"):
+        await SQLiteRepository(str(tmp_path / "tags.db")).get_tag("A")
+    with pytest.raises(RuntimeError, match="open"):
+        await PostgresRepository("postgresql://gw@localhost/time7").upsert_tags([tag_row("A", T0, True, "ok", None)])
+
+
+@pytest.mark.asyncio
+async def test_db_writer_awaits_an_async_repository(tmp_path):
+    repo = SQLiteRepository(str(tmp_path / "tags.db"))
+    await repo.open()
+    writer = DBWriter(upsert=repo.upsert_tags, flush_interval=0.01)
+    writer.start()
+
+    writer.enqueue("A", T0, True, "Authentication Passed", "E1")
+    await writer.stop()
+
+    assert (await repo.get_tag("A"))["auth"] is True
+    assert writer.stats()["rows_written"] == 1
+    await repo.close()
+
+
+def test_backend_is_chosen_by_config(monkeypatch, tmp_path):
+    monkeypatch.delenv("DB_BACKEND", raising=False)
+    assert isinstance(repository_from_env(), SupabaseRepository)
+
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "x.db"))
+    assert repository_from_env().path == str(tmp_path / "x.db")
+
+    monkeypatch.setenv("DB_BACKEND", "postgres")
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    with pytest.raises(ValueError, match="DATABASE_URL"):
+        repository_from_env()
+
+    monkeypatch.setenv("DATABASE_URL", "postgresql://gw@localhost/time7")
+    monkeypatch.setenv("DB_POOL_MAX", "8")
+    repo = repository_from_env()
+    assert isinstance(repo, PostgresRepository) and repo.max_size == 8
+
+    monkeypatch.setenv("DB_BACKEND", "mysql")
+    with pytest.raises(ValueError):
+        repository_from_env()
+
+
+def test_postgres_records_are_naive_utc():
+    local = T0.astimezone(timezone(timedelta(hours=2)))
+
+    assert pg_record(tag_row("A", local, True, "ok", "E1")) == ("A", datetime(2026, 2, 12), True, "ok", "E1")
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from time7_gateway.services.db_writer import DBWriter
+
+
+T0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
+
+
+class RecordingUpsert:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, rows):
+        self.batches.append(list(rows))
+
+
+@pytest.mark.asyncio
+async def test_rows_are_merged_by_tid_and_sent_as_one_batch():
+    upsert = RecordingUpsert()
+    writer = DBWriter(upsert=upsert, flush_interval=0.05)
+    writer.start()
+
+    writer.enqueue("A", T0, False, "Authentication Disabled", "E1")
+    writer.enqueue("B", T0, True, "Authentication Passed", "E2")
+    writer.enqueue("A", T0 + timedelta(seconds=1), True, "Authentication Passed", "E1")
+
+    await writer.stop()
+
+    assert len(upsert.batches) == 1
+    rows = {r["tid_hex"]: r for r in upsert.batches[0]}
+    assert set(rows) == {"A", "B"}
+    # latest row for a tag wins
+    assert rows["A"]["auth"] is True
+    assert rows["A"]["first_seen"] == (T0 + timedelta(seconds=1)).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_batch_size_splits_flushes():
+    upsert = RecordingUpsert()
+    writer = DBWriter(upsert=upsert, batch_size=2, flush_interval=10.0)
+    writer.start()
+
+    for tid in ["A", "B", "C"]:
+        writer.enqueue(tid, T0, True, "ok", None)
+
+    await writer.stop()
+
+    assert [len(b) for b in upsert.batches] == [2, 1]
+    assert writer.stats()["rows_written"] == 3
+
+
+def test_enqueue_drops_when_queue_full():
+    writer = DBWriter(upsert=RecordingUpsert(), max_queue=1)
+    dropped = []
+    writer.on_drop = dropped.append
+
+    assert writer.enqueue("A", T0, True, "ok", None) is True
+    assert writer.enqueue("B", T0, True, "ok", None) is False
+
+    stats = writer.stats()
+    assert stats["queue_depth"] == 1
+    assert stats["dropped"] == 1
+    assert dropped == ["B"]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_counted_and_writer_keeps_running():
+    calls = []
+
+    def flaky(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise RuntimeError("db down")
+
+    writer = DBWriter(upsert=flaky, batch_size=1, flush_interval=10.0, retry_interval=0.0)
+    writer.start()
+    writer.enqueue("A", T0, True, "ok", None)
+    writer.enqueue("B", T0, True, "ok", None)
+    await writer.stop()
+
+    stats = writer.stats()
+    assert stats["flush_errors"] == 1
+    # the failed row is sent again
+    assert stats["rows_written"] == 2 and stats["retried"] == 1
+    assert [[r["tid_hex"] for r in rows] for rows in calls] == [["A"], ["A"], ["B"]]
+
+
+@pytest.mark.asyncio
+async def test_row_is_dropped_after_max_retries():
+    calls = []
+
+    def down(rows):
+        calls.append(rows)
+        raise RuntimeError("db down")
+
+    writer = DBWriter(upsert=down, flush_interval=0.01, max_retries=2, retry_interval=0.0)
+    dropped = []
+    writer.on_drop = dropped.append
+    writer.start()
+    writer.enqueue("A", T0, True, "ok", None)
+    while not dropped:
+        await asyncio.sleep(0.01)
+    await writer.stop()
+
+    assert dropped == ["A"]
+    assert len(calls) == 3  # first try and two retries
+    assert writer.stats()["dropped"] == 1
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+from time7_gateway.clients.event_decoder import DECODERS, JSONArraySplitter, NDJSONSplitter, TagEvent, decode_lines
+
+FULL = {
+    "timestamp": "2025-01-01T00:00:00Z",
+    "eventType": "tagInventory",
+    "tagInventoryEvent": {
+        "epcHex": "E1",
+        "tidHex": "T1",
+        "antennaPort": 1,
+        "tagAuthenticationResponse": {"messageHex": "M1", "responseHex": "R1", "tidHex": "T1"},
+    },
+}
+NO_AUTH = {"eventType": "tagInventory", "tagInventoryEvent": {"tidHex": "T2"}}
+EMPTY_AUTH = {
+    "eventType": "tagInventory",
+    "tagInventoryEvent": {"tidHex": "T3", "epcHex": "E3", "tagAuthenticationResponse": {}},
+}
+OTHER = {"eventType": "antennaHealth", "note": "mentions tagInventory in passing"}
+
+
+def as_tuple(ev: TagEvent):
+    return (ev.tidHex, ev.epcHex, ev.hasAuth, ev.messageHex, ev.responseHex, ev.authTidHex)
+
+
+def lines(*events):
+    return [json.dumps(ev).encode() for ev in events]
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+def test_backends_decode_the_same_events(backend):
+    out = [as_tuple(ev) for ev in decode_lines(lines(FULL, NO_AUTH, EMPTY_AUTH, OTHER), backend)]
+
+    assert out == [
+        ("T1", "E1", True, "M1", "R1", "T1"),
+        ("T2", None, False, "", "", ""),
+        ("T3", "E3", False, "", "", ""),
+    ]
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+def test_backends_agree_with_from_dict(backend):
+    events = [FULL, NO_AUTH, EMPTY_AUTH, OTHER]
+    expected = [as_tuple(ev) for ev in map(TagEvent.from_dict, events) if ev is not None]
+
+    assert [as_tuple(ev) for ev in decode_lines(lines(*events), backend)] == expected
+
+
+def test_lines_without_the_marker_are_never_decoded():
+    calls = []
+    DECODERS["spy"] = lambda line: calls.append(line)
+    try:
+        list(decode_lines([b"", b'{"eventType":"keepalive"}', json.dumps(FULL).encode()], "spy"))
+    finally:
+        del DECODERS["spy"]
+
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+def test_malformed_lines_are_skipped(backend):
+    raw = [b'{"eventType":"tagInventory", broken'] + lines(NO_AUTH)
+
+    assert [ev.tidHex for ev in decode_lines(raw, backend)] == ["T2"]
+
+    # a line holding two events, and one that is not UTF-8
+    raw = [b'{"eventType":"tagInventory"},{"eventType":"tagInventory"}', b'\xff"tagInventory'] + lines(NO_AUTH)
+
+    assert [ev.tidHex for ev in decode_lines(raw, backend)] == ["T2"]
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+def test_misshapen_events_are_skipped(backend):
+    raw = [
+        b'{"eventType":"tagInventory","tagInventoryEvent":"T1"}',
+        b'{"eventType":"tagInventory","tagInventoryEvent":{"tidHex":"T1","tagAuthenticationResponse":[1]}}',
+    ] + lines(NO_AUTH)
+
+    assert [ev.tidHex for ev in decode_lines(raw, backend)] == ["T2"]
+
+
+def test_splitter_carries_partial_lines_across_chunks():
+    body = b"\n".join(lines(FULL, NO_AUTH)) + b"\n" + json.dumps(EMPTY_AUTH).encode()
+    splitter = NDJSONSplitter()
+
+    out = []
+    for i in range(0, len(body), 7):
+        out.extend(splitter.feed(body[i:i + 7]))
+    out.extend(splitter.flush())
+
+    assert [json.loads(line) for line in out] == [FULL, NO_AUTH, EMPTY_AUTH]
+    assert splitter.flush() == []
+
+
+@pytest.mark.parametrize("size", [1, 7, 1 << 16])
+def test_array_splitter_yields_elements_across_chunks(size):
+    tricky = {"eventType": "note", "text": 'brackets } ] { [ and "quotes" \\ in strings'}
+    deep = [[[[[[[[{"x": 1}]]]]]]]]  # deeper than the fast path handles
+    body = json.dumps([FULL, tricky, NO_AUTH, deep, "scalar", EMPTY_AUTH], indent=1).encode()
+    splitter = JSONArraySplitter()
+
+    out = []
+    for i in range(0, len(body), size):
+        out.extend(splitter.feed(body[i:i + size]))
+    out.extend(splitter.flush())
+
+    assert [json.loads(el) for el in out] == [FULL, tricky, NO_AUTH, deep, EMPTY_AUTH]
+    assert splitter.flush() == []
+
+
+def test_array_splitter_passes_on_a_truncated_element():
+    splitter = JSONArraySplitter()
+
+    out = splitter.feed(b"[" + json.dumps(FULL).encode() + b', {"eventType": "tagInv')
+
+    assert [json.loads(el) for el in out] == [FULL]
+    assert splitter.flush() == [b'{"eventType": "tagInv']
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+def test_reader_time_prefers_last_seen_time(backend):
+    with_last_seen = {**FULL, "tagInventoryEvent": {**FULL["tagInventoryEvent"], "lastSeenTime": "2025-01-01T00:00:01Z"}}
+
+    out = [ev.readTime for ev in decode_lines(lines(with_last_seen, FULL, NO_AUTH), backend)]
+
+    assert out == ["2025-01-01T00:00:01Z", "2025-01-01T00:00:00Z", None]
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+def test_antenna_and_rssi_are_decoded(backend):
+    with_rssi = {**FULL, "tagInventoryEvent": {**FULL["tagInventoryEvent"], "peakRssiCdbm": -5400}}
+
+    out = [(ev.antenna, ev.rssi) for ev in decode_lines(lines(with_rssi, NO_AUTH), backend)]
+
+    assert out == [(1, -5400), (None, None)]
+
+
+def test_parse_reader_time_handles_nanoseconds():
+    from datetime import datetime, timezone
+    from time7_gateway.clients.event_decoder import parse_reader_time
+
+    assert parse_reader_time("2026-02-08T22:43:36.736669722Z") == datetime(2026, 2, 8, 22, 43, 36, 736669, tzinfo=timezone.utc)
+    assert parse_reader_time("not a time") is None
+    assert parse_reader_time(None) is None
@@ -0,0 +1,96 @@
+import httpx
+import pytest
+
+from time7_gateway.clients.ias_services import CircuitBreaker, IASClient, IASUnavailableError
+from time7_gateway.models.schemas import AuthPayload
+
+
+def payload(tid="TID1"):
+    return AuthPayload(messageHex="AABB", responseHex="CCDD", tidHex=tid)
+
+
+def make_client(handler, **kwargs):
+    kwargs.setdefault("backoff", 0.0)
+    return IASClient("http://ias", transport=httpx.MockTransport(handler), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_lookup_returns_auth_and_info():
+    def handler(request):
+        assert request.url.path == "/verify"
+        return httpx.Response(200, json={"auth": True, "info": "Authentication Passed"})
+
+    client = make_client(handler)
+    assert await client.lookup(payload()) == (True, "Authentication Passed")
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"auth": False, "info": "Authentication Failed"})
+
+    client = make_client(handler, retries=2)
+    assert await client.lookup(payload()) == (False, "Authentication Failed")
+    assert len(calls) == 3
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_retries():
+    def handler(request):
+        raise httpx.ConnectError("refused")
+
+    client = make_client(handler, retries=1)
+    with pytest.raises(IASUnavailableError):
+        await client.lookup(payload())
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_when_open():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    client = make_client(handler, retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60.0))
+    for _ in range(2):
+        with pytest.raises(IASUnavailableError):
+            await client.lookup(payload())
+    assert client.breaker.state == "open"
+
+    with pytest.raises(IASUnavailableError):
+        await client.lookup(payload())
+    assert len(calls) == 2  # third call never reached IAS
+    await client.aclose()
+
+
+def test_circuit_breaker_half_open_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half-open"
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_preserves_order():
+    def handler(request):
+        import json
+        items = json.loads(request.content)["items"]
+        return httpx.Response(200, json={
+            "results": [{"auth": it["tidHex"] == "B", "info": it["tidHex"]} for it in items]
+        })
+
+    client = make_client(handler)
+    results = await client.batch_lookup([payload("A"), payload("B"), payload("C")])
+    assert results == [(False, "A"), (True, "B"), (False, "C")]
+    await client.aclose()
@@ -0,0 +1,110 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.api.dashboard import router as dashboard_router
+from time7_gateway.api.ingest import router
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verifier import TagVerifier
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+from time7_gateway.simulators.reader_route import router as sim_router
+
+
+def event(tid, response="R"):
+    tar = {"messageHex": "M", "responseHex": response, "tidHex": tid} if response is not None else {}
+    return {
+        "timestamp": "2026-03-01T12:00:00Z",
+        "eventType": "tagInventory",
+        "tagInventoryEvent": {"tidHex": tid, "epcHex": f"E{tid}", "tagAuthenticationResponse": tar},
+    }
+
+
+def make_client(ias_lookup=None, batch_max=1000):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.include_router(dashboard_router, prefix="/api")
+    app.include_router(sim_router, prefix="/api/sim")
+    app.state.active_tags = ActiveTags(remove_grace_seconds=3600.0)
+    app.state.tag_info_cache = TagInfoCache()
+    app.state.db_writer = MagicMock()
+    app.state.verifier = TagVerifier(ias_lookup or MagicMock(return_value=(True, "ok")), app.state.tag_info_cache, app.state.db_writer)
+    app.state.ingest_batch_max = batch_max
+    return app, TestClient(app)
+
+
+def chunked(body: bytes, size: int = 5):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "array"])
+def test_pushed_batch_is_applied_and_counted(fmt):
+    app, client = make_client(batch_max=2)
+    events = [event("A"), event("B"), event("A"), event("C", response=None),
+              {"eventType": "antennaHealth"}, event("D", response="")]
+    if fmt == "ndjson":
+        body = b"\n".join(json.dumps(ev).encode() for ev in events) + b"\n"
+    else:
+        body = json.dumps(events).encode()
+
+    resp = client.post("/api/ingest/events", content=chunked(body))
+
+    assert resp.status_code == 202
+    assert resp.json() == {
+        "ok": True, "lines": 6, "events": 5, "skipped": 1,
+        "tags": 5, "verifications_started": 2, "batches": 3,
+    }
+    assert sorted(app.state.active_tags.get_active_ids()) == ["A", "B", "C", "D"]
+    assert app.state.tag_info_cache.get("C") == (False, "Authentication Disabled")
+    assert app.state.tag_info_cache.get("D") == (False, "Unsupported Tag")
+
+
+def test_empty_body_is_accepted():
+    _, client = make_client()
+
+    resp = client.post("/api/ingest/events", content=b"  \n")
+
+    assert resp.status_code == 202
+    assert resp.json()["events"] == 0
+
+
+def test_pushed_reads_go_to_the_sighting_log(tmp_path):
+    from time7_gateway.services.sighting_log import SightingLog
+
+    app, client = make_client()
+    app.state.sighting_log = log = SightingLog(str(tmp_path))
+    body = b"\n".join(json.dumps(event(tid)).encode() for tid in ("A", "B", "A"))
+
+    client.post("/api/ingest/events", params={"reader": "dock-7"}, content=body)
+    log.append(log._take())
+
+    assert [(s["reader"], s["reads"]) for s in log.history("A")] == [("dock-7", 2)]
+
+
+def test_terminal_sim_signs_challenges_for_the_mock_ias():
+    app, client = make_client(ias_lookup=mock_ias_lookup)
+
+    resp = client.post("/api/sim/reader/events", json={"tagIds": ["E28068900000000000000001", "E28068900000000000000002"]})
+
+    assert resp.status_code == 202
+    assert resp.json()["verifications_started"] == 2
+    assert sorted(app.state.active_tags.get_active_ids()) == ["E28068900000000000000001", "E28068900000000000000002"]
+    assert client.post("/api/sim/reader/events", json={"tidHex": "x"}).status_code == 422
+
+
+def test_tags_without_an_epc_are_listed():
+    app, client = make_client()
+    pushed = event("P")
+    del pushed["tagInventoryEvent"]["epcHex"]
+
+    client.post("/api/sim/reader/events", json={"tagIds": ["S"]})
+    client.post("/api/ingest/events", content=json.dumps(pushed).encode())
+
+    for params in ({}, {"limit": 5}):
+        resp = client.get("/api/active-tags", params=params)
+        assert resp.status_code == 200
+        assert sorted((r["tidHex"], r["epcHex"]) for r in resp.json()) == [("P", None), ("S", None)]
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from time7_gateway.api import live_feed
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.live_feed import LiveFeedHub
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verifier import TagVerifier
+
+
+def make_state():
+    hub = LiveFeedHub(max_pending=3)
+    state = SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=3600.0),
+        tag_info_cache=TagInfoCache(),
+        live_feed=hub,
+    )
+    state.verifier = TagVerifier(MagicMock(), state.tag_info_cache, MagicMock())
+    state.active_tags.on_change = hub.notify
+    state.tag_info_cache.on_change = hub.notify
+    state.verifier.on_change = hub.notify
+    return state
+
+
+def parse(chunk: bytes):
+    event, data = chunk.decode().strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_changes_are_coalesced_per_subscriber():
+    state = make_state()
+    sub = state.live_feed.subscribe()
+
+    state.active_tags.sync_seen(["A"])
+    state.tag_info_cache.set("A", True, "ok")
+    state.tag_info_cache.set("A", False, "changed")
+
+    assert sub.take() == {"A"}
+    assert sub.take() == set()
+
+
+def test_slow_subscriber_is_resynced_instead_of_buffering_forever():
+    state = make_state()
+    sub = state.live_feed.subscribe()
+
+    state.active_tags.sync_seen(["A", "B", "C", "D"])
+
+    assert sub.resync is True
+    assert sub.pending == set()
+
+
+def test_delta_reports_upserts_and_removals():
+    state = make_state()
+    state.active_tags.sync_seen(["A"], epcHex={"A": "EA"})
+    state.tag_info_cache.set("A", True, "ok")
+
+    event, data = parse(live_feed._delta(state, {"A", "GONE"}))
+
+    assert event == "delta"
+    assert [r["tidHex"] for r in data["upsert"]] == ["A"]
+    assert data["upsert"][0]["auth"] is True
+    assert data["remove"] == ["GONE"]
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_snapshot_then_deltas(monkeypatch):
+    monkeypatch.setattr(live_feed, "TICK_SECONDS", 0.0)
+    state = make_state()
+    state.active_tags.sync_seen(["A"], epcHex={"A": "EA"})
+    state.tag_info_cache.set("A", True, "ok")
+
+    request = SimpleNamespace(app=SimpleNamespace(state=state))
+    stream = live_feed._stream(request, state.live_feed)
+
+    event, data = parse(await stream.__anext__())
+    assert event == "snapshot"
+    assert [r["tidHex"] for r in data] == ["A"]
+
+    state.active_tags.sync_seen(["B"], epcHex={"B": "EB"})
+    state.tag_info_cache.set("B", False, "bad")
+
+    event, data = parse(await asyncio.wait_for(stream.__anext__(), 1.0))
+    assert event == "delta"
+    assert [r["tidHex"] for r in data["upsert"]] == ["B"]
+
+    await stream.aclose()
+    assert len(state.live_feed) == 0
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.api import metrics as metrics_api
+from time7_gateway.clients.event_decoder import TagEvent, decode_lines
+from time7_gateway.clients.reader_client import collapse_events
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.metrics import EVENTS_SKIPPED, Registry
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+
+def test_counter_and_callback_rendering():
+    reg = Registry()
+    c = reg.counter("x_total", "things", ["kind"])
+    c.inc("a")
+    c.inc("a", amount=2)
+    c.inc('q"uote')
+    reg.gauge_func("g", "a gauge", lambda: 1.5)
+    reg.gauge_func("broken", "skipped on error", lambda: 1 / 0)
+
+    text = reg.render()
+
+    assert '# TYPE x_total counter' in text
+    assert 'x_total{kind="a"} 3' in text
+    assert 'x_total{kind="q\\"uote"} 1' in text
+    assert "\ng 1.5\n" in text
+    assert "broken" not in text
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = Registry()
+    h = reg.histogram("lat_seconds", "latency", buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v)
+
+    lines = reg.render().splitlines()
+
+    assert 'lat_seconds_bucket{le="0.1"} 2' in lines
+    assert 'lat_seconds_bucket{le="1"} 3' in lines
+    assert 'lat_seconds_bucket{le="+Inf"} 4' in lines
+    assert "lat_seconds_sum 3.65" in lines
+    assert "lat_seconds_count 4" in lines
+
+
+def test_skip_reasons_are_counted():
+    before = {r: EVENTS_SKIPPED.value(r) for r in ("non_inventory", "malformed", "missing_tid", "auth_disabled", "unsupported_tag")}
+
+    list(decode_lines([b'{"eventType":"other"}', b'{"eventType":"tagInventory" oops', b""]))
+    collapse_events([
+        TagEvent(tidHex=""),
+        TagEvent(tidHex="A"),
+        TagEvent(tidHex="B", hasAuth=True, messageHex="M", responseHex=""),
+        TagEvent(tidHex="C", hasAuth=True, messageHex="M", responseHex="R"),
+    ])
+
+    delta = {r: EVENTS_SKIPPED.value(r) - v for r, v in before.items()}
+    assert delta == {"non_inventory": 1, "malformed": 1, "missing_tid": 1, "auth_disabled": 1, "unsupported_tag": 1}
+
+
+def test_metrics_endpoint_reads_gateway_state(monkeypatch):
+    reg = Registry()
+    monkeypatch.setattr(metrics_api, "REGISTRY", reg)
+
+    cache = TagInfoCache()
+    cache.set("A", True, "ok")
+    cache.get("A")
+    cache.get("missing")
+    active_tags = ActiveTags(remove_grace_seconds=3600.0)
+    active_tags.sync_seen(["A", "B"])
+    readers = MagicMock()
+    readers.stats.return_value = [{"name": "dock-1", "events": 42, "connected": True, "connects": 1}]
+
+    app = FastAPI()
+    app.state.tag_info_cache = cache
+    app.state.active_tags = active_tags
+    app.state.readers = readers
+    app.state.verifier = SimpleNamespace(stats=lambda: {"in_flight": 3}, deduplicated=0)
+    app.state.db_writer = SimpleNamespace(
+        rows_written=7, writes_saved=0, dropped=0, flush_errors=0, stats=lambda: {"queue_depth": 5},
+    )
+    app.state.live_feed = []
+    app.include_router(metrics_api.router)
+    metrics_api.register_state_metrics(app, reg)
+
+    r = TestClient(app).get("/metrics")
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = r.text.splitlines()
+    for expected in (
+        'time7_reader_events_total{reader="dock-1"} 42',
+        'time7_reader_connected{reader="dock-1"} 1',
+        'time7_cache_requests_total{result="hit"} 1',
+        'time7_cache_requests_total{result="miss"} 1',
+        "time7_cache_entries 1",
+        "time7_active_tags 2",
+        "time7_ias_in_flight 3",
+        "time7_db_rows_written_total 7",
+        "time7_db_queue_depth 5",
+        "time7_live_feed_subscribers 0",
+    ):
+        assert expected in lines
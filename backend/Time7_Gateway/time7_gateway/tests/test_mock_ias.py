@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from time7_gateway.models.schemas import AuthBatchRequest, AuthPayload
+from time7_gateway.simulators import ias_services
+from time7_gateway.simulators.ias_server import create_app
+from time7_gateway.simulators.ias_services import mock_ias_lookup, mock_ias_lookup_batch
+from time7_gateway.utilities.simulate_encryption import generate_response
+
+
+def payloads(n):
+    out = []
+    for i in range(n):
+        tid, msg = f"E280{i:020X}", f"{i:012X}"
+        response = generate_response(tid, msg)
+        out.append(AuthPayload(tidHex=tid, messageHex=msg, responseHex=response if i % 3 else response[::-1]))
+    return out
+
+
+def test_generate_response_is_unchanged():
+    # the value the simulators, fixtures and mock IAS all agree on
+    assert generate_response("E2806890000000000000000A", "E4091641000A") == "8c9f6a5ed13a9e30"
+
+
+def test_batch_matches_single_calls_in_order(monkeypatch):
+    items = payloads(50)
+    expected = [mock_ias_lookup(p) for p in items]
+
+    assert mock_ias_lookup_batch(items) == expected
+
+    monkeypatch.setattr(ias_services, "POOL_MIN_BATCH", 10)
+    with ThreadPoolExecutor(3) as pool:
+        assert mock_ias_lookup_batch(items, pool, workers=3) == expected
+
+
+def test_batch_endpoint_returns_results_in_request_order():
+    items = payloads(20)
+    client = TestClient(create_app(latency_ms=0, workers=0))
+
+    resp = client.post("/verify/batch", json=AuthBatchRequest(items=items).model_dump())
+
+    assert resp.status_code == 200
+    assert [(r["auth"], r["info"]) for r in resp.json()["results"]] == [mock_ias_lookup(p) for p in items]
@@ -9,15 +9,17 @@ ImpinjReaderClient
   [ ] 2.  __init__ creates httpx.AsyncClient with correct Basic Auth credentials
   [ ] 3.  stream_events constructs the correct URL (/data/stream)
   [ ] 4.  stream_events calls raise_for_status()
-  [ ] 5.  stream_events skips empty lines
-  [ ] 6.  stream_events correctly yields parsed JSON dicts
+  [ ] 5.  stream_events skips empty lines and non-tagInventory events
+  [ ] 6.  stream_events yields decoded TagEvents, including lines split across chunks
   [ ] 7.  aclose closes the underlying httpx client
 
 handle_invalid_tag
   [ ] 8.  calls active_tags.sync_seen with the correct tag_id and seen_at
   [ ] 9.  calls cache.set(tag_id, False, info_message)
-  [ ] 10. calls upsert_latest_tag with auth=False and the correct info
+  [ ] 10. queues a DB row (db_writer.enqueue) with auth=False and the correct info
   [ ] 11. does not raise an exception
+  [ ] 11a. a repeated read with an unchanged cached verdict is not re-written
+  [ ] 11b. a changed verdict is written again
 
 run_reader_stream — event filtering
   [ ] 12. events where eventType != "tagInventory" are skipped (no cache/db calls)
@@ -38,7 +40,7 @@ run_reader_stream — IAS cache logic
   [ ] 19. a cache hit skips ias_lookup entirely
   [ ] 20. a cache miss calls ias_lookup exactly once
   [ ] 21. the ias_lookup result is correctly written to the cache
-  [ ] 22. the ias_lookup result is correctly written to the database (upsert_latest_tag)
+  [ ] 22. the ias_lookup result is correctly written to the database (db_writer.enqueue)
 
 run_reader_stream — active_tags
   [ ] 23. a valid event calls active_tags.sync_seen
@@ -47,12 +49,28 @@ run_reader_stream — active_tags
 run_reader_stream — resource cleanup
   [ ] 25. client.aclose() is called on normal exit
   [ ] 26. client.aclose() is still called on exception (finally block)
+
+process_tag_batch / window_batches (READER_BATCH_MAX > 1)
+  [ ] 27. one sync_seen call per batch with every unique tidHex
+  [ ] 28. repeated reads of a tag in one batch build a single AuthPayload
+  [ ] 29. cache hits and tags already being verified are not submitted
+  [ ] 30. invalid tags in a batch are cached / written like handle_invalid_tag
+  [ ] 31. window_batches fills batches up to max_events without waiting
+  [ ] 32. window_batches closes a partial batch after the window
+  [ ] 33. window_batches re-raises stream errors after the pending events
+  [ ] 34. run_reader_stream uses the batched path when READER_BATCH_MAX > 1
+  [ ] 35. a new tag's first_seen is the reader's read time unless it is implausible
 """
 
+import asyncio
+
 import pytest
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from time7_gateway.clients.event_decoder import TagEvent
+from time7_gateway.services.verifier import TagVerifier
+
 # ── Module under test ─────────────────────────────────────────────────────────
 MODULE = "time7_gateway.clients.reader_client"
 
@@ -78,11 +96,17 @@ def make_valid_event(tid="TID123", epc="EPC456", message="AABBCC",
 
 
 def make_app_state(cache_hit=None):
-    """Return a mock FastAPI app with the three required state objects."""
+    """Return a mock FastAPI app with the required state objects."""
     app = MagicMock()
     app.state.active_tags = MagicMock()
     app.state.tag_info_cache = MagicMock()
     app.state.ias_lookup = MagicMock(return_value=(True, "authentic"))
+    app.state.db_writer = MagicMock()
+    app.state.verifier = TagVerifier(
+        ias_lookup=app.state.ias_lookup,
+        cache=app.state.tag_info_cache,
+        db_writer=app.state.db_writer,
+    )
     # cache.get returns None by default (cache miss); override via cache_hit
     app.state.tag_info_cache.get.return_value = cache_hit
     return app
@@ -110,18 +134,24 @@ class TestImpinjReaderClient:
 
     # [✓] 3 & 4 & 5 & 6
     @pytest.mark.asyncio
-    async def test_stream_events_yields_parsed_json_and_skips_empty(self):
+    async def test_stream_events_yields_tag_events_and_skips_others(self):
         from time7_gateway.clients.reader_client import ImpinjReaderClient
 
-        lines = ['', '{"eventType":"tagInventory"}', '', '{"eventType":"other"}']
+        body = (
+            b'\n{"eventType":"tagInventory","tagInventoryEvent":{"tidHex":"T1","epcHex":"E1"}}\n\n'
+            b'{"eventType":"other"}\n'
+            b'{"eventType":"tagInventory","tagInventoryEvent":{"tidHex":"T2"}}'
+        )
+        # split mid-line to exercise carry-over between chunks
+        chunks = [body[:30], body[30:95], body[95:]]
 
-        async def fake_aiter_lines():
-            for line in lines:
-                yield line
+        async def fake_aiter_bytes():
+            for chunk in chunks:
+                yield chunk
 
         mock_response = AsyncMock()
         mock_response.raise_for_status = MagicMock()
-        mock_response.aiter_lines = fake_aiter_lines
+        mock_response.aiter_bytes = fake_aiter_bytes
         mock_response.__aenter__ = AsyncMock(return_value=mock_response)
         mock_response.__aexit__ = AsyncMock(return_value=False)
 
@@ -132,9 +162,8 @@ class TestImpinjReaderClient:
             c = ImpinjReaderClient("http://reader", "u", "p")
             results = [ev async for ev in c.stream_events()]
 
-        # Empty lines are skipped; two parsed dicts are returned
-        assert len(results) == 2
-        assert results[0] == {"eventType": "tagInventory"}
+        # Empty lines and the non-inventory event are skipped
+        assert [(ev.tidHex, ev.epcHex) for ev in results] == [("T1", "E1"), ("T2", None)]
         mock_client.stream.assert_called_once_with("GET", "http://reader/data/stream")
         mock_response.raise_for_status.assert_called_once()
 
@@ -159,23 +188,24 @@ class TestHandleInvalidTag:
         from time7_gateway.clients.reader_client import handle_invalid_tag
         active_tags = MagicMock()
         cache = MagicMock()
+        db_writer = MagicMock()
         seen_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
 
-        with patch(f"{MODULE}.upsert_latest_tag") as mock_db:
-            handle_invalid_tag(
-                tidHex="TID1",
-                epcHex="EPC1",
-                seen_at=seen_at,
-                active_tags=active_tags,
-                cache=cache,
-                info_message=info_message,
-            )
-        return active_tags, cache, mock_db, seen_at
+        handle_invalid_tag(
+            tidHex="TID1",
+            epcHex="EPC1",
+            seen_at=seen_at,
+            active_tags=active_tags,
+            cache=cache,
+            db_writer=db_writer,
+            info_message=info_message,
+        )
+        return active_tags, cache, db_writer.enqueue, seen_at
 
     # [✓] 8
     def test_calls_sync_seen_with_tag_id_and_seen_at(self):
         active_tags, _, _, seen_at = self._call()
-        active_tags.sync_seen.assert_called_once_with(["TID1"], epcHex={"TID1": "EPC1"}, seen_at=seen_at)
+        active_tags.sync_seen.assert_called_once_with(["TID1"], epcHex={"TID1": "EPC1"}, seen_at=seen_at, first_seen=None)
 
     # [✓] 9
     def test_sets_cache_auth_false(self):
@@ -193,6 +223,34 @@ class TestHandleInvalidTag:
     def test_does_not_raise(self):
         self._call()
 
+    # [✓] 11a
+    def test_repeated_read_with_same_verdict_is_not_rewritten(self):
+        from time7_gateway.clients.reader_client import handle_invalid_tag
+        from time7_gateway.services.tag_info_cache import TagInfoCache
+        cache = TagInfoCache()
+        db_writer = MagicMock()
+        seen_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        for _ in range(5):
+            handle_invalid_tag("TID1", "EPC1", seen_at, MagicMock(), cache, db_writer, "Authentication Disabled")
+
+        db_writer.enqueue.assert_called_once()
+        assert db_writer.skip.call_count == 4
+
+    # [✓] 11b
+    def test_changed_verdict_is_written_again(self):
+        from time7_gateway.clients.reader_client import handle_invalid_tag
+        from time7_gateway.services.tag_info_cache import TagInfoCache
+        cache = TagInfoCache()
+        db_writer = MagicMock()
+        seen_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        handle_invalid_tag("TID1", "EPC1", seen_at, MagicMock(), cache, db_writer, "Authentication Disabled")
+        handle_invalid_tag("TID1", "EPC1", seen_at, MagicMock(), cache, db_writer, "Unsupported Tag")
+
+        assert db_writer.enqueue.call_count == 2
+        assert cache.get("TID1") == (False, "Unsupported Tag")
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 12-26  run_reader_stream
@@ -201,12 +259,14 @@ class TestHandleInvalidTag:
 class TestRunReaderStream:
 
     def _patch_client(self, events):
-        """Patch stream_events to yield the given list of event dicts."""
+        """Patch stream_events to yield the given event dicts, decoded as the real client does."""
         async def fake_stream(self_inner, on_connect=None):
             if on_connect:
                 on_connect()
             for ev in events:
-                yield ev
+                tag_event = TagEvent.from_dict(ev)
+                if tag_event is not None:
+                    yield tag_event
 
         return patch(
             f"{MODULE}.ImpinjReaderClient.stream_events",
@@ -224,14 +284,14 @@ class TestRunReaderStream:
         if app is None:
             app = make_app_state()
         with self._patch_client(events), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag") as mock_db, \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://reader",
                  "READER_USER": "u",
                  "READER_PASSWORD": "p",
              }):
             await run_reader_stream(app)
-        return app, mock_db
+            await app.state.verifier.drain()
+        return app, app.state.db_writer.enqueue
 
     # [✓] 12 — Non-tagInventory events are skipped
     @pytest.mark.asyncio
@@ -294,13 +354,13 @@ class TestRunReaderStream:
         ev = make_valid_event(tid="OUTER_TID", tid_in_tar=None)
         app = make_app_state()
         with self._patch_client([ev]), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch(f"{MODULE}.AuthPayload") as mock_payload, \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
             from time7_gateway.clients.reader_client import run_reader_stream
             await run_reader_stream(app)
+            await app.state.verifier.drain()
 
         _, kwargs = mock_payload.call_args
         assert kwargs["tidHex"] == "OUTER_TID"
@@ -311,12 +371,12 @@ class TestRunReaderStream:
         ev = make_valid_event()
         app = make_app_state(cache_hit=(True, "cached"))
         with self._patch_client([ev]), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
             from time7_gateway.clients.reader_client import run_reader_stream
             await run_reader_stream(app)
+            await app.state.verifier.drain()
 
         app.state.ias_lookup.assert_not_called()
 
@@ -363,13 +423,13 @@ class TestRunReaderStream:
         ev = make_valid_event(message="MSG", response="RESP", tid_in_tar="TID_TAR")
         app = make_app_state()
         with self._patch_client([ev]), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch(f"{MODULE}.AuthPayload") as mock_payload, \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
             from time7_gateway.clients.reader_client import run_reader_stream
             await run_reader_stream(app)
+            await app.state.verifier.drain()
 
         mock_payload.assert_called_once_with(
             messageHex="MSG", responseHex="RESP", tidHex="TID_TAR"
@@ -382,7 +442,6 @@ class TestRunReaderStream:
         app = make_app_state()
         with self._patch_client([]), \
              patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock) as mock_close, \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
@@ -401,11 +460,208 @@ class TestRunReaderStream:
 
         with patch.object(ImpinjReaderClient, "stream_events", new=boom), \
              patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock) as mock_close, \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
             with pytest.raises(RuntimeError):
                 await run_reader_stream(app)
 
-        mock_close.assert_awaited_once()
\ No newline at end of file
+        mock_close.assert_awaited_once()
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 27-34  micro-batched ingestion
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def tag_event(tid="TID1", epc="EPC1", message="MSG", response="RESP", tid_in_tar=None, has_auth=True):
+    return TagEvent(
+        tidHex=tid,
+        epcHex=epc,
+        hasAuth=has_auth,
+        messageHex=message if has_auth else "",
+        responseHex=response if has_auth else "",
+        authTidHex=(tid_in_tar or "") if has_auth else "",
+    )
+
+
+class TestProcessTagBatch:
+
+    SEEN_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def _process(self, events, app=None):
+        from time7_gateway.clients.reader_client import process_tag_batch
+        app = app or make_app_state()
+        app.state.verifier.submit = MagicMock(return_value=True)
+        app.state.verifier.is_pending = MagicMock(return_value=False)
+        submitted = process_tag_batch(
+            events,
+            seen_at=self.SEEN_AT,
+            active_tags=app.state.active_tags,
+            cache=app.state.tag_info_cache,
+            verifier=app.state.verifier,
+            db_writer=app.state.db_writer,
+        )
+        return app, submitted
+
+    # [✓] 27
+    def test_one_sync_seen_per_batch(self):
+        events = [tag_event("A", "EA"), tag_event("B", "EB"), tag_event("A", "EA2")]
+        app, _ = self._process(events)
+
+        app.state.active_tags.sync_seen.assert_called_once()
+        (tids,), kwargs = app.state.active_tags.sync_seen.call_args
+        assert sorted(tids) == ["A", "B"]
+        assert kwargs == {"epcHex": {"A": "EA2", "B": "EB"}, "seen_at": self.SEEN_AT, "first_seen": None}
+
+    # [✓] 28
+    def test_repeated_reads_build_one_payload(self):
+        events = [tag_event("A", tid_in_tar="A")] * 50
+        with patch(f"{MODULE}.AuthPayload") as mock_payload:
+            app, submitted = self._process(events)
+
+        assert submitted == 1
+        mock_payload.assert_called_once_with(messageHex="MSG", responseHex="RESP", tidHex="A")
+        app.state.verifier.submit.assert_called_once()
+
+    # [✓] 29
+    def test_cache_hits_and_pending_tags_are_not_submitted(self):
+        app = make_app_state()
+        app.state.tag_info_cache.get.side_effect = lambda tid: (True, "ok") if tid == "HIT" else None
+        from time7_gateway.clients.reader_client import process_tag_batch
+        app.state.verifier.submit = MagicMock(return_value=True)
+        app.state.verifier.is_pending = MagicMock(side_effect=lambda tid: tid == "PENDING")
+
+        submitted = process_tag_batch(
+            [tag_event("HIT"), tag_event("PENDING"), tag_event("MISS")],
+            seen_at=self.SEEN_AT,
+            active_tags=app.state.active_tags,
+            cache=app.state.tag_info_cache,
+            verifier=app.state.verifier,
+            db_writer=app.state.db_writer,
+        )
+
+        assert submitted == 1
+        assert app.state.verifier.submit.call_args.args[0].tidHex == "MISS"
+
+    # [✓] 30
+    def test_invalid_tags_are_recorded(self):
+        from time7_gateway.services.tag_info_cache import TagInfoCache
+        app = make_app_state()
+        app.state.tag_info_cache = TagInfoCache()
+        events = [
+            tag_event("NOAUTH", has_auth=False),
+            tag_event("UNSUP", response=""),
+            tag_event("NOAUTH", has_auth=False),
+            tag_event("", "EPC"),
+        ]
+
+        app, submitted = self._process(events, app)
+
+        assert submitted == 0
+        assert app.state.tag_info_cache.get("NOAUTH") == (False, "Authentication Disabled")
+        assert app.state.tag_info_cache.get("UNSUP") == (False, "Unsupported Tag")
+        assert app.state.db_writer.enqueue.call_count == 2
+
+
+    # [✓] 35
+    def test_new_tags_take_first_seen_from_reader_time(self):
+        from time7_gateway.clients.reader_client import process_tag_batch
+        from time7_gateway.services.active_tags import ActiveTags
+        app = make_app_state()
+        app.state.active_tags = ActiveTags(remove_grace_seconds=3600.0)
+        app.state.verifier.submit = MagicMock(return_value=True)
+        app.state.verifier.is_pending = MagicMock(return_value=False)
+        now = datetime(2024, 1, 1, 0, 1, tzinfo=timezone.utc)
+
+        def ev(tid, read_time):
+            e = tag_event(tid, tid_in_tar=tid)
+            e.readTime = read_time
+            return e
+
+        process_tag_batch(
+            [
+                ev("LAGGING", "2024-01-01T00:00:50.000000001Z"),
+                ev("FUTURE", "2024-01-01T00:05:00Z"),
+                ev("SKEWED", "2023-12-31T00:00:00Z"),
+                ev("NOTIME", None),
+            ],
+            seen_at=now,
+            active_tags=app.state.active_tags,
+            cache=app.state.tag_info_cache,
+            verifier=app.state.verifier,
+            db_writer=app.state.db_writer,
+            max_lag=60.0,
+        )
+
+        first = {t.tidHex: t.first_seen for t in app.state.active_tags.get_active()}
+        assert first["LAGGING"] == datetime(2024, 1, 1, 0, 0, 50, tzinfo=timezone.utc)
+        assert first["FUTURE"] == first["SKEWED"] == first["NOTIME"] == now
+
+
+async def _chunks(*items, delay=0.0):
+    for item in items:
+        if isinstance(item, Exception):
+            raise item
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+class TestWindowBatches:
+
+    # [✓] 31
+    @pytest.mark.asyncio
+    async def test_fills_up_to_max_events(self):
+        from time7_gateway.clients.reader_client import window_batches
+        chunks = _chunks(*[[i, i] for i in range(0, 10, 2)])
+
+        out = [b async for b in window_batches(chunks, max_events=4, window=5.0)]
+
+        assert [len(b) for b in out] == [4, 4, 2]
+        assert sum(out, []) == [0, 0, 2, 2, 4, 4, 6, 6, 8, 8]
+
+    # [✓] 32
+    @pytest.mark.asyncio
+    async def test_partial_batch_closes_after_window(self):
+        from time7_gateway.clients.reader_client import window_batches
+        chunks = _chunks([1], [2], delay=0.05)
+
+        out = [b async for b in window_batches(chunks, max_events=100, window=0.01)]
+
+        assert out == [[1], [2]]
+
+    # [✓] 33
+    @pytest.mark.asyncio
+    async def test_stream_error_is_raised_after_pending_events(self):
+        from time7_gateway.clients.reader_client import window_batches
+        chunks = _chunks([1, 2], RuntimeError("reader dropped"))
+
+        out = []
+        with pytest.raises(RuntimeError, match="reader dropped"):
+            async for b in window_batches(chunks, max_events=100, window=0.01):
+                out.append(b)
+
+        assert out == [[1, 2]]
+
+    # [✓] 34
+    @pytest.mark.asyncio
+    async def test_run_reader_stream_batched_mode(self):
+        from time7_gateway.clients.reader_client import run_reader_stream, ImpinjReaderClient
+        app = make_app_state()
+
+        async def fake_batches(self_inner, on_connect=None):
+            if on_connect:
+                on_connect()
+            yield [tag_event("A", tid_in_tar="A"), tag_event("B", tid_in_tar="B")]
+            yield [tag_event("A", tid_in_tar="A")]
+
+        with patch.object(ImpinjReaderClient, "stream_batches", new=fake_batches), \
+             patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock), \
+             patch.dict("os.environ", {
+                 "READER_BASE_URL": "http://r", "READER_BATCH_MAX": "64", "READER_BATCH_WINDOW_MS": "5",
+             }):
+            await run_reader_stream(app)
+            await app.state.verifier.drain()
+
+        app.state.active_tags.sync_seen.assert_called_once()
+        assert app.state.ias_lookup.call_count == 2
+        assert app.state.reader_connected is False
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from time7_gateway.simulators import reader_streamer
+from time7_gateway.simulators.reader_streamer import ReplayFile, load_replay, ndjson_line_stream
+
+
+def event(i, ts):
+    return json.dumps({"timestamp": ts, "eventType": "tagInventory", "tagInventoryEvent": {"tidHex": f"T{i}"}})
+
+
+@pytest.fixture
+def fixture_file(tmp_path, monkeypatch):
+    path = tmp_path / "stream.ndjson"
+    path.write_text(
+        event(0, "2026-02-08T22:43:36.000000000Z") + "\r\n"
+        + "\n   \n"
+        + event(1, "2026-02-08T22:43:36.100000Z") + "  \n"
+        + event(2, "2026-02-08T22:43:36.300000Z") + "\n"
+        + event(3, "not a time")
+    )
+    monkeypatch.setattr(reader_streamer, "DATA_FILE", path)
+    return path
+
+
+async def collect(gen, limit=None):
+    out = []
+    async for chunk in gen:
+        out.append(chunk)
+        if limit and len(out) >= limit:
+            break
+    await gen.aclose()
+    return out
+
+
+def test_replay_file_is_normalised_once(fixture_file):
+    replay = load_replay(fixture_file)
+
+    assert len(replay) == 4
+    assert replay.data.count(b"\n") == 4
+    assert all(line.startswith(b"{") for line in replay.data.splitlines())
+    assert replay.slice(1, 2) == (event(1, "2026-02-08T22:43:36.100000Z") + "\n").encode()
+    assert replay.times == pytest.approx([0.0, 0.1, 0.3, 0.3])  # bad timestamp: same as previous
+    assert load_replay(fixture_file) is replay
+
+
+def test_lines_within_is_line_aligned(fixture_file):
+    replay = ReplayFile(fixture_file)
+
+    assert replay.lines_within(0, 1) == 1
+    assert replay.lines_within(0, 1 << 20) == 4
+    assert replay.lines_within(4, 100) == 4
+
+
+@pytest.mark.asyncio
+async def test_unpaced_replay_sends_coalesced_chunks(fixture_file):
+    replay = load_replay(fixture_file)
+
+    once = await collect(ndjson_line_stream(loop=False, rate_hz=0))
+    looped = await collect(ndjson_line_stream(loop=True, rate_hz=0, chunk_bytes=4096), limit=3)
+
+    assert b"".join(once) == replay.data
+    assert all(len(c) >= 4096 and c.endswith(b"\n") for c in looped)
+    assert looped[0].count(replay.data) == looped[0].count(b"\n") // 4
+
+
+@pytest.mark.asyncio
+async def test_paced_replay_batches_lines_due_since_the_last_write(fixture_file):
+    t0 = time.perf_counter()
+    chunks = await collect(ndjson_line_stream(loop=True, rate_hz=2000), limit=5)
+    elapsed = time.perf_counter() - t0
+
+    lines = sum(c.count(b"\n") for c in chunks)
+    assert lines > len(chunks)  # several lines per write
+    assert lines <= 2000 * elapsed + 1
+
+
+@pytest.mark.asyncio
+async def test_time_faithful_replay_keeps_recorded_spacing(fixture_file):
+    stamps = []
+    gen = ndjson_line_stream(loop=False, speed=10.0)
+    t0 = asyncio.get_running_loop().time()
+    async for chunk in gen:
+        stamps.append((asyncio.get_running_loop().time() - t0, chunk.count(b"\n")))
+
+    # 0.3 s of recording at 10x: ~0.03 s; the last two events share a timestamp
+    assert [n for _, n in stamps] == [1, 1, 2]
+    assert stamps[-1][0] == pytest.approx(0.03, abs=0.05)
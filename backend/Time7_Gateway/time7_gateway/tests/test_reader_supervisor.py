@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from time7_gateway.services import reader_supervisor as mod
+from time7_gateway.services.reader_supervisor import ReaderConfig, ReaderSupervisor, reader_configs_from_env
+
+
+def test_configs_from_reader_urls(monkeypatch):
+    monkeypatch.setenv("READER_URLS", "dock-1=http://a/api/v1, http://b/api/v1")
+    monkeypatch.setenv("READER_USER", "root")
+    monkeypatch.setenv("READER_PASSWORD", "impinj")
+
+    assert reader_configs_from_env() == [
+        ReaderConfig("dock-1", "http://a/api/v1", "root", "impinj"),
+        ReaderConfig("reader-2", "http://b/api/v1", "root", "impinj"),
+    ]
+
+
+def test_configs_fall_back_to_reader_base_url(monkeypatch):
+    monkeypatch.delenv("READER_URLS", raising=False)
+    monkeypatch.setenv("READER_BASE_URL", "http://localhost:8000")
+
+    assert [(c.name, c.base_url) for c in reader_configs_from_env()] == [("reader-1", "http://localhost:8000")]
+
+
+def test_backoff_grows_and_is_capped():
+    sup = ReaderSupervisor(None, [], backoff_initial=1.0, backoff_max=8.0)
+
+    for failures, step in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (10, 8.0)]:
+        for _ in range(20):
+            assert step / 2 <= sup.backoff_delay(failures) <= step
+
+
+@pytest.mark.asyncio
+async def test_each_reader_reconnects_after_failures(monkeypatch):
+    calls = {"a": 0, "b": 0}
+
+    async def fake_stream(app, reader, status):
+        calls[reader.name] += 1
+        if reader.name == "a" and calls["a"] <= 2:
+            raise ConnectionError("refused")
+        status.mark_connected()
+        status.events += 1
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(mod, "run_reader_stream", fake_stream)
+    readers = [ReaderConfig("a", "http://a"), ReaderConfig("b", "http://b")]
+    sup = ReaderSupervisor(SimpleNamespace(), readers, backoff_initial=0.01, backoff_max=0.02)
+
+    sup.start()
+    for _ in range(100):
+        if sup.status["a"].connected and sup.status["b"].connected:
+            break
+        await asyncio.sleep(0.01)
+
+    a, b = sup.status["a"], sup.status["b"]
+    assert calls == {"a": 3, "b": 1}
+    assert (a.state, a.failures, a.connects, a.events) == ("streaming", 2, 1, 1)
+    assert a.last_error == "ConnectionError: refused"
+    assert b.failures == 0
+    assert sup.connected
+
+    await sup.stop()
+    assert not sup.running
+    assert [s["state"] for s in sup.stats()] == ["stopped", "stopped"]
+    assert not sup.connected
+
+
+@pytest.mark.asyncio
+async def test_ended_stream_is_reopened(monkeypatch):
+    calls = 0
+
+    async def fake_stream(app, reader, status):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            await asyncio.sleep(3600)
+
+    monkeypatch.setattr(mod, "run_reader_stream", fake_stream)
+    sup = ReaderSupervisor(SimpleNamespace(), [ReaderConfig("a", "http://a")], backoff_initial=0.01)
+
+    sup.start()
+    for _ in range(100):
+        if calls == 3:
+            break
+        await asyncio.sleep(0.01)
+    await sup.stop()
+
+    assert calls == 3
+    assert sup.status["a"].last_error == "stream ended"
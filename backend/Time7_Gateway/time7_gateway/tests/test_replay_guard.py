@@ -0,0 +1,48 @@
+from time7_gateway.services.replay_guard import ReplayGuard
+
+
+def test_answered_challenges_are_remembered():
+    guard = ReplayGuard(window=100.0, capacity=1000, clock=lambda: 0.0)
+
+    guard.add("T1", "AABB", now=0.0)
+
+    assert guard.seen("T1", "AABB", now=1.0)
+    assert not guard.seen("T1", "AABC", now=1.0)
+    assert not guard.seen("T2", "AABB", now=1.0)
+    assert guard.stats()["replays"] == 1
+
+
+def test_challenges_are_forgotten_after_the_window():
+    guard = ReplayGuard(window=100.0, capacity=1000, slices=4, clock=lambda: 0.0)
+    guard.add("T1", "AABB", now=0.0)
+
+    assert guard.seen("T1", "AABB", now=74.0)
+    assert not guard.seen("T1", "AABB", now=101.0)
+
+    # after an idle gap every old slice goes at once
+    guard.add("T2", "CCDD", now=200.0)
+    assert not guard.seen("T2", "CCDD", now=1000.0)
+    assert guard.stats()["slices"] == 1
+
+
+def test_memory_is_bounded_by_capacity():
+    guard = ReplayGuard(window=1e9, capacity=400, slices=4, clock=lambda: 0.0)
+
+    for i in range(2000):
+        guard.add(f"T{i}", "AABB", now=0.0)
+
+    # slices filled up and rotated early: only the newest challenges remain
+    assert guard.stats()["slices"] == 4
+    assert guard.stats()["bytes"] == guard.nbytes
+    assert guard.seen("T1999", "AABB", now=0.0)
+    assert not guard.seen("T0", "AABB", now=0.0)
+
+
+def test_false_positive_rate_stays_near_target():
+    guard = ReplayGuard(window=1e9, capacity=20_000, fp_rate=1e-3, clock=lambda: 0.0)
+    for i in range(20_000):
+        guard.add(f"T{i}", "AABB", now=0.0)
+
+    false_hits = sum(guard.seen(f"U{i}", "AABB", now=0.0) for i in range(20_000))
+
+    assert false_hits < 60  # 1e-3 target: ~20 expected
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import queue
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from time7_gateway.benchmarks.harness import serve_in_thread
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.reader_supervisor import ReaderConfig
+from time7_gateway.services.sharded_ingest import ShardedIngest, _put
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verifier import TagVerifier
+
+
+def make_app():
+    state = SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=3600.0),
+        tag_info_cache=TagInfoCache(),
+        db_writer=MagicMock(),
+    )
+    state.verifier = TagVerifier(MagicMock(return_value=(True, "ok")), state.tag_info_cache, state.db_writer)
+    return SimpleNamespace(state=state)
+
+
+def readers(n):
+    return [ReaderConfig(f"r{i}", f"http://r{i}") for i in range(n)]
+
+
+def test_readers_are_spread_round_robin():
+    ingest = ShardedIngest(make_app(), readers(5), workers=2)
+
+    assert [[r.name for r in shard] for shard in ingest.shards] == [["r0", "r2", "r4"], ["r1", "r3"]]
+    assert ShardedIngest(make_app(), readers(2), workers=8).workers == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_updates_are_applied_to_shared_state():
+    app = make_app()
+    ingest = ShardedIngest(app, readers(1), workers=1)
+
+    ingest.apply(("batch", 5, 1_700_000_000.0, {
+        "A": ("EA", None, "MSG", "RESP", None),
+        "B": ("EB", "Authentication Disabled", "", "", None),
+    }))
+    await app.state.verifier.drain()
+
+    assert sorted(app.state.active_tags.get_active_ids()) == ["A", "B"]
+    assert app.state.tag_info_cache.get("A") == (True, "ok")
+    assert app.state.tag_info_cache.get("B") == (False, "Authentication Disabled")
+    assert (ingest.batches, ingest.events, ingest.updates) == (1, 5, 2)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_waits_off_the_loop():
+    out = queue.Queue(maxsize=1)
+    out.put("held")
+    put = asyncio.create_task(_put(out, "next"))
+
+    # the loop keeps running while the put waits for room
+    ticks = 0
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert ticks == 5 and not put.done()
+
+    threading.Thread(target=out.get).start()
+    await asyncio.wait_for(put, 2.0)
+    assert out.get_nowait() == "next"
+
+
+def test_status_comes_from_worker_reports():
+    ingest = ShardedIngest(make_app(), readers(2), workers=2)
+    ingest.apply(("status", [{"name": "r0", "base_url": "http://r0", "state": "streaming", "connected": True}]))
+
+    # no worker process is running, so every reader reports stopped
+    assert [(s["name"], s["state"], s["worker"]) for s in ingest.stats()] == [("r0", "stopped", 0), ("r1", "stopped", 1)]
+    assert not ingest.connected
+
+
+def reader_app(lines):
+    app = FastAPI()
+    body = ("\n".join(json.dumps(ev) for ev in lines) + "\n").encode()
+
+    @app.get("/data/stream")
+    async def data_stream():
+        async def stream():
+            yield body
+            await asyncio.sleep(3600)
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_worker_process_feeds_coordinator():
+    events = [
+        {"eventType": "tagInventory", "tagInventoryEvent": {
+            "tidHex": f"T{i}", "epcHex": f"E{i}",
+            "tagAuthenticationResponse": {"messageHex": "M", "responseHex": "R", "tidHex": f"T{i}"}}}
+        for i in range(3)
+    ]
+    app = make_app()
+
+    with serve_in_thread(reader_app(events)) as url:
+        ingest = ShardedIngest(app, [ReaderConfig("sim", url)], workers=1, batch_window=0.01)
+        ingest.start()
+        try:
+            for _ in range(300):
+                if len(app.state.active_tags) == 3 and ingest.connected:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await ingest.stop()
+
+    assert sorted(app.state.active_tags.get_active_ids()) == ["T0", "T1", "T2"]
+    assert ingest.events == 3
+    assert not ingest.running
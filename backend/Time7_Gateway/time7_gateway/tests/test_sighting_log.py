@@ -0,0 +1,152 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.api.history import router
+from time7_gateway.clients.event_decoder import TagEvent
+from time7_gateway.services import sighting_log as mod
+from time7_gateway.services.sighting_log import SightingBuffer, SightingLog
+
+T0 = 1_772_000_000.0  # 2026-02-25T06:13:20Z
+HOUR = 3600.0
+
+
+def ev(tid, antenna=1, rssi=-6000, epc=None, read_time=None):
+    return TagEvent(tidHex=tid, epcHex=epc or f"E{tid}", antenna=antenna, rssi=rssi, readTime=read_time)
+
+
+def write(log, events, reader, at):
+    log.record(events, reader, seen_at=at)
+    log.append(log._take())
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    # counts the blocks a query decompresses
+    calls = []
+    for name in ("decode_block", "decode_rows"):
+        real = getattr(mod, name)
+        monkeypatch.setattr(mod, name, lambda data, *rows, real=real: calls.append(len(data)) or real(data, *rows))
+    return calls
+
+
+def test_buffer_collapses_reads_per_tag_reader_and_antenna():
+    buf = SightingBuffer()
+    buf.record([ev("A", rssi=-6000), ev("A", rssi=-5000), ev("A", antenna=2), ev("", antenna=1)], "dock-1", 1000)
+    buf.record([ev("A", rssi=-5500)], "dock-1", 2000)
+
+    rows = sorted(buf.drain())
+
+    assert rows == [("A", "EA", "dock-1", 1, -5000, 1000, 3), ("A", "EA", "dock-1", 2, -6000, 1000, 1)]
+    assert len(buf) == 0
+
+
+def test_buffer_uses_reader_time_within_max_lag():
+    buf = SightingBuffer(max_lag=60.0)
+    seen_ms = int(T0 * 1000)
+    buf.record([
+        ev("A", read_time="2026-02-25T06:13:10.5Z"),  # 9.5 s behind: trusted
+        ev("B", read_time="2026-02-25T06:10:00Z"),    # 200 s behind: skewed clock
+        ev("C", read_time="2026-02-25T06:13:30Z"),    # in the future
+        ev("D", read_time="garbage"),
+    ], "dock-1", seen_ms)
+
+    times = {row[0]: row[5] for row in buf.drain()}
+
+    assert times == {"A": seen_ms - 9500, "B": seen_ms, "C": seen_ms, "D": seen_ms}
+
+
+def test_tag_history_reads_only_the_blocks_holding_the_tag(tmp_path, decoded):
+    log = SightingLog(str(tmp_path), segment_seconds=HOUR, verdict=lambda tid: (True, "Authentication Passed"))
+    write(log, [ev("A"), ev("B")], "dock-1", T0)
+    write(log, [ev("B")], "dock-1", T0 + 10)
+    write(log, [ev("A", antenna=2, rssi=-4000)], "dock-2", T0 + 2 * HOUR)  # next segment
+
+    out = log.history("A")
+
+    assert [(s["reader"], s["antenna"], s["rssi"]) for s in out] == [("dock-2", 2, -4000), ("dock-1", 1, -6000)]
+    assert out[0]["auth"] is True and out[0]["info"] == "Authentication Passed"
+    assert len(decoded) == 2  # the block with only B is skipped
+    assert len(os.listdir(tmp_path)) == 3  # first segment sealed (.seg + .idx), second still open
+
+
+def test_presence_query_prunes_segments_by_time(tmp_path, decoded):
+    log = SightingLog(str(tmp_path), segment_seconds=HOUR)
+    write(log, [ev("A")], "dock-1", T0)
+    write(log, [ev("B")], "dock-1", T0 + HOUR)
+    write(log, [ev("B"), ev("C")], "dock-2", T0 + HOUR + 60)
+    write(log, [ev("D")], "dock-1", T0 + 3 * HOUR)
+
+    tags = log.present(T0 + HOUR - 1, T0 + 2 * HOUR)
+
+    assert [t["tidHex"] for t in tags] == ["B", "C"]
+    assert tags[0]["readers"] == ["dock-1", "dock-2"] and tags[0]["reads"] == 2
+    assert len(decoded) == 2  # A's and D's segments are never opened
+
+
+def test_reopen_uses_sealed_indexes_and_rebuilds_a_torn_segment(tmp_path):
+    log = SightingLog(str(tmp_path), segment_seconds=HOUR)
+    write(log, [ev("A")], "dock-1", T0)
+    write(log, [ev("B")], "dock-1", T0 + HOUR)
+    write(log, [ev("C")], "dock-1", T0 + HOUR + 1)
+    # crash while writing: no index for the open segment, half a block at its end
+    with open(log._active.path, "ab") as f:
+        f.write(b"\x00\x00\x10\x00partial")
+    log._file.close()
+
+    reopened = SightingLog(str(tmp_path), segment_seconds=HOUR)
+
+    assert [t["tidHex"] for t in reopened.present(0, T0 + 2 * HOUR)] == ["C", "B", "A"]
+    write(reopened, [ev("A")], "dock-1", T0 + HOUR + 2)  # goes to a new segment
+    assert [s["seen_at"][:19] for s in reopened.history("A")] == ["2026-02-25T07:13:22", "2026-02-25T06:13:20"]
+    assert reopened.stats()["segments"] == 3
+
+
+def test_old_segments_are_deleted_after_retention(tmp_path):
+    log = SightingLog(str(tmp_path), segment_seconds=HOUR, retention=24 * HOUR)
+    write(log, [ev("A")], "dock-1", T0)
+    write(log, [ev("B")], "dock-1", T0 + 2 * HOUR)
+    write(log, [ev("C")], "dock-1", T0 + 30 * HOUR)
+
+    assert [t["tidHex"] for t in log.present(0, T0 + 31 * HOUR)] == ["C"]
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_flush_appends_one_block_per_interval(tmp_path):
+    async def run():
+        log = SightingLog(str(tmp_path), flush_interval=0.01)
+        log.start()
+        log.record([ev("A"), ev("A"), ev("B")], "dock-1")
+        await asyncio.sleep(0.1)
+        log.extend([("C", "EC", "dock-2", 1, None, 1_772_000_000_000, 4)])  # from an ingest worker
+        await log.stop()
+        return log
+
+    log = asyncio.run(run())
+
+    assert log.stats()["blocks"] == 2 and log.stats()["sightings"] == 3
+    assert log.history("C", until=T0 + 1)[0]["reads"] == 4
+
+
+def make_client(log):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.sighting_log = log
+    return TestClient(app)
+
+
+def test_history_endpoint(tmp_path):
+    log = SightingLog(str(tmp_path))
+    write(log, [ev("A"), ev("B")], "dock-1", T0)
+    client = make_client(log)
+
+    by_tag = client.get("/api/history", params={"tid": "A"}).json()
+    present = client.get("/api/history", params={"since": "2026-02-25T06:00:00Z", "until": "2026-02-25T07:00:00"})
+
+    assert [s["reader"] for s in by_tag["sightings"]] == ["dock-1"]
+    assert sorted(t["tidHex"] for t in present.json()["tags"]) == ["A", "B"]
+    assert client.get("/api/history").status_code == 422
+    assert make_client(None).get("/api/history", params={"tid": "A"}).status_code == 404
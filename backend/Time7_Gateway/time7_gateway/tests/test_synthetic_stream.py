@@ -0,0 +1,95 @@
+from collections import Counter
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.clients.event_decoder import TagEvent, decode_lines
+from time7_gateway.clients.reader_client import collapse_events
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.simulators import reader_streamer
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+from time7_gateway.simulators.synthetic_stream import SyntheticTagStream, expected_verdict, parse_mix
+
+NOW = "2026-03-01T12:00:00.000000Z"
+
+
+def verdict(tidHex, update):
+    # what the gateway would decide for one collapsed update
+    epcHex, info, messageHex, responseHex, _ = update
+    if info is not None:
+        return False, info
+    return mock_ias_lookup(AuthPayload(messageHex=messageHex, responseHex=responseHex, tidHex=tidHex))
+
+
+def test_every_kind_gets_the_expected_verdict():
+    stream = SyntheticTagStream(population=1000, field=1000, zipf=0.0, churn=0.0)
+    events = list(decode_lines(stream.batch(5000, now=NOW).splitlines()))
+    latest = collapse_events(events)
+
+    kinds = Counter()
+    for tid, update in latest.items():
+        idx = int(tid[8:], 16)
+        kind = stream.kind(idx)
+        kinds[kind] += 1
+        assert verdict(tid, update) == expected_verdict(kind), (tid, kind)
+        assert update[4] == NOW
+
+    assert len(events) == 5000
+    assert set(kinds) == {"valid", "tampered", "disabled", "unsupported"}
+    assert kinds["valid"] > kinds["tampered"]
+
+
+def test_rereads_keep_the_first_read_time():
+    latest = collapse_events([
+        TagEvent(tidHex="A", epcHex="E1", readTime="2026-03-01T12:00:00Z"),
+        TagEvent(tidHex="A", epcHex="E2", readTime="2026-03-01T12:00:05Z"),
+        TagEvent(tidHex="B", hasAuth=True, messageHex="M", responseHex="R", readTime="2026-03-01T12:00:01Z"),
+        TagEvent(tidHex="B", hasAuth=True, messageHex="M2", responseHex="R2", readTime="2026-03-01T12:00:09Z"),
+    ])
+
+    assert latest["A"] == ("E2", "Authentication Disabled", "", "", "2026-03-01T12:00:00Z")
+    assert latest["B"] == (None, None, "M2", "R2", "2026-03-01T12:00:01Z")
+
+
+def test_zipf_skews_rereads_towards_the_first_slots():
+    skewed = SyntheticTagStream(population=1000, field=1000, zipf=1.2, churn=0.0, seed=1)
+    uniform = SyntheticTagStream(population=1000, field=1000, zipf=0.0, churn=0.0, seed=1)
+
+    def reads(stream):
+        return Counter(ev.tidHex for ev in decode_lines(stream.batch(20000, now=NOW).splitlines()))
+
+    hot = SyntheticTagStream.tid(0)
+    assert reads(skewed)[hot] > 1000
+    assert reads(uniform)[hot] < 100
+
+
+def test_churn_brings_in_tags_that_were_never_seen():
+    stream = SyntheticTagStream(population=10_000, field=100, churn=50.0, seed=3)
+
+    stream.advance(1.0)
+    stream.advance(0.5)
+
+    assert stream.departures == 75
+    assert stream.arrivals == 175
+    assert len(set(stream.field)) == 100
+    assert {idx for idx in stream.field if idx >= 100} <= set(range(100, 175))
+    assert max(stream.field) == 174
+    assert len(stream._tails) <= 100
+
+
+def test_parse_mix():
+    assert parse_mix("valid=1,tampered=0.5") == {"valid": 1.0, "tampered": 0.5, "disabled": 0.0, "unsupported": 0.0}
+    with pytest.raises(ValueError):
+        parse_mix("valid=1,forged=1")
+    with pytest.raises(ValueError):
+        parse_mix("valid=0")
+
+
+def test_stream_route_rejects_unknown_mode_and_bad_mix():
+    app = FastAPI()
+    app.include_router(reader_streamer.router)
+    client = TestClient(app)
+
+    assert client.get("/data/stream", params={"mode": "other"}).status_code == 422
+    assert client.get("/data/stream", params={"mode": "synthetic", "mix": "forged=1"}).status_code == 422
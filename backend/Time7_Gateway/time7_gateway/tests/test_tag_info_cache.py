@@ -86,4 +86,61 @@ def test_snapshot_as_module_function_if_not_method():
 
     snap = mod.snapshot(cache)
     assert snap["count"] == 2
-    assert [x["id"] for x in snap["items"]] == ["a", "b"]
\ No newline at end of file
+    assert [x["id"] for x in snap["items"]] == ["a", "b"]
+
+def test_lru_entry_is_evicted_past_max_entries():
+    cache = TagInfoCache(max_entries=2)
+    cache.set("a", True, "ok")
+    cache.set("b", True, "ok")
+    cache.get("a")  # a becomes most recently used
+    cache.set("c", True, "ok")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == (True, "ok")
+    assert cache.get("c") == (True, "ok")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sweep_removes_only_expired_entries():
+    cache = TagInfoCache(cache_ttl_hours=24)
+    cache.set("old", True, "ok")
+    cache.set("new", True, "ok")
+
+    t0 = cache._cache["old"].fetched_at
+    cache._cache["old"].fetched_at = t0 - timedelta(hours=25)
+    cache._rebuild_expiry()
+
+    assert cache.sweep(now=t0 + timedelta(seconds=1)) == 1
+    assert "old" not in cache._cache
+    assert "new" in cache._cache
+
+
+def test_sweep_skips_entries_refreshed_after_being_queued():
+    cache = TagInfoCache(cache_ttl_hours=1)
+    cache.set("a", True, "ok")
+    cache.set("a", False, "changed")  # leaves a stale heap item behind
+
+    now = cache._cache["a"].fetched_at + timedelta(minutes=30)
+    assert cache.sweep(now=now) == 0
+    assert cache.get("a") == (False, "changed")
+
+
+def test_stats_track_hits_misses_and_bytes():
+    cache = TagInfoCache()
+    cache.get("a")
+    cache.set("a", True, "ok")
+    cache.get("a")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 1
+    assert stats["bytes_estimate"] > 0
+
+
+def test_info_strings_are_interned():
+    cache = TagInfoCache()
+    cache.set("a", False, "".join(["Authentication ", "Failed"]))
+    cache.set("b", False, "".join(["Authentication ", "Failed"]))
+    assert cache._cache["a"].info is cache._cache["b"].info
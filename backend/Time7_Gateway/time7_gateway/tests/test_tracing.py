@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from time7_gateway.clients.event_decoder import TagEvent
+from time7_gateway.services.tracing import LatencyTracer
+
+READ = "2026-02-08T22:43:36.000000000Z"
+READ_TS = datetime(2026, 2, 8, 22, 43, 36, tzinfo=timezone.utc).timestamp()
+
+
+def events(*tids):
+    return [TagEvent(tidHex=t, readTime=READ) for t in tids]
+
+
+def test_one_event_in_every_n_is_sampled_across_chunks():
+    tracer = LatencyTracer(sample_every=3)
+
+    tracer.on_decoded(events("a", "b"), READ_TS, READ_TS)
+    tracer.on_decoded(events("c", "d", "e", "f", "g"), READ_TS, READ_TS)
+
+    assert list(tracer._open) == ["c", "f"]
+    assert tracer.started == 2
+
+
+def test_stage_lag_is_measured_from_reader_read_time():
+    tracer = LatencyTracer(sample_every=1)
+    tracer.on_decoded(events("a"), READ_TS + 0.5, READ_TS + 0.6)
+
+    tracer.mark("a", "state_updated", READ_TS + 1.0)
+    tracer.mark("a", "verified", READ_TS + 3.0)
+    tracer.mark("a", "verified", READ_TS + 9.0)  # only the first mark counts
+    tracer.mark("untraced", "verified")
+
+    stats = tracer.stats()
+    lag = {stage: v and round(v["p50"], 3) for stage, v in stats["lag_seconds"].items()}
+    step = {stage: v and round(v["p50"], 3) for stage, v in stats["step_seconds"].items()}
+    assert lag == {"received": 0.5, "decoded": 0.6, "state_updated": 1.0, "verified": 3.0, "persisted": None, "pushed": None}
+    assert step["verified"] == 2.0
+
+
+def test_mark_many_is_free_while_nothing_is_open():
+    tracer = LatencyTracer()
+    assert not tracer
+
+    tracer.mark_many(iter(lambda: 1 / 0, None), "persisted")  # never iterated
+
+
+def test_untrusted_reader_clock_falls_back_to_receive_time():
+    tracer = LatencyTracer(sample_every=1, max_age=60.0)
+    tracer.on_decoded(events("ahead"), READ_TS - 5.0, READ_TS - 5.0)
+    tracer.on_decoded(events("behind"), READ_TS + 3600.0, READ_TS + 3600.0)
+
+    assert [t.from_reader for t in tracer._open.values()] == [False, False]
+    assert tracer.stats()["lag_seconds"]["decoded"]["max"] == 0.0
+
+
+def test_old_traces_expire():
+    tracer = LatencyTracer(sample_every=1, max_age=10.0)
+    tracer.on_decoded(events("a"), READ_TS, READ_TS)
+    tracer.on_decoded([TagEvent(tidHex="b")], READ_TS + 5.0, READ_TS + 5.0)  # no reader time
+
+    assert tracer.expire(now=READ_TS + 12.0) == 1
+    assert list(tracer._open) == ["b"]
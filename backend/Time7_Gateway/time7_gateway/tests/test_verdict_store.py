@@ -0,0 +1,149 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verdict_store import VerdictStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = VerdictStore(str(tmp_path / "verdicts.db"))
+    yield s
+    s.close()
+
+
+def test_put_many_upserts_by_tid(store):
+    store.put_many([("A", True, "ok", 100.0, None), ("B", False, "bad", 100.0, None)])
+    store.put_many([("A", False, "changed", 200.0, None)])
+
+    assert store.count() == 2
+    assert store.get("A", not_before=0.0) == ("A", False, "changed", 200.0, None)
+    assert store.get("A", not_before=300.0) is None
+
+
+def test_files_without_the_challenge_column_are_upgraded(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE verdicts (tid_hex TEXT PRIMARY KEY, auth INTEGER NOT NULL, info TEXT, fetched_at REAL NOT NULL)")
+    conn.execute("INSERT INTO verdicts VALUES ('A', 1, 'ok', 100.0)")
+    conn.commit()
+    conn.close()
+
+    store = VerdictStore(path)
+    store.put_many([("B", True, "ok", 200.0, "C1")])
+
+    assert store.get("A", not_before=0.0) == ("A", True, "ok", 100.0, None)
+    assert store.get("B", not_before=0.0) == ("B", True, "ok", 200.0, "C1")
+    store.close()
+
+
+def test_load_returns_newest_rows_oldest_first(store):
+    store.put_many([("A", True, "ok", 100.0, None), ("B", True, "ok", 200.0, None), ("C", True, "ok", 300.0, None)])
+    rows = store.load(not_before=150.0, limit=10)
+    assert [r[0] for r in rows] == ["B", "C"]
+    assert [r[0] for r in store.load(not_before=0.0, limit=1)] == ["C"]
+
+
+@pytest.mark.asyncio
+async def test_cache_warm_start_restores_flushed_verdicts(tmp_path):
+    path = str(tmp_path / "verdicts.db")
+
+    first = VerdictStore(path)
+    cache = TagInfoCache(store=first)
+    cache.set("A", True, "Authentication Passed", challenge="C2")
+    cache.set("B", False, "Unsupported Tag")
+    assert await cache.flush_store() == 2
+    first.close()
+
+    second = VerdictStore(path)
+    warm = TagInfoCache(store=second)
+    assert warm.warm_start() == 2
+    assert warm.get("A") == (True, "Authentication Passed")
+    assert warm.get("B") == (False, "Unsupported Tag")
+    # the replay check needs the challenge each verdict was issued for
+    assert (warm.challenge("A"), warm.challenge("B")) == ("C2", None)
+    second.close()
+
+
+def test_warm_start_skips_expired_rows(store):
+    old = (datetime.now(timezone.utc) - timedelta(hours=30)).timestamp()
+    fresh = datetime.now(timezone.utc).timestamp()
+    store.put_many([("OLD", True, "ok", old, None), ("NEW", True, "ok", fresh, None)])
+
+    cache = TagInfoCache(cache_ttl_hours=24, store=store)
+    assert cache.warm_start() == 1
+    assert cache.get("OLD") is None
+    assert cache.get("NEW") == (True, "ok")
+
+
+@pytest.mark.asyncio
+async def test_failed_store_write_keeps_the_rows(store, monkeypatch):
+    cache = TagInfoCache(store=store)
+    cache.set("A", True, "ok")
+    real_put = store.put_many
+    monkeypatch.setattr(store, "put_many", MagicMock(side_effect=OSError("disk full")))
+
+    with pytest.raises(OSError):
+        await cache.flush_store()
+    cache.set("B", True, "ok")
+
+    monkeypatch.setattr(store, "put_many", real_put)
+    assert await cache.flush_store() == 2
+    assert [r[0] for r in store.load(not_before=0.0, limit=10)] == ["A", "B"]
+
+
+def test_lazy_load_reads_through_on_miss(store, monkeypatch):
+    store.put_many([("A", True, "ok", datetime.now(timezone.utc).timestamp(), None)])
+
+    cache = TagInfoCache(store=store, lazy_load=True)
+    assert cache.get("A") is None  # get() never touches the store
+    assert asyncio.run(cache.load("A")) == (True, "ok")
+    assert len(cache) == 1
+    assert cache.get("A") == (True, "ok")
+
+    # store misses are remembered
+    reads = []
+    real_get = store.get
+    monkeypatch.setattr(store, "get", lambda *a: reads.append(a) or real_get(*a))
+    assert asyncio.run(cache.load("missing")) is None
+    assert asyncio.run(cache.load("missing")) is None
+    assert len(reads) == 1
+
+
+@pytest.mark.asyncio
+async def test_verifier_awaits_the_store_before_ias(store):
+    from time7_gateway.models.schemas import AuthPayload
+    from time7_gateway.services.verifier import TagVerifier
+
+    store.put_many([("A", True, "ok", datetime.now(timezone.utc).timestamp(), None)])
+    cache = TagInfoCache(store=store, lazy_load=True)
+    ias = MagicMock(return_value=(False, "no"))
+    verifier = TagVerifier(ias, cache, MagicMock())
+    verifier.load_verdict = cache.load
+
+    for tid in ("A", "B"):
+        verifier.submit(AuthPayload(messageHex="M", responseHex="R", tidHex=tid), None, datetime.now(timezone.utc))
+    await verifier.drain()
+
+    assert cache.get("A") == (True, "ok")
+    assert cache.get("B") == (False, "no")
+    assert ias.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_discarded_verdict_leaves_cache_and_store(store):
+    # DBWriter.on_drop: the next read must verify and write the tag again
+    cache = TagInfoCache(store=store)
+    cache.set("A", True, "ok")
+    cache.set("B", True, "ok")
+    await cache.flush_store()
+
+    cache.discard("A")
+    await cache.flush_store()
+
+    assert cache.get("A") is None
+    assert [r[0] for r in store.load(not_before=0.0, limit=10)] == ["B"]
@@ -0,0 +1,193 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.verifier import TagVerifier
+
+
+SEEN_AT = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def payload(tid="TID1"):
+    return AuthPayload(messageHex="AABB", responseHex="CCDD", tidHex=tid)
+
+
+class SlowIAS:
+    """Async IAS stand-in that blocks until released and tracks concurrency."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, auth_payload):
+        self.calls.append(auth_payload.tidHex)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await self.release.wait()
+        self.running -= 1
+        return True, "Authentication Passed"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_for_same_tid_share_one_request():
+    ias = SlowIAS()
+    cache = TagInfoCache()
+    verifier = TagVerifier(ias, cache, MagicMock())
+
+    assert verifier.submit(payload(), "EPC1", SEEN_AT) is True
+    assert verifier.submit(payload(), "EPC1", SEEN_AT) is False
+    await asyncio.sleep(0)
+
+    assert verifier.is_pending("TID1")
+    ias.release.set()
+    await verifier.drain()
+
+    assert ias.calls == ["TID1"]
+    assert not verifier.is_pending("TID1")
+    assert cache.get("TID1") == (True, "Authentication Passed")
+    assert verifier.stats()["deduplicated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_respected():
+    ias = SlowIAS()
+    verifier = TagVerifier(ias, TagInfoCache(), MagicMock(), max_concurrency=2)
+
+    for i in range(5):
+        verifier.submit(payload(f"TID{i}"), None, SEEN_AT)
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert ias.running == 2
+    ias.release.set()
+    await verifier.drain()
+    assert ias.max_running == 2
+    assert len(ias.calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_result_is_cached_and_queued_for_db():
+    db_writer = MagicMock()
+    cache = TagInfoCache()
+    verifier = TagVerifier(MagicMock(return_value=(False, "Authentication Failed")), cache, db_writer)
+
+    verifier.submit(payload(), "EPC1", SEEN_AT)
+    await verifier.drain()
+
+    assert cache.get("TID1") == (False, "Authentication Failed")
+    db_writer.enqueue.assert_called_once_with(
+        tidHex="TID1", seen_at=SEEN_AT, auth=False, info="Authentication Failed", epcHex="EPC1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_is_not_cached():
+    db_writer = MagicMock()
+    cache = TagInfoCache()
+    verifier = TagVerifier(MagicMock(side_effect=RuntimeError("IAS down")), cache, db_writer)
+
+    verifier.submit(payload(), "EPC1", SEEN_AT)
+    await verifier.drain()
+
+    assert cache.get("TID1") is None
+    db_writer.enqueue.assert_not_called()
+    assert verifier.stats()["failed"] == 1
+    assert not verifier.is_pending("TID1")
+
+
+def read(verifier, cache, tid, challenge):
+    # one reader sighting through the batch path, as the reader stream applies it
+    from time7_gateway.clients.reader_client import apply_tag_updates
+    from time7_gateway.services.active_tags import ActiveTags
+
+    update = {tid: (f"E{tid}", None, challenge, "CCDD", None)}
+    return apply_tag_updates(update, SEEN_AT, ActiveTags(remove_grace_seconds=3600.0), cache, verifier, MagicMock())
+
+
+@pytest.mark.asyncio
+async def test_played_back_challenge_on_a_cache_hit_is_flagged_without_ias():
+    from time7_gateway.services.replay_guard import REPLAY_INFO, ReplayGuard
+
+    ias = MagicMock(return_value=(True, "Authentication Passed"))
+    db_writer = MagicMock()
+    cache = TagInfoCache()
+    verifier = TagVerifier(ias, cache, db_writer)
+    verifier.replay_guard = ReplayGuard(window=3600.0, capacity=100)
+
+    assert read(verifier, cache, "TID1", "C1") == 1
+    await verifier.drain()
+    assert read(verifier, cache, "TID1", "C1") == 0  # same session: cached verdict
+
+    # new reader session: a new challenge is verified again
+    assert read(verifier, cache, "TID1", "C2") == 1
+    await verifier.drain()
+    assert ias.call_count == 2 and cache.challenge("TID1") == "C2"
+
+    # the recorded C1 response played back while the verdict is cached
+    assert read(verifier, cache, "TID1", "C1") == 0
+    assert cache.get("TID1") == (False, REPLAY_INFO)
+    assert ias.call_count == 2
+    db_writer.enqueue.assert_called_with(tidHex="TID1", seen_at=SEEN_AT, auth=False, info=REPLAY_INFO, epcHex="ETID1")
+
+    read(verifier, cache, "TID1", "C1")
+    read(verifier, cache, "TID1", "C2")
+    assert verifier.stats()["replays"] == 1 and ias.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_verdict_without_a_known_challenge_is_verified_again():
+    from time7_gateway.services.replay_guard import ReplayGuard
+
+    ias = MagicMock(return_value=(True, "Authentication Passed"))
+    cache = TagInfoCache()
+    verifier = TagVerifier(ias, cache, MagicMock())
+    verifier.replay_guard = ReplayGuard(window=3600.0, capacity=100)
+    cache.set("TID1", True, "Authentication Passed")  # e.g. a store row from before challenges were kept
+
+    assert read(verifier, cache, "TID1", "C1") == 1
+    await verifier.drain()
+    assert ias.call_count == 1 and cache.challenge("TID1") == "C1"
+
+
+@pytest.mark.asyncio
+async def test_evicted_verdict_is_verified_again_not_flagged():
+    from time7_gateway.services.replay_guard import ReplayGuard
+
+    ias = MagicMock(return_value=(True, "Authentication Passed"))
+    cache = TagInfoCache(max_entries=2)
+    verifier = TagVerifier(ias, cache, MagicMock())
+    verifier.replay_guard = ReplayGuard(window=3600.0, capacity=100)
+
+    for tid in ("A", "B", "C"):
+        read(verifier, cache, tid, "C1")
+        await verifier.drain()
+    assert cache.peek("A") is None  # evicted
+
+    # A is still in the field with the same challenge
+    assert read(verifier, cache, "A", "C1") == 1
+    await verifier.drain()
+
+    assert cache.get("A") == (True, "Authentication Passed")
+    assert ias.call_count == 4
+    assert verifier.stats()["replays"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_does_not_use_up_the_challenge():
+    from time7_gateway.services.replay_guard import ReplayGuard
+
+    verifier = TagVerifier(MagicMock(side_effect=RuntimeError("IAS down")), TagInfoCache(), MagicMock())
+    verifier.replay_guard = ReplayGuard(window=3600.0, capacity=100)
+
+    verifier.submit(payload(), "EPC1", SEEN_AT)
+    await verifier.drain()
+
+    assert verifier.submit(payload(), "EPC1", SEEN_AT)
+    await verifier.drain()
+    assert verifier.stats()["replays"] == 0
@@ -1,15 +1,19 @@
-
 import hashlib
 # Use SHA256 hashing to generate response
 FAKE_SECRET = "times7-demo-secret"
 
+# SHA-256 state after the secret; copied per response instead of re-hashing it
+_SECRET_STATE = hashlib.sha256(FAKE_SECRET.encode())
+
+
 def generate_response(tid: str, challenge: str) -> str:
     """
     Simulate tag-side response generation using a shared secret.
     """
 
-    combined = FAKE_SECRET + tid + challenge
-    digest = hashlib.sha256(combined.encode()).hexdigest()
+    h = _SECRET_STATE.copy()
+    h.update((tid + challenge).encode())
 
     # Return first 16 chars in line with responseHex schema
-    return digest[:16]
\ No newline at end of file
+    return h.hexdigest()[:16]
+
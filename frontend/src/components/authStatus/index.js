@@ -1,8 +1,10 @@
 import { StyleSheet, Text, View } from "react-native";
 
 export default function AuthStatus({ auth }) {
-  const bg = auth ? "#55E299" : "#E25555";
-  const label = auth ? "VALID" : "INVALID";
+  // auth is null while the gateway is still verifying the tag with IAS
+  const pending = auth === null || auth === undefined;
+  const bg = pending ? "#A0A0A0" : auth ? "#55E299" : "#E25555";
+  const label = pending ? "PENDING" : auth ? "VALID" : "INVALID";
 
   return (
     <View style={[styles.pill, { backgroundColor: bg }]}>
@@ -15,7 +15,7 @@ export default function ItemCard({ auth, firstSeen, info, tidHex, epcHex, onPres
         ) : null}
       </View>
       <View style={styles.center}>
-        <Text style={styles.info}>{epcHex}</Text>
+        <Text style={styles.info}>{epcHex ?? "-"}</Text>
 
       </View>
       <View style={styles.bottom}>
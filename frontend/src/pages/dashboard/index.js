@@ -74,10 +74,10 @@ export default function Dashboard() {
               info={item.info}
               tidHex={item.tidHex}
               epcHex={item.epcHex}
-              registered={registeredEpcs.includes(String(item.epcHex))}
+              registered={item.epcHex != null && registeredEpcs.includes(String(item.epcHex))}
               onPress={() => {
                 if (!item.auth) return;
-                const isRegistered = registeredEpcs.includes(String(item.epcHex));
+                const isRegistered = item.epcHex != null && registeredEpcs.includes(String(item.epcHex));
                 setSelectedRegistered(isRegistered);
                 setSelectedItem(item);
                 setIsOpen(true);